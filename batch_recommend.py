@@ -0,0 +1,30 @@
+import argparse
+import logging
+from src.batch_scorer import BatchScorer
+from src.serving import SERVING_FORMS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("BatchRecommend")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Score a cohort export (CSV with id,skills columns or JSONL) with the trained model. "
+                    "Re-running with the same arguments resumes an interrupted run.")
+    parser.add_argument("input", help="students .csv or .jsonl")
+    parser.add_argument("output", help="output directory for Parquet part files")
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=-1, help="threads for predict_proba (-1: all cores)")
+    parser.add_argument("--serving", choices=SERVING_FORMS, default="forest",
+                        help="scoring form (compact forms come from python -m src.serving)")
+    parser.add_argument("--overwrite", action="store_true", help="discard previous results in the output directory")
+    args = parser.parse_args()
+
+    scorer = BatchScorer(args.models_dir, workers=args.workers, k=args.top_k, serving=args.serving)
+    stats = scorer.score(args.input, args.output, chunk_size=args.chunk_size, overwrite=args.overwrite)
+    logger.info(f"Done: {stats}")
+
+if __name__ == "__main__":
+    main()
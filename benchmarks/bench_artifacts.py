@@ -0,0 +1,125 @@
+"""
+Benchmark: cold-loading model artifacts from pickles vs. artifact bundles.
+
+Usage:
+    python benchmarks/bench_artifacts.py
+    python benchmarks/bench_artifacts.py --jobs 200000 --trees 300
+
+Writes a RandomForest (best_model), a KMeans model and a synthetic job
+TF-IDF in both formats, then loads each one in a fresh subprocess (so the
+interpreter and peak RSS are not shared) the way its consumer does:
+Recommender needs the whole forest, incremental parsing only needs the
+vectorizer until it appends rows. sklearn is imported before the clock
+starts; +RSS is resident memory added by the load (Linux only).
+"""
+import os
+import sys
+import json
+import time
+import pickle
+import random
+import resource
+import argparse
+import tempfile
+import subprocess
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.artifacts import (ArtifactBundle, BUNDLE_SUFFIX, save_forest_model, save_cluster_model, save_tfidf,
+                           load_model_artifacts, load_cluster_model, load_vectorizer)
+
+SKILLS = ["python", "sql", "spark", "aws", "airflow", "kafka", "etl", "pandas", "pytorch", "java",
+          "docker", "kubernetes", "react", "typescript", "css", "html", "linux", "bash", "terraform"]
+ROLES = ["Data Engineer", "Data Scientist", "Backend Engineer", "Frontend Engineer", "DevOps Engineer"]
+
+def write_artifacts(directory: str, n_jobs: int, n_trees: int, seed: int = 42):
+    import numpy as np
+    from sklearn.cluster import KMeans
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.preprocessing import MultiLabelBinarizer, StandardScaler
+
+    rng = random.Random(seed)
+    students = [rng.sample(SKILLS, k=rng.randint(2, 6)) for _ in range(2000)]
+    mlb = MultiLabelBinarizer()
+    X = mlb.fit_transform(students)
+    y = [rng.choice(ROLES) for _ in students]
+    forest = RandomForestClassifier(n_estimators=n_trees, random_state=seed).fit(X, y)
+    with open(os.path.join(directory, "best_model.pkl"), 'wb') as f:
+        pickle.dump({"model": forest, "mlb": mlb, "classes": forest.classes_}, f)
+    save_forest_model(os.path.join(directory, "best_model" + BUNDLE_SUFFIX), forest, mlb)
+
+    scaler = StandardScaler()
+    features = np.hstack([scaler.fit_transform(np.random.default_rng(seed).uniform(6, 10, (len(X), 1))), X])
+    kmeans = KMeans(n_clusters=4, random_state=seed).fit(features)
+    feature_names = ["cgpa"] + list(mlb.classes_)
+    with open(os.path.join(directory, "kmeans_cluster_model.pkl"), 'wb') as f:
+        pickle.dump({"kmeans": kmeans, "mlb": mlb, "scaler": scaler, "feature_names": feature_names}, f)
+    save_cluster_model(os.path.join(directory, "kmeans_cluster_model" + BUNDLE_SUFFIX),
+                       kmeans, scaler, mlb, feature_names)
+
+    corpus = [f"{rng.choice(ROLES)} {' '.join(rng.sample(SKILLS, k=8))} term{rng.randint(0, 50000)}"
+              for _ in range(n_jobs)]
+    vectorizer = TfidfVectorizer(stop_words='english', max_features=100000)
+    matrix = vectorizer.fit_transform(corpus)
+    job_ids = [f"mock_{i}" for i in range(n_jobs)]
+    with open(os.path.join(directory, "job_tfidf.pkl"), 'wb') as f:
+        pickle.dump({"vectorizer": vectorizer, "matrix": matrix, "job_ids": job_ids}, f)
+    save_tfidf(os.path.join(directory, "job_tfidf" + BUNDLE_SUFFIX), vectorizer, matrix, job_ids)
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+
+def load(artifact: str, fmt: str, directory: str):
+    # Import sklearn up front so both formats are timed on deserialization alone
+    import sklearn.ensemble, sklearn.cluster, sklearn.feature_extraction.text  # noqa: E401,F401
+    base_mb = rss_mb()
+    start = time.perf_counter()
+    if fmt == "pickle":
+        with open(os.path.join(directory, artifact + ".pkl"), 'rb') as f:
+            data = pickle.load(f)
+        if artifact == "job_tfidf":
+            data["vectorizer"].transform(["python sql"])
+    else:
+        path = os.path.join(directory, artifact + BUNDLE_SUFFIX)
+        if artifact == "best_model":
+            load_model_artifacts(path)
+        elif artifact == "kmeans_cluster_model":
+            load_cluster_model(ArtifactBundle(path))
+        else:
+            load_vectorizer(ArtifactBundle(path)).transform(["python sql"])
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"seconds": elapsed, "peak_rss_mb": peak_mb, "loaded_rss_mb": rss_mb() - base_mb}))
+
+def measure(artifact: str, fmt: str, directory: str) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--load", artifact, fmt, directory],
+                         check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def size_mb(path: str) -> float:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, p)) for p in os.listdir(path)) / 2**20
+    return os.path.getsize(path) / 2**20
+
+def run(n_jobs: int, n_trees: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        write_artifacts(tmp, n_jobs, n_trees)
+        print(f"{'artifact':>22} {'format':>7} {'size (MB)':>10} {'load (s)':>9} {'peak RSS (MB)':>14} {'+RSS (MB)':>10}")
+        for artifact in ("best_model", "kmeans_cluster_model", "job_tfidf"):
+            for fmt, suffix in (("pickle", ".pkl"), ("bundle", BUNDLE_SUFFIX)):
+                result = measure(artifact, fmt, tmp)
+                print(f"{artifact:>22} {fmt:>7} {size_mb(os.path.join(tmp, artifact + suffix)):>10.1f} "
+                      f"{result['seconds']:>9.3f} {result['peak_rss_mb']:>14.1f} {result['loaded_rss_mb']:>10.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=100000, help="rows in the synthetic TF-IDF matrix")
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--load", nargs=3, metavar=("ARTIFACT", "FORMAT", "DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.load:
+        load(*args.load)
+    else:
+        run(args.jobs, args.trees)
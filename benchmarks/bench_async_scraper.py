@@ -0,0 +1,46 @@
+"""
+Benchmark: end-to-end throughput of AsyncMockJobScraper against a local
+FixtureJobBoard with simulated network latency.
+
+Usage:
+    python benchmarks/bench_async_scraper.py
+    python benchmarks/bench_async_scraper.py --jobs 500 --latency 0.05 --concurrency 1 8 32
+
+concurrency=1 approximates the old sequential per-role loop.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.async_scraper import AsyncMockJobScraper, FixtureJobBoard
+from src.data_collector import ShardJobSink
+
+ROLES = ["Data Engineer", "Data Scientist", "Backend Engineer", "Frontend Engineer", "DevOps Engineer"]
+
+def run(n_jobs: int, latency: float, concurrencies, per_host_rate: float):
+    per_role = max(1, n_jobs // len(ROLES))
+    print(f"{'concurrency':>11} {'jobs':>6} {'requests':>9} {'seconds':>8} {'jobs/s':>8}")
+    for concurrency in concurrencies:
+        with tempfile.TemporaryDirectory() as tmp:
+            generator = AsyncMockJobScraper(tmp)
+            jobs = {role: [generator.generate_job(role) for _ in range(per_role)] for role in ROLES}
+            with FixtureJobBoard(jobs, latency=latency) as board:
+                scraper = AsyncMockJobScraper(tmp, sink=ShardJobSink(tmp), board=board,
+                                              concurrency=concurrency, per_host_rate=per_host_rate)
+                start = time.perf_counter()
+                saved = scraper.scrape(ROLES, per_role)
+                elapsed = time.perf_counter() - start
+            print(f"{concurrency:>11} {saved:>6} {len(board.request_log):>9} {elapsed:>8.2f} {saved / elapsed:>8.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per request")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--per-host-rate", type=float, default=0, help="requests/second per host, 0 = unlimited")
+    args = parser.parse_args()
+    run(args.jobs, args.latency, args.concurrency, args.per_host_rate)
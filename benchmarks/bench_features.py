@@ -0,0 +1,76 @@
+"""
+Benchmark: memory of the shared FeatureEncoder CSR rows vs. the dense
+[CGPA | one-hot skills] arrays the trainer and clustering used to build.
+
+Usage:
+    python benchmarks/bench_features.py
+    python benchmarks/bench_features.py --students 100000 1000000 --skills 10000 --chunk-size 100000
+
+Students have CGPA, internships, 1-2 interests and 3-12 skills drawn from a
+Zipf-like vocabulary of --skills skills. Each scale is encoded chunk by
+chunk (partial_fit, then transform) and stacked into one CSR matrix.
+"dense" is the size a float64 array of the same shape would need; it is
+computed, not allocated (10k skills x 1M students is ~80 GB). Peak RSS is
+for the whole process (Linux only), including the generated students.
+"""
+import os
+import sys
+import time
+import logging
+import resource
+import argparse
+
+import numpy as np
+from scipy import sparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.features import FeatureEncoder
+
+INTERESTS = ["Data Science", "Web Development", "DevOps", "Cloud Computing", "Backend", "Frontend"]
+
+def generate_students(n: int, n_skills: int, rng: np.random.Generator):
+    popularity = 1.0 / np.arange(1, n_skills + 1)
+    popularity /= popularity.sum()
+    counts = rng.integers(3, 13, size=n)
+    picks = rng.choice(n_skills, size=int(counts.sum()), p=popularity)
+    cgpa = rng.uniform(6.0, 10.0, size=n).round(2)
+    internships = rng.integers(0, 3, size=n)
+    students, start = [], 0
+    for i in range(n):
+        end = start + counts[i]
+        students.append({"cgpa": float(cgpa[i]), "internships": int(internships[i]),
+                         "skills": [f"skill_{j}" for j in picks[start:end]],
+                         "interests": [INTERESTS[j] for j in rng.choice(len(INTERESTS), size=1 + i % 2, replace=False)]})
+        start = end
+    return students
+
+def main(student_sizes, n_skills: int, chunk_size: int, seed: int):
+    logging.disable(logging.INFO)
+    print(f"{'students':>9} {'features':>9} {'nnz':>11} {'seconds':>8} {'csr (MB)':>10} {'dense (MB)':>11} "
+          f"{'saving':>8} {'peak RSS (MB)':>14}")
+    for n_students in student_sizes:
+        rng = np.random.default_rng(seed)
+        chunks = [generate_students(min(chunk_size, n_students - start), n_skills, rng)
+                  for start in range(0, n_students, chunk_size)]
+        start = time.perf_counter()
+        encoder = FeatureEncoder(numeric=["cgpa", "internships"], use_interests=True)
+        for chunk in chunks:
+            encoder.partial_fit(chunk)
+        X = sparse.vstack([encoder.transform(chunk) for chunk in chunks], format='csr')
+        seconds = time.perf_counter() - start
+        csr_mb = (X.data.nbytes + X.indices.nbytes + X.indptr.nbytes) / 2**20
+        dense_mb = X.shape[0] * X.shape[1] * np.dtype(np.float64).itemsize / 2**20
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{n_students:>9} {X.shape[1]:>9} {X.nnz:>11} {seconds:>8.1f} {csr_mb:>10.1f} {dense_mb:>11.0f} "
+              f"{dense_mb / csr_mb:>7.0f}x {peak_mb:>14.0f}")
+        del chunks, X
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--skills", type=int, default=10000)
+    parser.add_argument("--chunk-size", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.students, args.skills, args.chunk_size, args.seed)
@@ -0,0 +1,68 @@
+"""
+Benchmark: fitted-vocabulary TF-IDF vs. hashed TF-IDF shards.
+
+Usage:
+    python benchmarks/bench_hashed_tfidf.py
+    python benchmarks/bench_hashed_tfidf.py --jobs 100000 1000000 --chunk-size 20000
+
+Job texts come from MockJobScraper postings, recycled up to --jobs. The
+vocabulary mode needs the whole corpus in a list for
+TfidfVectorizer.fit_transform; the hashed mode reads a generator chunk by
+chunk into HashedTfidfStore. Peak memory is what tracemalloc saw during
+the build (the corpus list is counted for the vocabulary mode only);
+tracemalloc also slows both modes down.
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data_collector import MockJobScraper, ShardJobSink
+from src.parser_nlp import _read_raw_file, _job_text
+from src.hashed_tfidf import HashedTfidfStore
+
+ROLES = ["Data Engineer", "Data Scientist", "Backend Engineer", "Frontend Engineer", "DevOps Engineer"]
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2**20
+
+def main(job_sizes, chunk_size: int):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        MockJobScraper(tmp, sink=ShardJobSink(tmp)).scrape(ROLES, count_per_role=200)
+        texts = [_job_text(job) for name in sorted(os.listdir(tmp)) for job in _read_raw_file(os.path.join(tmp, name))]
+
+    def corpus(n):
+        for i in range(n):
+            yield f"{texts[i % len(texts)]} posting{i}"
+
+    print(f"{'jobs':>9} {'mode':<12} {'seconds':>9} {'peak (MB)':>10} {'jobs/s':>10}")
+    for n_jobs in job_sizes:
+        job_ids = [f"job_{i}" for i in range(n_jobs)]
+        seconds, peak = measure(lambda: TfidfVectorizer(stop_words='english', max_features=1000)
+                                .fit_transform(list(corpus(n_jobs))))
+        print(f"{n_jobs:>9} {'vocabulary':<12} {seconds:>9.2f} {peak:>10.1f} {n_jobs / seconds:>10.0f}")
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HashedTfidfStore(os.path.join(tmp, "hashed"))
+            seconds, peak = measure(lambda: store.add_all(corpus(n_jobs), job_ids, chunk_size=chunk_size))
+        print(f"{n_jobs:>9} {'hashed':<12} {seconds:>9.2f} {peak:>10.1f} {n_jobs / seconds:>10.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[20000, 100000])
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+    main(args.jobs, args.chunk_size)
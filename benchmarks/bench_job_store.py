@@ -0,0 +1,93 @@
+"""
+Benchmark: loading parsed jobs from jobs.json vs. the columnar ParsedJobStore.
+
+Usage:
+    python benchmarks/bench_job_store.py
+    python benchmarks/bench_job_store.py --jobs 100000
+
+For each size a synthetic corpus is written in both formats, then each
+format is loaded in a fresh subprocess (so peak RSS is not shared) the way
+SkillRoleMapper consumes it: title + extracted_skills for every job.
+"""
+import os
+import sys
+import json
+import time
+import random
+import resource
+import argparse
+import tempfile
+import subprocess
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.job_store import ParsedJobStore
+
+ROLES = ["Data Engineer", "Data Scientist", "Backend Engineer", "Frontend Engineer", "DevOps Engineer"]
+SKILLS = ["python", "sql", "spark", "aws", "airflow", "kafka", "etl", "pandas", "pytorch", "java",
+          "docker", "kubernetes", "react", "typescript", "css", "html", "linux", "bash", "terraform"]
+
+def make_jobs(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    for i in range(count):
+        role = rng.choice(ROLES)
+        yield {
+            "id": f"mock_{i}",
+            "title": f"Senior {role}",
+            "company": f"MockCompany_{rng.randint(1, 100)}",
+            "location": "Remote",
+            "description": f"We are looking for a {role} to join our team. " * 8,
+            "posted_date": "2026-01-01T00:00:00",
+            "source": "mock_generator",
+            "url": f"https://example.com/jobs/mock_{i}",
+            "extracted_skills": rng.sample(SKILLS, k=rng.randint(2, 7)),
+        }
+
+def load(fmt: str, path: str):
+    start = time.perf_counter()
+    n_skills = 0
+    if fmt == "json":
+        with open(path, 'r', encoding='utf-8') as f:
+            jobs = json.load(f)
+        for job in jobs:
+            n_skills += len(job['extracted_skills'])
+    else:
+        for batch in ParsedJobStore(path).iter_batches(columns=["title", "extracted_skills"]):
+            for skills in batch["extracted_skills"]:
+                n_skills += len(skills)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"seconds": elapsed, "peak_rss_mb": peak_mb, "skills": n_skills}))
+
+def measure(fmt: str, path: str) -> dict:
+    out = subprocess.run([sys.executable, __file__, "--load", fmt, path], check=True, capture_output=True, text=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def run(sizes):
+    print(f"{'jobs':>9} {'format':>8} {'size (MB)':>10} {'load (s)':>9} {'peak RSS (MB)':>14}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "jobs.json")
+            store_dir = os.path.join(tmp, "jobs_store")
+            with open(json_path, 'w') as f:
+                f.write('[')
+                for i, job in enumerate(make_jobs(n)):
+                    f.write((',\n' if i else '\n') + json.dumps(job, indent=2))
+                f.write('\n]')
+            ParsedJobStore(store_dir).write(make_jobs(n))
+
+            store_mb = sum(os.path.getsize(os.path.join(store_dir, p)) for p in os.listdir(store_dir)) / 2**20
+            for fmt, path, size_mb in (("json", json_path, os.path.getsize(json_path) / 2**20),
+                                       ("parquet", store_dir, store_mb)):
+                result = measure(fmt, path)
+                print(f"{n:>9} {fmt:>8} {size_mb:>10.1f} {result['seconds']:>9.2f} {result['peak_rss_mb']:>14.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--load", nargs=2, metavar=("FORMAT", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.load:
+        load(*args.load)
+    else:
+        run(args.jobs)
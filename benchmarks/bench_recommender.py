@@ -0,0 +1,92 @@
+"""
+Benchmark: Recommender.recommend vs. the per-click path the UI used to
+run (mlb.transform + RandomForestClassifier.predict_proba + filtering and
+sorting the whole role-skill matrix).
+
+Usage:
+    python benchmarks/bench_recommender.py
+    python benchmarks/bench_recommender.py --models-dir models --requests 2000
+
+Trains a throwaway model into a temp dir when --models-dir has no
+a trained model. Requests are random skill sets, so repeats also exercise
+the prediction cache.
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import warnings
+import tempfile
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MultiLabelBinarizer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.trainer import ModelTrainer
+from src.recommender import Recommender
+from src.artifacts import find_artifact, load_model_artifacts
+
+SKILLS = ["Python", "Java", "SQL", "React", "AWS", "Docker", "Pandas", "PyTorch", "Node.js", "Linux", "Git"]
+
+def legacy_recommend(model_data, role_skill_df, skills):
+    probas = model_data['model'].predict_proba(model_data['mlb'].transform([[s.lower() for s in skills]]))[0]
+    classes = model_data['model'].classes_
+    top_roles = [(classes[i], probas[i]) for i in probas.argsort()[-3:][::-1]]
+    role_skills = role_skill_df[role_skill_df['role'] == top_roles[0][0]].sort_values(
+        'p_skill_given_role', ascending=False)['skill'].head(10).tolist()
+    user_skills_lower = [s.lower() for s in skills]
+    missing = [s for s in role_skills if s.lower() not in user_skills_lower]
+    return top_roles, missing
+
+def percentiles(latencies):
+    ms = np.asarray(latencies) * 1000
+    return np.percentile(ms, 50), np.percentile(ms, 99)
+
+def run(models_dir, n_requests, seed=42):
+    if find_artifact(models_dir, "best_model") is None:
+        tmp = tempfile.mkdtemp()
+        if os.path.exists(os.path.join(models_dir, "role_skill_matrix.csv")):
+            shutil.copy(os.path.join(models_dir, "role_skill_matrix.csv"), tmp)
+        ModelTrainer(models_dir=tmp, reports_dir=tmp).train()
+        models_dir = tmp
+
+    rng = random.Random(seed)
+    requests = [rng.sample(SKILLS, k=rng.randint(1, 5)) for _ in range(n_requests)]
+
+    artifacts = load_model_artifacts(find_artifact(models_dir, "best_model"))
+    model_data = {"model": artifacts["model"], "mlb": MultiLabelBinarizer(classes=artifacts["mlb_classes"]).fit([])}
+    matrix_path = os.path.join(models_dir, "role_skill_matrix.csv")
+    role_skill_df = pd.read_csv(matrix_path) if os.path.exists(matrix_path) else pd.DataFrame(
+        columns=['role', 'skill', 'p_skill_given_role'])
+    legacy = []
+    with warnings.catch_warnings():
+        # mlb.transform warns on every request with a skill it has not seen
+        warnings.simplefilter("ignore")
+        for skills in requests:
+            start = time.perf_counter()
+            legacy_recommend(model_data, role_skill_df, skills)
+            legacy.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    recommender = Recommender(models_dir)
+    load = time.perf_counter() - start
+    for skills in requests:
+        recommender.recommend(skills)
+    stats = recommender.latency_stats()
+
+    p50, p99 = percentiles(legacy)
+    print(f"Recommender load: {load * 1000:.1f} ms (once per process)")
+    print(f"{'path':<12} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    print(f"{'legacy':<12} {p50:>9.3f} {p99:>9.3f}")
+    print(f"{'recommender':<12} {stats['p50_ms']:>9.3f} {stats['p99_ms']:>9.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--requests", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.models_dir, args.requests)
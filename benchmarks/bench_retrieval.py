@@ -0,0 +1,94 @@
+"""
+Benchmark: building the job InvertedIndex and querying it, exact and
+approximate (impact-ordered postings cut at --max-postings per term).
+
+Usage:
+    python benchmarks/bench_retrieval.py
+    python benchmarks/bench_retrieval.py --jobs 100000 1000000 --queries 500
+
+The vectorizer is fit on MockJobScraper postings; each scale's job matrix
+resamples those rows (with the same term statistics) up to --jobs rows.
+Queries are random student profiles of 2-6 skills plus an interest.
+Recall@k is the share of the approximate top-k that scores at least the
+exact k-th best; score is the approximate top-k's total score over the
+exact top-k's (near-ties keep it close to 1 when recall is low).
+"""
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+
+import numpy as np
+from sklearn.preprocessing import normalize
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data_collector import MockJobScraper, ShardJobSink
+from src.parser_nlp import _read_raw_file, _job_text
+from src.job_retrieval import InvertedIndex
+
+ROLES = ["Data Engineer", "Data Scientist", "Backend Engineer", "Frontend Engineer", "DevOps Engineer"]
+SKILLS = ["Python", "SQL", "Spark", "AWS", "Airflow", "Kafka", "Pandas", "PyTorch", "Java", "Docker",
+          "Kubernetes", "React", "TypeScript", "CSS", "Linux", "Terraform", "Node.js", "Git"]
+INTERESTS = ["Data Science", "Web Development", "DevOps", "Cloud Computing", "Backend", "Frontend"]
+
+def percentiles(seconds):
+    ms = np.asarray(seconds) * 1000
+    return float(np.percentile(ms, 50)), float(np.percentile(ms, 99))
+
+def main(job_sizes, n_queries: int, k: int, max_postings: int, seed: int):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    logging.disable(logging.INFO)
+    rng = np.random.default_rng(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        MockJobScraper(tmp, sink=ShardJobSink(tmp)).scrape(ROLES, count_per_role=400)
+        texts = [_job_text(job) for name in sorted(os.listdir(tmp)) for job in _read_raw_file(os.path.join(tmp, name))]
+    vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
+    base = vectorizer.fit_transform(texts).tocsr()
+
+    profile_rng = random.Random(seed)
+    queries = [vectorizer.transform([" ".join(profile_rng.sample(SKILLS, k=profile_rng.randint(2, 6))
+                                              + [profile_rng.choice(INTERESTS)])])
+               for _ in range(n_queries)]
+
+    print(f"{'jobs':>9} {'nnz':>11} {'build (s)':>10} {'mode':<12} {'p50 (ms)':>9} {'p99 (ms)':>9} {'recall@k':>9} {'score':>7}")
+    for n_jobs in job_sizes:
+        # Jitter the resampled rows so jobs are not exact duplicates
+        matrix = base[rng.integers(0, base.shape[0], size=n_jobs)]
+        matrix.data *= rng.uniform(0.5, 1.5, size=matrix.nnz)
+        matrix = normalize(matrix)
+        start = time.perf_counter()
+        index = InvertedIndex(matrix)
+        build = time.perf_counter() - start
+
+        exact_top = []
+        for mode, limit in (("exact", None), (f"approx@{max_postings}", max_postings)):
+            seconds, recalls, ratios = [], [], []
+            for i, query in enumerate(queries):
+                start = time.perf_counter()
+                rows, scores = index.search(query.indices, query.data, k, limit)
+                seconds.append(time.perf_counter() - start)
+                if limit is None:
+                    exact_top.append(scores)
+                elif len(exact_top[i]):
+                    # Ties make row identity ambiguous: count results scoring at least the exact k-th
+                    recalls.append(float(np.sum(scores >= exact_top[i][-1] - 1e-9)) / len(exact_top[i]))
+                    ratios.append(scores.sum() / exact_top[i].sum())
+            p50, p99 = percentiles(seconds)
+            recall = f"{np.mean(recalls):.3f}" if recalls else "-"
+            ratio = f"{np.mean(ratios):.3f}" if ratios else "-"
+            print(f"{n_jobs:>9} {matrix.nnz:>11} {build:>10.2f} {mode:<12} {p50:>9.2f} {p99:>9.2f} {recall:>9} {ratio:>7}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--max-postings", type=int, default=16384)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    main(args.jobs, args.queries, args.k, args.max_postings, args.seed)
@@ -0,0 +1,86 @@
+"""
+Benchmark: RoleClassifier throughput on a large synthetic taxonomy vs. a
+linear if/elif-style substring chain.
+
+Usage:
+    python benchmarks/bench_role_classifier.py
+    python benchmarks/bench_role_classifier.py --titles 1000000 --roles 500 --unique 20000
+
+Titles are drawn from --unique distinct strings (seniority x role synonym x
+team suffix), which is what makes memoization pay off on real boards.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.role_taxonomy import RoleClassifier
+
+SENIORITY = ["Junior", "Mid-Level", "Senior", "Lead", "Principal", "Sr.", "Staff"]
+SUFFIXES = ["", "- Remote", "(Payments)", "II", "/ Platform Team", "- Contract"]
+
+def make_taxonomy(n_roles: int):
+    return [{"name": f"Role {i} Engineer",
+             "patterns": [f"role {i} engineer", f"role{i} developer", f"domain{i} specialist"]}
+            for i in range(n_roles)]
+
+def make_titles(n_titles: int, taxonomy, n_unique: int, seed: int = 42):
+    rng = random.Random(seed)
+    unique = []
+    for _ in range(n_unique):
+        role = rng.choice(taxonomy)
+        unique.append(f"{rng.choice(SENIORITY)} {rng.choice(role['patterns']).title()} {rng.choice(SUFFIXES)}")
+    return [rng.choice(unique) for _ in range(n_titles)]
+
+def linear_chain(taxonomy):
+    checks = [(p, role["name"]) for role in taxonomy for p in role["patterns"]]
+    def classify(title: str) -> str:
+        lowered = title.lower()
+        for pattern, name in checks:
+            if pattern in lowered:
+                return name
+        return "Unknown"
+    return classify
+
+def run(n_titles: int, n_roles: int, n_unique: int, legacy_limit: int):
+    taxonomy = make_taxonomy(n_roles)
+    titles = make_titles(n_titles, taxonomy, n_unique)
+
+    legacy = linear_chain(taxonomy)
+    sample = titles[:legacy_limit]
+    start = time.perf_counter()
+    for title in sample:
+        legacy(title)
+    legacy_rate = len(sample) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    classifier = RoleClassifier(taxonomy)
+    build = time.perf_counter() - start
+
+    uncached = RoleClassifier(taxonomy, cache_size=0)
+    start = time.perf_counter()
+    for title in sample:
+        uncached.classify(title)
+    uncached_rate = len(sample) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    classifier.classify_many(titles)
+    elapsed = time.perf_counter() - start
+
+    print(f"taxonomy: {n_roles} roles, {n_roles * 3} patterns (compiled in {build * 1000:.0f} ms)")
+    print(f"{'method':>22} {'titles/s':>12}")
+    print(f"{'linear chain':>22} {legacy_rate:>12,.0f}")
+    print(f"{'compiled, no memo':>22} {uncached_rate:>12,.0f}")
+    print(f"{'compiled + memo':>22} {n_titles / elapsed:>12,.0f}   ({n_titles:,} titles in {elapsed:.2f}s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, default=1000000)
+    parser.add_argument("--roles", type=int, default=500)
+    parser.add_argument("--unique", type=int, default=20000)
+    parser.add_argument("--legacy-limit", type=int, default=50000)
+    args = parser.parse_args()
+    run(args.titles, args.roles, args.unique, args.legacy_limit)
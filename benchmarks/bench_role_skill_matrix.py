@@ -0,0 +1,102 @@
+"""
+Benchmark: sparse role-skill matrix construction vs. the nested-dict loop
+it replaced.
+
+Usage:
+    python benchmarks/bench_role_skill_matrix.py
+    python benchmarks/bench_role_skill_matrix.py --jobs 100000 --skills 1000
+
+Batches are generated in memory (same shape as ParsedJobStore batches) so
+the timing covers matrix building and the long (role, skill) table only.
+The legacy loop is timed on at most --legacy-limit jobs.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.skill_mapper import SkillRoleMapper
+
+ROLES = ["Data Engineer", "Data Scientist", "Backend Engineer", "Frontend Engineer", "DevOps Engineer"]
+SENIORITY = ["Junior", "Mid-Level", "Senior", "Lead", "Principal"]
+
+def make_batches(n_jobs: int, n_skills: int, batch_size: int = 50000, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    skills = np.array([f"skill_{i}" for i in range(n_skills)], dtype=object)
+    titles = np.array([f"{s} {r}" for s in SENIORITY for r in ROLES], dtype=object)
+    batches = []
+    for start in range(0, n_jobs, batch_size):
+        size = min(batch_size, n_jobs - start)
+        lengths = rng.integers(3, 9, size=size)
+        flat = skills[rng.integers(0, n_skills, size=int(lengths.sum()))]
+        splits = np.split(flat, np.cumsum(lengths)[:-1])
+        batches.append({
+            "id": [f"job_{start + i}" for i in range(size)],
+            "title": list(titles[rng.integers(0, len(titles), size=size)]),
+            "extracted_skills": [list(s) for s in splits],
+        })
+    return batches
+
+def classify_role(title: str) -> str:
+    if "Data Engineer" in title: return "Data Engineer"
+    elif "Data Scientist" in title: return "Data Scientist"
+    elif "Backend" in title: return "Backend Engineer"
+    elif "Frontend" in title: return "Frontend Engineer"
+    elif "DevOps" in title: return "DevOps Engineer"
+    return "Unknown"
+
+def legacy_map(batches):
+    role_skill_counts = defaultdict(lambda: defaultdict(int))
+    role_counts = defaultdict(int)
+    for batch in batches:
+        for title, skills in zip(batch["title"], batch["extracted_skills"]):
+            role = classify_role(title)
+            role_counts[role] += 1
+            for skill in skills:
+                role_skill_counts[role][skill] += 1
+    all_skills = set()
+    for role, skills in role_skill_counts.items():
+        all_skills.update(skills)
+    data = []
+    for role in role_counts:
+        for skill in all_skills:
+            count = role_skill_counts[role].get(skill, 0)
+            data.append({"role": role, "skill": skill, "count": count,
+                         "p_skill_given_role": count / role_counts[role]})
+    return pd.DataFrame(data)
+
+def run(job_sizes, skill_sizes, legacy_limit):
+    mapper = SkillRoleMapper(output_dir=tempfile.mkdtemp())
+    print(f"{'jobs':>9} {'skills':>7} {'legacy (s)':>11} {'sparse (s)':>11} {'nnz':>10}")
+    for n_skills in skill_sizes:
+        for n_jobs in job_sizes:
+            batches = make_batches(n_jobs, n_skills)
+
+            legacy = "-"
+            if legacy_limit:
+                sample = make_batches(min(n_jobs, legacy_limit), n_skills)
+                start = time.perf_counter()
+                legacy_map(sample)
+                legacy = (time.perf_counter() - start) * n_jobs / min(n_jobs, legacy_limit)
+                legacy = f"{'~' if n_jobs > legacy_limit else ''}{legacy:.2f}"
+
+            start = time.perf_counter()
+            counts, _ = mapper.build_counts(iter(batches))
+            counts.to_frame()
+            elapsed = time.perf_counter() - start
+            print(f"{n_jobs:>9} {n_skills:>7} {legacy:>11} {elapsed:>11.2f} {counts.incidence.nnz:>10}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--skills", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--legacy-limit", type=int, default=100000)
+    args = parser.parse_args()
+    run(args.jobs, args.skills, args.legacy_limit)
@@ -0,0 +1,79 @@
+"""
+Benchmark: the trained forest vs. its exported serving forms (compiled
+forest, distilled tree, linear scorer) behind the Recommender.
+
+Usage:
+    python benchmarks/bench_serving.py
+    python benchmarks/bench_serving.py --models-dir models --requests 2000 --batch 100000
+
+Trains a throwaway model into a temp dir when --models-dir has no trained
+model, and runs `export_serving` there (never in --models-dir). Single-row
+latency is the uncached scoring step of a request (encode + predict
+proba); batch is Recommender.recommend_batch over --batch random
+profiles. Agreement is the share of held-out profiles whose top role
+matches the forest's (from the export report).
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import logging
+import argparse
+import tempfile
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.trainer import ModelTrainer
+from src.recommender import Recommender
+from src.serving import export_serving, SERVING_FORMS
+from src.artifacts import find_artifact
+
+SKILLS = ["Python", "Java", "SQL", "React", "AWS", "Docker", "Pandas", "PyTorch", "Node.js", "Linux", "Git"]
+
+def run(models_dir: str, n_requests: int, n_batch: int, seed: int = 42):
+    logging.disable(logging.WARNING)
+    tmp = tempfile.mkdtemp()
+    if find_artifact(models_dir, "best_model") is None:
+        ModelTrainer(models_dir=tmp, reports_dir=tmp).train()
+    else:
+        for name in os.listdir(models_dir):
+            if name.startswith("best_model") or name == "role_skill_matrix.csv":
+                source = os.path.join(models_dir, name)
+                (shutil.copytree if os.path.isdir(source) else shutil.copy)(source, os.path.join(tmp, name))
+    report = export_serving(tmp, reports_dir=None, seed=seed)
+
+    rng = random.Random(seed)
+    requests = [rng.sample(SKILLS, k=rng.randint(1, 5)) for _ in range(n_requests)]
+    batch = [rng.sample(SKILLS, k=rng.randint(1, 5)) for _ in range(n_batch)]
+
+    print(f"teacher: {report['teacher']}")
+    print(f"{'form':<10} {'size (KB)':>10} {'p50 (us)':>9} {'p99 (us)':>9} {'batch rows/s':>13} {'agreement':>10}")
+    for form in SERVING_FORMS:
+        if form not in report["forms"]:
+            continue
+        recommender = Recommender(tmp, serving=form)
+        seconds = []
+        for skills in requests:
+            start = time.perf_counter()
+            recommender.forest_proba(recommender.encode(skills))
+            seconds.append(time.perf_counter() - start)
+        us = np.asarray(seconds) * 1e6
+        start = time.perf_counter()
+        recommender.recommend_batch(batch)
+        rate = n_batch / (time.perf_counter() - start)
+        stats = report["forms"][form]
+        print(f"{form:<10} {stats['size_kb']:>10.1f} {np.percentile(us, 50):>9.1f} {np.percentile(us, 99):>9.1f} "
+              f"{rate:>13.0f} {stats['top1_agreement']:>10.3f}")
+    shutil.rmtree(tmp)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=50000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.models_dir, args.requests, args.batch, args.seed)
@@ -0,0 +1,84 @@
+"""
+Benchmark: compiled SkillMatcher vs. the per-term regex loop it replaced.
+
+Usage:
+    python benchmarks/bench_skill_matcher.py
+    python benchmarks/bench_skill_matcher.py --jobs 10000 --vocab 50 1000
+
+The legacy loop is O(skills x jobs) and is impractical at 10k skills x 100k
+jobs, so it is timed on at most --legacy-limit jobs and extrapolated.
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.parser_nlp import SkillExtractor
+
+FILLER = ("we are looking for an engineer to join our team design and implement scalable "
+          "solutions collaborate with cross functional teams strong problem solving skills "
+          "bachelor degree in computer science experience is a plus").split()
+
+def legacy_extract(extractor: SkillExtractor, text: str):
+    text_lower = text.lower()
+    found_skills = set()
+    for skill in extractor.common_skills:
+        if re.search(r'\b' + re.escape(skill) + r'\b', text_lower):
+            found_skills.add(skill)
+    for alias, canonical in extractor.skill_aliases.items():
+        if re.search(r'\b' + re.escape(alias) + r'\b', text_lower):
+            found_skills.add(canonical)
+    return found_skills
+
+def make_extractor(vocab_size: int) -> SkillExtractor:
+    extractor = SkillExtractor()
+    skills = sorted(extractor.common_skills)
+    i = 0
+    while len(skills) < vocab_size:
+        skills.append(f"skill{i} tool" if i % 3 == 0 else f"skill{i}")
+        i += 1
+    extractor.common_skills = set(skills[:vocab_size])
+    extractor.build_matcher()
+    return extractor
+
+def make_jobs(count: int, vocab: list, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    jobs = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=60) + rng.sample(vocab, k=min(6, len(vocab)))
+        rng.shuffle(words)
+        jobs.append(" ".join(words))
+    return jobs
+
+def run(jobs_sizes, vocab_sizes, legacy_limit):
+    print(f"{'jobs':>8} {'vocab':>6} {'legacy (s)':>12} {'matcher (s)':>12} {'speedup':>8}")
+    for vocab_size in vocab_sizes:
+        extractor = make_extractor(vocab_size)
+        vocab = sorted(extractor.common_skills)
+        for n_jobs in jobs_sizes:
+            jobs = make_jobs(n_jobs, vocab)
+
+            sample = jobs[:legacy_limit]
+            start = time.perf_counter()
+            expected = [legacy_extract(extractor, text) for text in sample]
+            legacy = (time.perf_counter() - start) * n_jobs / len(sample)
+
+            start = time.perf_counter()
+            got = [extractor.extract_skills(text) for text in jobs]
+            compiled = time.perf_counter() - start
+
+            assert all(set(g) == e for g, e in zip(got, expected)), "matcher output differs from legacy loop"
+            approx = "~" if len(sample) < n_jobs else " "
+            print(f"{n_jobs:>8} {vocab_size:>6} {approx}{legacy:>11.2f} {compiled:>12.2f} {legacy / compiled:>7.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--vocab", type=int, nargs="+", default=[50, 1000, 10000])
+    parser.add_argument("--legacy-limit", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.jobs, args.vocab, args.legacy_limit)
@@ -0,0 +1,198 @@
+"""
+Benchmark suite: times every hot path of the recommendation system on
+synthetic data at several scales and writes the results as JSON.
+
+Usage:
+    python benchmarks/bench_suite.py --output bench_results.json
+    python benchmarks/bench_suite.py --jobs 1000 10000 --students 2000 20000 --repeat 5
+    python benchmarks/bench_suite.py --compare base.json new.json --threshold 0.15
+
+Each scale pairs a --jobs count (raw postings from MockJobScraper) with a
+--students count (ProfileClustering.generate_mock_students); random and
+numpy are seeded per scale, so reruns see the same data. Every benchmark
+runs --repeat times and reports the min and median wall time.
+
+--compare matches benchmarks by (scale, name) and flags a regression when
+the new median is more than --threshold slower than the base median;
+the exit code is 1 when anything regressed.
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+from src.data_collector import MockJobScraper, ShardJobSink
+from src.parser_nlp import SkillExtractor, _read_raw_file, _job_text
+from src.skill_mapper import SkillRoleMapper
+from src.clustering import ProfileClustering, iter_chunks
+from src.cluster_assigner import ClusterAssigner
+from src.trainer import ModelTrainer
+from src.recommender import Recommender
+from src.roadmap import RoadmapGenerator
+from src.artifacts import save_forest_model
+
+ROLES = ["Data Engineer", "Data Scientist", "Backend Engineer", "Frontend Engineer", "DevOps Engineer"]
+
+def timed(func, repeat: int):
+    """
+    Runs `func` `repeat` times; returns (min, median) seconds and its last result.
+    """
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times), result
+
+def run_scale(n_jobs: int, n_students: int, repeat: int, n_requests: int, seed: int):
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.preprocessing import MultiLabelBinarizer
+
+    random.seed(seed)
+    np.random.seed(seed)
+    scale = f"{n_jobs}j_{n_students}s"
+    results = []
+
+    def record(name, func, items):
+        best, median, result = timed(func, repeat)
+        results.append({"scale": scale, "jobs": n_jobs, "students": n_students, "benchmark": name,
+                        "items": items, "repeat": repeat, "seconds_min": best, "seconds_median": median,
+                        "items_per_s": items / median if median else None})
+        print(f"{scale:>14} {name:<20} {items:>8} {best * 1000:>11.2f} {median * 1000:>11.2f}")
+        return result
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # ProfileClustering writes its report under ./reports
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        os.makedirs("reports")
+        try:
+            raw_dir = os.path.join(tmp, "raw")
+            MockJobScraper(raw_dir, sink=ShardJobSink(raw_dir)).scrape(ROLES, count_per_role=max(1, n_jobs // len(ROLES)))
+            jobs = [job for name in sorted(os.listdir(raw_dir)) for job in _read_raw_file(os.path.join(raw_dir, name))]
+            texts = [_job_text(job) for job in jobs]
+            students = ProfileClustering().generate_mock_students(n_students)
+
+            extractor = SkillExtractor(raw_data_dir=raw_dir, output_dir=tmp, embeddings_dir=tmp,
+                                       parsed_dir=tmp, dedup=False)
+            skill_lists = record("skill_extraction", lambda: [extractor.extract_skills(t) for t in texts], len(texts))
+            record("tfidf_fit", lambda: TfidfVectorizer(stop_words='english', max_features=1000).fit_transform(texts),
+                   len(texts))
+
+            mapper = SkillRoleMapper(output_dir=tmp, parsed_store_dir=os.path.join(tmp, "no_store"),
+                                     examples_path=os.path.join(tmp, "examples.json"),
+                                     taxonomy_path=os.path.join(ROOT, "data", "roles", "role_taxonomy.json"))
+            batch = {"id": [job['id'] for job in jobs], "title": [job['title'] for job in jobs],
+                     "extracted_skills": skill_lists}
+            role_skill_df = record("matrix_build", lambda: mapper.build_counts([batch])[0].to_frame(), len(jobs))
+            role_skill_df.to_csv(os.path.join(tmp, "role_skill_matrix.csv"), index=False)
+
+            trainer = ModelTrainer(models_dir=tmp, reports_dir=tmp)
+            labeled = record("label_students", lambda: trainer.label_students(students, role_skill_df), len(students))
+
+            clustering = ProfileClustering(output_dir=tmp)
+            record("kmeans", lambda: clustering.train_clusters(students), len(students))
+            assigner = ClusterAssigner(tmp)
+            record("cluster_assignment", lambda: [assigner.assign(s['skills'], s['cgpa']) for s in students[:n_requests]],
+                   min(n_requests, len(students)))
+            record("kmeans_streaming", lambda: clustering.train_clusters_streaming(iter_chunks(students, 10000)),
+                   len(students))
+
+            mlb = MultiLabelBinarizer()
+            X = mlb.fit_transform([s['skills'] for s in labeled])
+            y = [s['target_role'] for s in labeled]
+            forest = record("forest_training",
+                            lambda: RandomForestClassifier(n_estimators=100, random_state=seed).fit(X, y), len(y))
+            save_forest_model(os.path.join(tmp, "best_model.bundle"), forest, mlb)
+
+            # No prediction cache, so every request runs the forest
+            recommender = Recommender(tmp, cache_size=0)
+            rng = random.Random(seed)
+            pool = list(mlb.classes_)
+            requests = [rng.sample(pool, k=rng.randint(1, min(5, len(pool)))) for _ in range(n_requests)]
+            record("single_inference", lambda: [recommender.recommend(skills) for skills in requests], n_requests)
+            record("batch_inference", lambda: recommender.recommend_batch([s['skills'] for s in students]),
+                   len(students))
+
+            roadmaps = RoadmapGenerator(output_dir=os.path.join(tmp, "roadmaps"))
+            gaps = [(rec.best_role, rec.missing_skills)
+                    for rec in (recommender.recommend(skills) for skills in requests[:len(ROLES) * 4])]
+            record("roadmap_pdf", lambda: [roadmaps.render_pdf(roadmaps.generate_roadmap("bench", role, missing, save=False))
+                                           for role, missing in gaps], len(gaps))
+        finally:
+            os.chdir(cwd)
+    return results
+
+def environment(seed: int) -> dict:
+    import sklearn
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit, "seed": seed,
+            "python": platform.python_version(), "numpy": np.__version__, "sklearn": sklearn.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count()}
+
+def run(job_sizes, student_sizes, repeat: int, n_requests: int, seed: int, output: str):
+    if len(job_sizes) != len(student_sizes):
+        raise SystemExit("--jobs and --students need the same number of values (one pair per scale)")
+    logging.disable(logging.INFO)
+    print(f"{'scale':>14} {'benchmark':<20} {'items':>8} {'min (ms)':>11} {'median (ms)':>11}")
+    results = []
+    for n_jobs, n_students in zip(job_sizes, student_sizes):
+        results.extend(run_scale(n_jobs, n_students, repeat, n_requests, seed))
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({"environment": environment(seed), "results": results}, f, indent=2)
+    print(f"Wrote {len(results)} results to {output}")
+
+def compare(base_path: str, new_path: str, threshold: float) -> int:
+    with open(base_path, 'r', encoding='utf-8') as f:
+        base = {(r["scale"], r["benchmark"]): r for r in json.load(f)["results"]}
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = {(r["scale"], r["benchmark"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"{'scale':>14} {'benchmark':<20} {'base (ms)':>10} {'new (ms)':>10} {'change':>8}")
+    for key in sorted(base.keys() & new.keys()):
+        before, after = base[key]["seconds_median"], new[key]["seconds_median"]
+        change = after / before - 1 if before else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{key[0]:>14} {key[1]:<20} {before * 1000:>10.2f} {after * 1000:>10.2f} {change:>+8.1%}{flag}")
+    for key in sorted(base.keys() ^ new.keys()):
+        print(f"{key[0]:>14} {key[1]:<20} only in {'base' if key in base else 'new'}")
+    print(f"{regressions} regression(s) beyond {threshold:.0%}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--students", type=int, nargs="+", default=[2000, 20000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=500, help="single-inference requests per repeat")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files instead of running")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown that counts as a regression")
+    args = parser.parse_args()
+    if args.compare:
+        sys.exit(compare(*args.compare, args.threshold))
+    run(args.jobs, args.students, args.repeat, args.requests, args.seed, args.output)
@@ -0,0 +1,122 @@
+"""
+Load test for the recommendation HTTP API (src/api.py).
+
+Usage:
+    python benchmarks/load_test_api.py
+    python benchmarks/load_test_api.py --concurrency 1 10 100 --duration 5 --max-wait-ms 0 5
+    python benchmarks/load_test_api.py --url http://127.0.0.1:8000
+
+Without --url, the API is started in a subprocess for every --max-wait-ms
+value (training a throwaway model into a temp dir when --models-dir has
+no trained model). Each client holds a keep-alive connection and sends
+POST /recommend requests back to back for --duration seconds. Reports
+throughput and p50/p99 latency per concurrency level.
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import shutil
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from urllib.parse import urlsplit
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+SKILLS = ["Python", "Java", "SQL", "React", "AWS", "Docker", "Pandas", "PyTorch", "Node.js", "Linux", "Git"]
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def ensure_models(models_dir: str) -> str:
+    from src.artifacts import find_artifact
+    if find_artifact(models_dir, "best_model"):
+        return models_dir
+    from src.trainer import ModelTrainer
+    tmp = tempfile.mkdtemp()
+    if os.path.exists(os.path.join(models_dir, "role_skill_matrix.csv")):
+        shutil.copy(os.path.join(models_dir, "role_skill_matrix.csv"), tmp)
+    ModelTrainer(models_dir=tmp, reports_dir=tmp).train()
+    return tmp
+
+def start_server(models_dir: str, max_wait_ms: float, max_batch: int):
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.api", "--port", str(port), "--models-dir", models_dir,
+         "--max-wait-ms", str(max_wait_ms), "--max-batch", str(max_batch)],
+        cwd=os.path.abspath(os.path.join(os.path.dirname(__file__), '..')),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("API did not start")
+
+async def client(host: str, port: int, stop_at: float, latencies: list, seed: int):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < stop_at:
+            body = json.dumps({"skills": rng.sample(SKILLS, k=rng.randint(1, 5))}).encode()
+            start = time.perf_counter()
+            writer.write(f"POST /recommend HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = next(int(line.split(b":")[1]) for line in head.split(b"\r\n")
+                          if line.lower().startswith(b"content-length"))
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+async def run_level(url: str, concurrency: int, duration: float):
+    parts = urlsplit(url)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(parts.hostname, parts.port, start + duration, latencies, i)
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    ms = np.asarray(latencies) * 1000
+    return len(latencies) / elapsed, np.percentile(ms, 50), np.percentile(ms, 99)
+
+def run(url, models_dir, concurrency_levels, duration, max_waits, max_batch):
+    print(f"{'max_wait_ms':>11} {'clients':>8} {'req/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    targets = [(None, url)] if url else [(w, None) for w in max_waits]
+    for max_wait, target in targets:
+        proc = None
+        if target is None:
+            proc, target = start_server(models_dir, max_wait, max_batch)
+        try:
+            for concurrency in concurrency_levels:
+                rate, p50, p99 = asyncio.run(run_level(target, concurrency, duration))
+                label = "-" if max_wait is None else f"{max_wait:g}"
+                print(f"{label:>11} {concurrency:>8} {rate:>9.0f} {p50:>9.2f} {p99:>9.2f}")
+        finally:
+            if proc is not None:
+                proc.terminate()
+                proc.wait()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="test an already running API instead of starting one")
+    parser.add_argument("--models-dir", default="models")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per concurrency level")
+    parser.add_argument("--max-wait-ms", type=float, nargs="+", default=[0, 5])
+    parser.add_argument("--max-batch", type=int, default=64)
+    args = parser.parse_args()
+    models_dir = args.models_dir if args.url else ensure_models(args.models_dir)
+    run(args.url, models_dir, args.concurrency, args.duration, args.max_wait_ms, args.max_batch)
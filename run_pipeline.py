@@ -1,51 +1,30 @@
-import os
-import subprocess
-import logging
 import sys
+import logging
+import argparse
+from src.pipeline import Pipeline, default_stages
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("Pipeline")
 
-def run_module(module_name, step_name):
-    logger.info(f"Starting {step_name}...")
-    try:
-        # Run as module: python -m src.module_name
-        result = subprocess.run(
-            [sys.executable, "-m", module_name], 
-            check=True, 
-            capture_output=True, 
-            text=True,
-            cwd=os.getcwd() # Ensure CWD is project root
-        )
-        logger.info(f"{step_name} completed successfully.")
-        logger.debug(result.stdout)
-    except subprocess.CalledProcessError as e:
-        logger.error(f"{step_name} failed with error:\n{e.stderr}")
-        logger.error(f"Stdout:\n{e.stdout}")
-        sys.exit(1)
-
 def main():
+    parser = argparse.ArgumentParser(
+        description="Run the end-to-end pipeline. Stages whose inputs and code are unchanged since "
+                    "the last run are skipped; independent stages run concurrently.")
+    parser.add_argument("--force", nargs="+", default=[], metavar="STAGE",
+                        help="rerun these stages even if up to date ('all' for every stage)")
+    parser.add_argument("--workers", type=int, default=4, help="stages run at the same time (1: sequential)")
+    args = parser.parse_args()
+
     logger.info("Starting End-to-End Pipeline...")
-    
-    # 1. Data Collection
-    if not os.path.exists("data/jobs/raw"):
-        run_module("src.data_collector", "Data Collection")
-    else:
-        logger.info("Data Collection skipped (raw data exists).")
+    report = Pipeline(default_stages(), workers=args.workers).run(force=args.force)
+    for name, stage in report["stages"].items():
+        timing = f" in {stage['seconds']:.2f}s, peak RSS {stage['peak_rss_mb']:.0f} MB" if stage["status"] == "ran" else ""
+        logger.info(f"{name}: {stage['status']}{timing}")
+    if any(stage["status"] in ("failed", "blocked") for stage in report["stages"].values()):
+        logger.error("Pipeline failed; see reports/pipeline_run.json")
+        sys.exit(1)
 
-    # 2. Parsing & NLP
-    run_module("src.parser_nlp", "Parsing & NLP")
-    
-    # 3. Skill-Role Mapping
-    run_module("src.skill_mapper", "Skill-Role Mapping")
-    
-    # 4. Profile Clustering
-    run_module("src.clustering", "Profile Clustering")
-    
-    # 5. Model Training
-    run_module("src.trainer", "Model Training")
-    
     logger.info("Pipeline finished successfully! You can now run the UI.")
     logger.info("Run: streamlit run ui/app.py")
 
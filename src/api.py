@@ -0,0 +1,240 @@
+import json
+import time
+import asyncio
+import logging
+import argparse
+from typing import List, Dict, Tuple, Optional
+from collections import deque
+import numpy as np
+from src.recommender import Recommender
+from src.serving import SERVING_FORMS
+from src.roadmap import RoadmapGenerator
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("RecommendationAPI")
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+MAX_BODY_BYTES = 1 << 20
+
+class MicroBatcher:
+    """
+    Coalesces concurrent recommendation requests into one
+    `Recommender.recommend_batch` call.
+
+    A batch is flushed when `max_batch` requests are waiting or
+    `max_wait_ms` after its first request arrived, whichever comes first.
+    Scoring runs in a worker thread so the event loop keeps accepting
+    requests while a batch is in flight.
+    """
+    def __init__(self, recommender: Recommender, max_batch: int = 64, max_wait_ms: float = 5.0):
+        self.recommender = recommender
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batch_sizes = deque(maxlen=10000)
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, skills: List[str], k: int) -> Dict[str, list]:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((skills, k, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[List[str], int, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Take whatever else is already queued without waiting
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            self.batch_sizes.append(len(batch))
+            skill_lists = [skills for skills, _, _ in batch]
+            k = max(k for _, k, _ in batch)
+            try:
+                columns = await loop.run_in_executor(None, self.recommender.recommend_batch, skill_lists, k)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for i, (_, k_i, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result({
+                        "top_roles": columns["top_roles"][i][:k_i],
+                        "top_scores": columns["top_scores"][i][:k_i],
+                        "matched_skills": columns["matched_skills"][i],
+                        "missing_skills": columns["missing_skills"][i],
+                    })
+
+class RecommendationAPI:
+    """
+    Minimal asyncio HTTP/1.1 service around the trained artifacts.
+
+    POST /recommend  {"skills": [...], "k": 3, "student_id": "..."}
+                     -> top roles with scores, matched/missing skills and a roadmap
+    GET  /health     -> {"status": "ok"}
+    GET  /stats      -> request latency percentiles and micro-batch sizes
+
+    Connections are kept alive, and model inference goes through a
+    MicroBatcher.
+    """
+    def __init__(self, models_dir: str = "models", max_batch: int = 64, max_wait_ms: float = 5.0,
+                 default_k: int = 3, serving: str = "forest"):
+        self.recommender = Recommender(models_dir, serving=serving)
+        self.batcher = MicroBatcher(self.recommender, max_batch, max_wait_ms)
+        self.roadmaps = RoadmapGenerator()
+        self.default_k = default_k
+        self.latencies = deque(maxlen=10000)
+        self._server = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8000) -> "RecommendationAPI":
+        self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        logger.info(f"Serving recommendations on http://{host}:{self.port}")
+        return self
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.batcher.stop()
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8000):
+        await self.start(host, port)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def recommend(self, profile: Dict) -> Dict:
+        skills = profile.get("skills")
+        if not isinstance(skills, list) or not all(isinstance(s, str) for s in skills):
+            raise ValueError("'skills' must be a list of strings")
+        k = int(profile.get("k", self.default_k))
+        if k < 1:
+            raise ValueError("'k' must be at least 1")
+        result = await self.batcher.submit(skills, k)
+        best_role = result["top_roles"][0]
+        roadmap = self.roadmaps.generate_roadmap(str(profile.get("student_id", "anonymous")), best_role,
+                                                 result["missing_skills"], save=False)
+        return {
+            "top_roles": [{"role": role, "score": score}
+                          for role, score in zip(result["top_roles"], result["top_scores"])],
+            "matched_skills": result["matched_skills"],
+            "missing_skills": result["missing_skills"],
+            "roadmap": roadmap,
+        }
+
+    def stats(self) -> Dict:
+        stats = {"requests": len(self.latencies)}
+        if self.latencies:
+            ms = np.asarray(self.latencies) * 1000
+            stats.update(p50_ms=float(np.percentile(ms, 50)), p99_ms=float(np.percentile(ms, 99)))
+        if self.batcher.batch_sizes:
+            stats["mean_batch_size"] = float(np.mean(self.batcher.batch_sizes))
+        return stats
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        if path == "/recommend":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                profile = json.loads(body or b"{}")
+                if not isinstance(profile, dict):
+                    raise ValueError("body must be a JSON object")
+                return 200, await self.recommend(profile)
+            except (ValueError, TypeError) as e:
+                return 400, {"error": str(e)}
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/stats":
+            return 200, self.stats()
+        return 404, {"error": f"no route for {path}"}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                start = time.perf_counter()
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY_BYTES:
+                    status, payload = 413, {"error": "request body too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    try:
+                        status, payload = await self._route(method, target.split("?", 1)[0], body)
+                    except Exception:
+                        logger.exception("Unhandled error")
+                        status, payload = 500, {"error": "internal error"}
+                    keep_alive = headers.get("connection", "").lower() != "close"
+
+                data = json.dumps(payload).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+                if target.startswith("/recommend"):
+                    self.latencies.append(time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (ValueError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Serve role recommendations over HTTP.")
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8000)
+    arg_parser.add_argument("--models-dir", default="models")
+    arg_parser.add_argument("--max-batch", type=int, default=64)
+    arg_parser.add_argument("--max-wait-ms", type=float, default=5.0, help="longest a request waits for its micro-batch to fill")
+    arg_parser.add_argument("--serving", choices=SERVING_FORMS, default="forest", help="scoring form")
+    args = arg_parser.parse_args()
+    api = RecommendationAPI(args.models_dir, args.max_batch, args.max_wait_ms, serving=args.serving)
+    asyncio.run(api.serve_forever(args.host, args.port))
@@ -0,0 +1,461 @@
+import os
+import sys
+import json
+import time
+import pickle
+import hashlib
+import shutil
+import logging
+import argparse
+from typing import Dict, List, Optional, Any
+import numpy as np
+from scipy import sparse
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Artifacts")
+
+# Bump when the on-disk layout changes; loaders refuse newer bundles
+FORMAT_VERSION = 1
+BUNDLE_SUFFIX = ".bundle"
+
+def library_versions() -> Dict[str, str]:
+    """
+    Versions of the libraries models are rebuilt with. Loaders set private
+    sklearn state (Tree.__setstate__, KMeans._n_threads), so a bundle is
+    only read under the major.minor versions it was written with.
+    """
+    versions = {"numpy": np.__version__}
+    try:
+        import sklearn
+        versions["sklearn"] = sklearn.__version__
+    except ImportError:
+        pass
+    return versions
+
+def _major_minor(version: str) -> List[str]:
+    return version.split(".")[:2]
+
+def save_bundle(path: str, kind: str, metadata: Optional[Dict] = None, arrays: Optional[Dict[str, np.ndarray]] = None,
+                matrices: Optional[Dict[str, sparse.spmatrix]] = None, documents: Optional[Dict[str, Any]] = None):
+    """
+    Writes an artifact bundle directory:
+
+        manifest.json      format version, library versions, kind, small metadata,
+                           component index
+        <name>.npy         dense arrays (memory-mappable)
+        <name>.{data,indices,indptr}.npy   CSR matrices, one .npy per buffer
+        <name>.json        larger JSON documents (vocabularies, id lists)
+
+    The bundle is built next to `path` and swapped in when complete.
+    """
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        shutil.rmtree(tmp_path)
+    os.makedirs(tmp_path)
+
+    components = {}
+    for name, array in (arrays or {}).items():
+        array = np.asarray(array)
+        np.save(os.path.join(tmp_path, f"{name}.npy"), array, allow_pickle=False)
+        components[name] = {"type": "array", "shape": list(array.shape), "dtype": str(array.dtype)}
+    for name, matrix in (matrices or {}).items():
+        matrix = sparse.csr_matrix(matrix)
+        for part in ("data", "indices", "indptr"):
+            np.save(os.path.join(tmp_path, f"{name}.{part}.npy"), getattr(matrix, part), allow_pickle=False)
+        components[name] = {"type": "csr", "shape": list(matrix.shape), "nnz": int(matrix.nnz)}
+    for name, document in (documents or {}).items():
+        with open(os.path.join(tmp_path, f"{name}.json"), 'w', encoding='utf-8') as f:
+            json.dump(document, f)
+        components[name] = {"type": "json"}
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "libraries": library_versions(),
+        "kind": kind,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "metadata": metadata or {},
+        "components": components,
+    }
+    with open(os.path.join(tmp_path, "manifest.json"), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+    logger.info(f"Saved {kind} bundle to {path}")
+
+class ArtifactBundle:
+    """
+    Read side of a bundle. Opening it only parses manifest.json; each
+    component is loaded on first access and cached. Arrays and CSR buffers
+    are memory-mapped read-only, so untouched components cost nothing and
+    touched ones are paged in from the OS cache.
+    """
+    def __init__(self, path: str, mmap: bool = True):
+        self.path = path
+        self.mmap_mode = 'r' if mmap else None
+        with open(os.path.join(path, "manifest.json"), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("format_version", 0) > FORMAT_VERSION:
+            raise ValueError(f"{path} uses artifact format {manifest['format_version']}, "
+                             f"this code reads up to {FORMAT_VERSION}")
+        self.libraries = manifest.get("libraries")
+        self._check_libraries()
+        self.kind = manifest["kind"]
+        self.metadata = manifest["metadata"]
+        self.components = manifest["components"]
+        self._cache = {}
+
+    def _check_libraries(self):
+        if self.libraries is None:
+            logger.warning(f"{self.path} does not record library versions; re-save it if loading fails")
+            return
+        installed = library_versions()
+        for name, version in self.libraries.items():
+            if name in installed and _major_minor(version) != _major_minor(installed[name]):
+                raise ValueError(f"{self.path} was written with {name} {version} but {name} {installed[name]} "
+                                 f"is installed; re-save it (retrain or re-export) under {name} {installed[name]}")
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return os.path.exists(os.path.join(path, "manifest.json"))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.components
+
+    def get(self, name: str):
+        if name not in self._cache:
+            self._cache[name] = self._load(name)
+        return self._cache[name]
+
+    def _load(self, name: str):
+        component = self.components[name]
+        if component["type"] == "array":
+            return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode=self.mmap_mode, allow_pickle=False)
+        if component["type"] == "csr":
+            data, indices, indptr = (
+                np.load(os.path.join(self.path, f"{name}.{part}.npy"), mmap_mode=self.mmap_mode, allow_pickle=False)
+                for part in ("data", "indices", "indptr"))
+            return sparse.csr_matrix((data, indices, indptr), shape=tuple(component["shape"]), copy=False)
+        with open(os.path.join(self.path, f"{name}.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+def find_artifact(directory: str, name: str) -> Optional[str]:
+    """
+    Path of the `name` artifact in `directory`: the bundle when there is
+    one, else a legacy `name.pkl`, else None.
+    """
+    bundle_path = os.path.join(directory, name + BUNDLE_SUFFIX)
+    if ArtifactBundle.exists(bundle_path):
+        return bundle_path
+    pickle_path = os.path.join(directory, name + ".pkl")
+    return pickle_path if os.path.exists(pickle_path) else None
+
+def artifact_version(path: str) -> str:
+    """
+    Short id that changes whenever the artifact at `path` is rewritten:
+    a hash of the bundle manifest (which records its creation time), or
+    of a legacy pickle's size and mtime.
+    """
+    if os.path.isdir(path):
+        with open(os.path.join(path, "manifest.json"), 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()[:12]
+    stat = os.stat(path)
+    return hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+
+def _json_params(params: Dict) -> Dict:
+    """
+    Estimator params that survive a JSON round trip; numpy dtypes are kept
+    by name, callables and other objects are dropped.
+    """
+    kept = {}
+    for key, value in params.items():
+        if isinstance(value, type) and issubclass(value, np.generic):
+            kept[key] = {"dtype": np.dtype(value).name}
+        elif value is None or isinstance(value, (str, int, float, bool)):
+            kept[key] = value
+        elif isinstance(value, (list, tuple)) and all(isinstance(v, (str, int, float)) for v in value):
+            kept[key] = list(value)
+    return kept
+
+def _restore_params(params: Dict) -> Dict:
+    restored = {}
+    for key, value in params.items():
+        if isinstance(value, dict) and "dtype" in value:
+            value = getattr(np, value["dtype"])
+        elif key == "ngram_range":
+            value = tuple(value)
+        restored[key] = value
+    return restored
+
+# Trained classifier: a forest, linear model or XGBoost + MultiLabelBinarizer vocabulary
+
+FOREST_CLASSES = {"RandomForestClassifier": ("RandomForestClassifier", "DecisionTreeClassifier"),
+                  "ExtraTreesClassifier": ("ExtraTreesClassifier", "ExtraTreeClassifier")}
+
+def save_forest_model(path: str, model, mlb):
+    trees = [estimator.tree_.__getstate__() for estimator in model.estimators_]
+    metadata = {
+        "estimator": type(model).__name__,
+        "params": _json_params(model.get_params()),
+        "classes": [str(c) for c in model.classes_],
+        "mlb_classes": [str(c) for c in mlb.classes_],
+        "n_features_in": int(model.n_features_in_),
+        "n_outputs": int(model.n_outputs_),
+        "tree_max_depth": [int(state["max_depth"]) for state in trees],
+        "tree_max_features": [int(estimator.max_features_) for estimator in model.estimators_],
+    }
+    # All trees' node tables and leaf values end to end, split by `tree_offsets`
+    node_counts = [int(state["node_count"]) for state in trees]
+    save_bundle(path, "forest_model", metadata, arrays={
+        "nodes": np.concatenate([state["nodes"] for state in trees]),
+        "values": np.concatenate([state["values"] for state in trees]),
+        "tree_offsets": np.concatenate([[0], np.cumsum(node_counts)]).astype(np.int64),
+    })
+
+def load_forest(bundle: ArtifactBundle):
+    """
+    Rebuilds the fitted RandomForestClassifier (or ExtraTreesClassifier)
+    from its node arrays.
+    """
+    from sklearn import ensemble, tree as sklearn_tree
+    from sklearn.tree._tree import Tree
+
+    meta = bundle.metadata
+    forest_name, tree_name = FOREST_CLASSES[meta.get("estimator", "RandomForestClassifier")]
+    DecisionTreeClassifier = getattr(sklearn_tree, tree_name)
+    n_classes = len(meta["classes"])
+    model = getattr(ensemble, forest_name)(**_restore_params(meta["params"]))
+    nodes, values, offsets = bundle.get("nodes"), bundle.get("values"), bundle.get("tree_offsets")
+    tree_params = {key: getattr(model, key) for key in model.estimator_params}
+    estimators = []
+    for i in range(len(offsets) - 1):
+        start, end = offsets[i], offsets[i + 1]
+        tree = Tree(meta["n_features_in"], np.array([n_classes], dtype=np.intp), meta["n_outputs"])
+        tree.__setstate__({"max_depth": meta["tree_max_depth"][i], "node_count": int(end - start),
+                           "nodes": np.ascontiguousarray(nodes[start:end]),
+                           "values": np.ascontiguousarray(values[start:end])})
+        estimator = DecisionTreeClassifier(**tree_params)
+        estimator.n_features_in_ = meta["n_features_in"]
+        estimator.n_outputs_ = meta["n_outputs"]
+        estimator.classes_ = np.arange(n_classes, dtype=np.float64)
+        estimator.n_classes_ = n_classes
+        estimator.max_features_ = meta["tree_max_features"][i]
+        estimator.tree_ = tree
+        estimators.append(estimator)
+    model.estimator_ = DecisionTreeClassifier(**tree_params)
+    model.estimators_ = estimators
+    model.n_features_in_ = meta["n_features_in"]
+    model.n_outputs_ = meta["n_outputs"]
+    model.classes_ = np.array(meta["classes"], dtype=object)
+    model.n_classes_ = n_classes
+    return model
+
+def save_linear_model(path: str, model, mlb):
+    save_bundle(path, "linear_model", {
+        "estimator": type(model).__name__,
+        "params": _json_params(model.get_params()),
+        "classes": [str(c) for c in model.classes_],
+        "mlb_classes": [str(c) for c in mlb.classes_],
+    }, arrays={"coef": model.coef_, "intercept": model.intercept_})
+
+def load_linear_model(bundle: ArtifactBundle):
+    """
+    Rebuilds the fitted LogisticRegression from its coefficients.
+    """
+    from sklearn.linear_model import LogisticRegression
+
+    meta = bundle.metadata
+    model = LogisticRegression(**_restore_params(meta["params"]))
+    model.coef_ = np.array(bundle.get("coef"))
+    model.intercept_ = np.array(bundle.get("intercept"))
+    model.classes_ = np.array(meta["classes"], dtype=object)
+    model.n_features_in_ = model.coef_.shape[1]
+    return model
+
+def save_xgboost_model(path: str, model, mlb):
+    save_bundle(path, "xgboost_model", {
+        "params": _json_params(model.get_params()),
+        "classes": [str(c) for c in model.classes_],
+        "mlb_classes": [str(c) for c in mlb.classes_],
+    }, documents={"booster": json.loads(bytes(model.get_booster().save_raw("json")))})
+
+def load_xgboost_model(bundle: ArtifactBundle):
+    """
+    Rebuilds the XGBClassifier from its JSON booster. Class names replace
+    the integer labels it was trained on (same order).
+    """
+    from xgboost import XGBClassifier
+
+    meta = bundle.metadata
+    model = XGBClassifier(**_restore_params(meta["params"]))
+    model.load_model(bytearray(json.dumps(bundle.get("booster")).encode()))
+    model.classes_ = np.array(meta["classes"], dtype=object)
+    return model
+
+MODEL_LOADERS = {"forest_model": load_forest, "linear_model": load_linear_model, "xgboost_model": load_xgboost_model}
+
+def save_classifier(path: str, model, mlb):
+    """
+    Writes any model family ModelSearch can select as a bundle.
+    """
+    if hasattr(model, "estimators_"):
+        save_forest_model(path, model, mlb)
+    elif hasattr(model, "coef_"):
+        save_linear_model(path, model, mlb)
+    elif hasattr(model, "get_booster"):
+        save_xgboost_model(path, model, mlb)
+    else:
+        raise TypeError(f"No bundle format for {type(model).__name__}")
+
+def load_model_artifacts(path: str) -> Dict:
+    """
+    {"model", "mlb_classes", "classes"} from a classifier bundle or a
+    legacy best_model.pkl.
+    """
+    if path.endswith(".pkl"):
+        with open(path, 'rb') as f:
+            model_data = pickle.load(f)
+        return {"model": model_data["model"], "mlb_classes": list(model_data["mlb"].classes_),
+                "classes": list(model_data["model"].classes_)}
+    bundle = ArtifactBundle(path)
+    return {"model": MODEL_LOADERS[bundle.kind](bundle), "mlb_classes": bundle.metadata["mlb_classes"],
+            "classes": bundle.metadata["classes"]}
+
+# Clustering model: KMeans + StandardScaler + MultiLabelBinarizer vocabulary
+
+CLUSTER_PROFILE_ARRAYS = ("cluster_sizes", "cluster_cgpa_sums", "cluster_skill_counts")
+
+def save_cluster_model(path: str, kmeans, scaler, mlb, feature_names: List[str],
+                       profiles: Optional[Dict[str, np.ndarray]] = None):
+    """
+    `profiles` holds optional per-cluster arrays computed at training time
+    (cluster_sizes, cluster_cgpa_sums, cluster_skill_counts).
+    """
+    metadata = {
+        "params": _json_params(kmeans.get_params()),
+        "mlb_classes": [str(c) for c in mlb.classes_],
+        "feature_names": list(feature_names),
+        "scaler_feature_names": [str(c) for c in getattr(scaler, "feature_names_in_", [])],
+        "estimator": type(kmeans).__name__,
+        "inertia": float(kmeans.inertia_),
+        "n_iter": int(getattr(kmeans, "n_iter_", getattr(kmeans, "n_steps_", 0))),
+        "n_samples": int(scaler.n_samples_seen_),
+    }
+    arrays = {
+        "cluster_centers": kmeans.cluster_centers_,
+        "scaler_mean": scaler.mean_,
+        "scaler_scale": scaler.scale_,
+        "scaler_var": scaler.var_,
+    }
+    arrays.update(profiles or {})
+    # Mini-batch models are fit on chunks and never hold every label
+    if metadata["estimator"] == "KMeans":
+        arrays["labels"] = kmeans.labels_
+    save_bundle(path, "cluster_model", metadata, arrays=arrays)
+
+def load_cluster_model(bundle: ArtifactBundle) -> Dict:
+    """
+    Rebuilds {"kmeans", "mlb", "scaler", "feature_names"}, the same shape as
+    the legacy kmeans_cluster_model.pkl, plus "profiles": whichever
+    CLUSTER_PROFILE_ARRAYS the bundle holds.
+    """
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    from sklearn.preprocessing import MultiLabelBinarizer, StandardScaler
+    from sklearn.utils._openmp_helpers import _openmp_effective_n_threads
+
+    meta = bundle.metadata
+    estimator = MiniBatchKMeans if meta.get("estimator") == "MiniBatchKMeans" else KMeans
+    kmeans = estimator(**_restore_params(meta["params"]))
+    kmeans.cluster_centers_ = np.array(bundle.get("cluster_centers"))
+    if "labels" in bundle.components:
+        kmeans.labels_ = bundle.get("labels")
+    kmeans.inertia_ = meta["inertia"]
+    kmeans.n_iter_ = meta["n_iter"]
+    kmeans.n_features_in_ = kmeans.cluster_centers_.shape[1]
+    kmeans._n_features_out = kmeans.cluster_centers_.shape[0]
+    kmeans._n_threads = _openmp_effective_n_threads()
+
+    scaler = StandardScaler()
+    scaler.mean_ = np.array(bundle.get("scaler_mean"))
+    scaler.scale_ = np.array(bundle.get("scaler_scale"))
+    scaler.var_ = np.array(bundle.get("scaler_var"))
+    scaler.n_features_in_ = len(scaler.mean_)
+    scaler.n_samples_seen_ = meta.get("n_samples") or len(kmeans.labels_)
+    if meta.get("scaler_feature_names"):
+        scaler.feature_names_in_ = np.array(meta["scaler_feature_names"], dtype=object)
+
+    mlb = MultiLabelBinarizer(classes=meta["mlb_classes"]).fit([])
+    profiles = {name: np.array(bundle.get(name)) for name in CLUSTER_PROFILE_ARRAYS if name in bundle.components}
+    return {"kmeans": kmeans, "mlb": mlb, "scaler": scaler, "feature_names": meta["feature_names"],
+            "profiles": profiles}
+
+def load_cluster_artifacts(path: str) -> Dict:
+    """
+    load_cluster_model's dict from a cluster bundle or a legacy
+    kmeans_cluster_model.pkl (which has no per-cluster profiles).
+    """
+    if path.endswith(".pkl"):
+        with open(path, 'rb') as f:
+            model_data = pickle.load(f)
+        return {**model_data, "profiles": {}}
+    return load_cluster_model(ArtifactBundle(path))
+
+# Job TF-IDF: vectorizer (params + idf + vocabulary) kept apart from the matrix
+
+def save_tfidf(path: str, vectorizer, matrix: sparse.spmatrix, job_ids: List[str]):
+    save_bundle(path, "tfidf", {"params": _json_params(vectorizer.get_params()), "n_jobs": len(job_ids)},
+                arrays={"idf": vectorizer.idf_},
+                matrices={"matrix": matrix},
+                documents={"vocabulary": {term: int(i) for term, i in vectorizer.vocabulary_.items()},
+                           "job_ids": list(job_ids)})
+
+def load_vectorizer(bundle: ArtifactBundle):
+    """
+    Rebuilds the fitted TfidfVectorizer without touching the matrix.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(**_restore_params(bundle.metadata["params"]))
+    vectorizer.vocabulary_ = bundle.get("vocabulary")
+    vectorizer.idf_ = np.array(bundle.get("idf"))
+    return vectorizer
+
+def convert_pickles(models_dir: str = "models", embeddings_dir: str = "data/embeddings"):
+    """
+    Writes bundles next to existing legacy pickles.
+    """
+    converted = []
+    path = os.path.join(models_dir, "best_model.pkl")
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        save_forest_model(os.path.join(models_dir, "best_model" + BUNDLE_SUFFIX), data["model"], data["mlb"])
+        converted.append(path)
+    path = os.path.join(models_dir, "kmeans_cluster_model.pkl")
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        save_cluster_model(os.path.join(models_dir, "kmeans_cluster_model" + BUNDLE_SUFFIX),
+                           data["kmeans"], data["scaler"], data["mlb"], data["feature_names"])
+        converted.append(path)
+    path = os.path.join(embeddings_dir, "job_tfidf.pkl")
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+        save_tfidf(os.path.join(embeddings_dir, "job_tfidf" + BUNDLE_SUFFIX),
+                   data["vectorizer"], data["matrix"], data["job_ids"])
+        converted.append(path)
+    return converted
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Convert legacy pickled artifacts to bundles.")
+    arg_parser.add_argument("--models-dir", default="models")
+    arg_parser.add_argument("--embeddings-dir", default="data/embeddings")
+    args = arg_parser.parse_args()
+    converted = convert_pickles(args.models_dir, args.embeddings_dir)
+    if not converted:
+        logger.warning("No legacy pickles found.")
+        sys.exit(1)
+    logger.info(f"Converted {len(converted)} artifacts: {converted}")
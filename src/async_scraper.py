@@ -0,0 +1,319 @@
+import time
+import html
+import random
+import asyncio
+import logging
+import threading
+from typing import List, Dict, Optional
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, urlencode, parse_qs, quote
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from src.data_collector import JobScraper, JobSink, MockJobScraper
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("AsyncScraper")
+
+# Responses worth retrying; anything else >= 400 is a hard failure
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class HostRateLimiter:
+    """
+    Spaces requests to the same host at least 1 / `rate` seconds apart.
+    """
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._locks = defaultdict(asyncio.Lock)
+        self._next_slot = defaultdict(float)
+
+    async def wait(self, host: str):
+        if not self.interval:
+            return
+        async with self._locks[host]:
+            loop = asyncio.get_running_loop()
+            delay = self._next_slot[host] - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_slot[host] = loop.time() + self.interval
+
+class AsyncJobScraper(JobScraper):
+    """
+    Base class for scrapers that fetch job pages concurrently.
+
+    Subclasses implement `discover` (job page URLs for a role) and
+    `parse_job` (HTML -> job dict). Fetches run on `concurrency` I/O
+    threads, each with its own pooled HTTP session (requests does not
+    guarantee a Session is thread-safe), and are bounded by a global
+    semaphore and a per-host rate limit (`per_host_rate` requests/second).
+    Failed or throttled requests are retried with exponential backoff; a
+    role whose discovery fails is logged and skipped. Parsing runs in a
+    worker pool so it never blocks the event loop.
+    """
+    def __init__(self, raw_data_dir: str = "data/jobs/raw", sink: Optional[JobSink] = None,
+                 concurrency: int = 16, per_host_rate: float = 10.0, max_retries: int = 3,
+                 backoff: float = 0.5, timeout: float = 10.0, parse_workers: int = 4):
+        super().__init__(raw_data_dir, sink)
+        self.concurrency = concurrency
+        self.per_host_rate = per_host_rate
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.parse_workers = parse_workers
+        self.stats = defaultdict(int)
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        The calling thread's HTTP session, created on first use.
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            # One request at a time per thread; keep-alive connections to a few hosts
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=1)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def _close_sessions(self):
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+        self._local = threading.local()
+
+    async def discover(self, role: str, count: int) -> List[str]:
+        """
+        Returns up to `count` job page URLs for `role`.
+        """
+        raise NotImplementedError("Subclasses must implement discover method")
+
+    def parse_job(self, page: str, url: str) -> Optional[Dict]:
+        """
+        Turns a job page into a job dict. Runs outside the event loop.
+        """
+        raise NotImplementedError("Subclasses must implement parse_job method")
+
+    async def fetch(self, url: str) -> str:
+        host = urlsplit(url).netloc
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            async with self._semaphore:
+                await self._rate_limiter.wait(host)
+                self.stats["requests"] += 1
+                try:
+                    response = await loop.run_in_executor(
+                        self._io_pool, lambda: self.session.get(url, timeout=self.timeout))
+                    if response.status_code not in RETRY_STATUSES:
+                        response.raise_for_status()
+                        return response.text
+                    error = f"HTTP {response.status_code}"
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = str(e)
+            if attempt == self.max_retries:
+                break
+            self.stats["retries"] += 1
+            # Back off outside the semaphore so other fetches keep going
+            await asyncio.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+        raise RuntimeError(f"Giving up on {url} after {self.max_retries + 1} attempts: {error}")
+
+    async def parse(self, page: str, url: str) -> Optional[Dict]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._parse_pool, self.parse_job, page, url)
+
+    async def _discover_role(self, role: str, count: int) -> List[str]:
+        try:
+            return await self.discover(role, count)
+        except Exception as e:
+            logger.warning(f"Discovery failed for {role}: {e}")
+            self.stats["discovery_failed"] += 1
+            return []
+
+    async def _scrape_job(self, url: str, source: str) -> bool:
+        try:
+            job = await self.parse(await self.fetch(url), url)
+        except Exception as e:
+            # One bad page (network or parser) must not cancel the whole gather
+            logger.warning(f"Failed to scrape {url}: {e}")
+            self.stats["failed"] += 1
+            return False
+        if job is None:
+            return False
+        self.save_raw_job(job, source)
+        self.stats["saved"] += 1
+        return True
+
+    async def scrape_async(self, roles: List[str], count_per_role: int = 10, source: str = "scraped") -> int:
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._rate_limiter = HostRateLimiter(self.per_host_rate)
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(self.concurrency) as self._io_pool, \
+                    ThreadPoolExecutor(self.parse_workers) as self._parse_pool:
+                url_lists = await asyncio.gather(*(self._discover_role(role, count_per_role) for role in roles))
+                urls = [url for url_list in url_lists for url in url_list]
+                logger.info(f"Discovered {len(urls)} job pages for roles: {roles}")
+                results = await asyncio.gather(*(self._scrape_job(url, source) for url in urls))
+        finally:
+            self._close_sessions()
+        self.sink.close()
+
+        elapsed = time.perf_counter() - start
+        saved = sum(results)
+        logger.info(f"Scraped {saved}/{len(urls)} jobs in {elapsed:.2f}s "
+                    f"({saved / elapsed if elapsed else 0:.1f} jobs/s, {self.stats['retries']} retries)")
+        return saved
+
+    def scrape(self, roles: List[str], count_per_role: int = 10):
+        return asyncio.run(self.scrape_async(roles, count_per_role))
+
+class FixtureJobBoard:
+    """
+    Local job board for offline scraping: serves a paginated listing per
+    role and one HTML page per job from a background HTTP server.
+
+    `latency` adds a per-request delay, `fail_first` answers the first
+    request for every job page with a 503, and `request_log` records
+    (time, path) for each request so politeness limits can be checked.
+    """
+    def __init__(self, jobs_by_role: Dict[str, List[Dict]], page_size: int = 20,
+                 latency: float = 0.0, fail_first: bool = False):
+        self.jobs_by_role = jobs_by_role
+        self.jobs = {job["id"]: job for jobs in jobs_by_role.values() for job in jobs}
+        self.page_size = page_size
+        self.latency = latency
+        self.fail_first = fail_first
+        self.request_log = []
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FixtureJobBoard":
+        board = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, body = board._handle(self.path)
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _handle(self, path: str):
+        with self._lock:
+            self.request_log.append((time.monotonic(), path))
+        if self.latency:
+            time.sleep(self.latency)
+        parts = urlsplit(path)
+        if parts.path == "/jobs":
+            query = parse_qs(parts.query)
+            jobs = self.jobs_by_role.get(query.get("role", [""])[0], [])
+            page = int(query.get("page", ["0"])[0])
+            links = "".join(f'<li><a class="job-link" href="/job/{quote(job["id"])}">{html.escape(job["title"])}</a></li>'
+                            for job in jobs[page * self.page_size:(page + 1) * self.page_size])
+            return 200, f"<html><body><ul>{links}</ul></body></html>"
+        if parts.path.startswith("/job/"):
+            job = self.jobs.get(parts.path[len("/job/"):])
+            if job is None:
+                return 404, "<html><body>Not found</body></html>"
+            with self._lock:
+                first_visit = job["id"] not in self._seen
+                self._seen.add(job["id"])
+            if self.fail_first and first_visit:
+                return 503, "<html><body>Try again</body></html>"
+            fields = "".join(f'<div class="{key}">{html.escape(str(job[key]))}</div>'
+                             for key in ("title", "company", "location", "description", "posted_date"))
+            return 200, f'<html><body><article id="{html.escape(job["id"])}">{fields}</article></body></html>'
+        return 404, "<html><body>Not found</body></html>"
+
+def _job_links(listing: str) -> List[str]:
+    return [a["href"] for a in BeautifulSoup(listing, "html.parser").select("a.job-link")]
+
+class AsyncMockJobScraper(AsyncJobScraper, MockJobScraper):
+    """
+    Async counterpart of MockJobScraper: scrapes mock jobs over HTTP from a
+    FixtureJobBoard, starting one populated with generated jobs when no
+    board is given.
+    """
+    def __init__(self, raw_data_dir: str = "data/jobs/raw", sink: Optional[JobSink] = None,
+                 board: Optional[FixtureJobBoard] = None, **kwargs):
+        super().__init__(raw_data_dir, sink, **kwargs)
+        self.board = board
+
+    async def discover(self, role: str, count: int) -> List[str]:
+        urls = []
+        page = 0
+        while len(urls) < count:
+            listing = await self.fetch(f"{self.board.base_url}/jobs?{urlencode({'role': role, 'page': page})}")
+            # Listing pages are parsed in the parse pool, like job pages
+            links = await asyncio.get_running_loop().run_in_executor(self._parse_pool, _job_links, listing)
+            if not links:
+                break
+            urls.extend(self.board.base_url + link for link in links)
+            page += 1
+        return urls[:count]
+
+    def parse_job(self, page: str, url: str) -> Optional[Dict]:
+        article = BeautifulSoup(page, "html.parser").find("article")
+        if article is None:
+            return None
+        job = {"id": article["id"]}
+        for key in ("title", "company", "location", "description", "posted_date"):
+            node = article.find(class_=key)
+            job[key] = node.get_text() if node else ""
+        job["source"] = "mock_board"
+        job["url"] = url
+        return job
+
+    async def scrape_async(self, roles: List[str], count_per_role: int = 10, source: str = "mock") -> int:
+        if self.board is not None:
+            return await super().scrape_async(roles, count_per_role, source)
+        with FixtureJobBoard({role: [self.generate_job(role) for _ in range(count_per_role)] for role in roles}) as board:
+            self.board = board
+            try:
+                return await super().scrape_async(roles, count_per_role, source)
+            finally:
+                self.board = None
+
+if __name__ == "__main__":
+    scraper = AsyncMockJobScraper()
+    target_roles = ["Data Engineer", "Data Scientist", "Backend Engineer", "Frontend Engineer", "DevOps Engineer"]
+    scraper.scrape(target_roles, count_per_role=20)
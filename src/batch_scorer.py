@@ -0,0 +1,137 @@
+import os
+import re
+import json
+import time
+import logging
+from typing import List, Dict, Iterator, Optional
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.recommender import Recommender
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("BatchScorer")
+
+_SKILL_SEPARATORS = re.compile(r'\s*[;,|]\s*')
+
+def parse_skills(value) -> List[str]:
+    """
+    Skills from a CSV cell: a JSON list or a ;/,/| separated string.
+    """
+    if isinstance(value, list):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return []
+    value = value.strip()
+    if value.startswith('['):
+        return json.loads(value)
+    return [s for s in _SKILL_SEPARATORS.split(value) if s]
+
+def iter_student_chunks(path: str, chunk_size: int) -> Iterator[Dict[str, list]]:
+    """
+    Streams a CSV or JSONL export as {"id": [...], "skills": [[...], ...]}
+    chunks of `chunk_size` students. Students without an id get their row
+    number.
+    """
+    row = 0
+    if path.endswith('.csv'):
+        for frame in pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False):
+            ids = frame['id'].tolist() if 'id' in frame else [str(row + i) for i in range(len(frame))]
+            yield {"id": ids, "skills": [parse_skills(v) for v in frame['skills']]}
+            row += len(frame)
+        return
+    chunk = {"id": [], "skills": []}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            student = json.loads(line)
+            chunk["id"].append(str(student.get('id', row)))
+            chunk["skills"].append(parse_skills(student.get('skills', [])))
+            row += 1
+            if len(chunk["id"]) >= chunk_size:
+                yield chunk
+                chunk = {"id": [], "skills": []}
+    if chunk["id"]:
+        yield chunk
+
+class BatchScorer:
+    """
+    Scores a student export in chunks and writes top-k roles and skill
+    gaps as Parquet part files, one per chunk.
+
+    Each part is written to a temp file and renamed when complete, and a
+    manifest records the run settings (including the model version and the
+    input file's size and mtime), so an interrupted run picks up at the
+    first missing part, and only with the same model and input. The forest predicts on whole chunk matrices
+    with `workers` threads; `serving` swaps in an exported serving form.
+    """
+    def __init__(self, models_dir: str = "models", workers: int = -1, k: int = 3, serving: str = "forest"):
+        self.recommender = Recommender(models_dir, serving=serving)
+        self.recommender.model.n_jobs = workers
+        self.k = k
+
+    def _schema(self) -> pa.Schema:
+        return pa.schema([
+            ("id", pa.string()),
+            ("top_roles", pa.list_(pa.string())),
+            ("top_scores", pa.list_(pa.float64())),
+            ("matched_skills", pa.list_(pa.string())),
+            ("missing_skills", pa.list_(pa.string())),
+        ])
+
+    def _check_manifest(self, output_dir: str, settings: Dict, overwrite: bool):
+        manifest_path = os.path.join(output_dir, "_manifest.json")
+        if os.path.exists(manifest_path) and not overwrite:
+            with open(manifest_path, 'r') as f:
+                previous = json.load(f)
+            if previous != settings:
+                raise ValueError(f"{output_dir} holds results for different settings {previous}; "
+                                 f"pass overwrite=True to start over")
+            return
+        if os.path.isdir(output_dir):
+            for name in os.listdir(output_dir):
+                if name.startswith(("part-", ".part-")):
+                    os.remove(os.path.join(output_dir, name))
+        os.makedirs(output_dir, exist_ok=True)
+        with open(manifest_path, 'w') as f:
+            json.dump(settings, f, indent=2)
+
+    def score(self, input_path: str, output_dir: str, chunk_size: int = 10000,
+              overwrite: bool = False, max_chunks: Optional[int] = None) -> Dict[str, float]:
+        """
+        Scores `input_path` into `output_dir`. Returns row counts and the
+        rows/sec of the chunks scored in this run.
+        """
+        stat = os.stat(input_path)
+        settings = {"input": os.path.abspath(input_path), "input_size": stat.st_size,
+                    "input_mtime_ns": stat.st_mtime_ns, "chunk_size": chunk_size, "k": self.k,
+                    "serving": self.recommender.serving, "model_version": self.recommender.model_version}
+        self._check_manifest(output_dir, settings, overwrite)
+        schema = self._schema()
+
+        scored = skipped = 0
+        start = time.perf_counter()
+        for i, chunk in enumerate(iter_student_chunks(input_path, chunk_size)):
+            if max_chunks is not None and i >= max_chunks:
+                break
+            part = os.path.join(output_dir, f"part-{i:06d}.parquet")
+            if os.path.exists(part):
+                skipped += len(chunk["id"])
+                continue
+            columns = self.recommender.recommend_batch(chunk["skills"], k=self.k)
+            table = pa.Table.from_pydict({"id": chunk["id"], **columns}, schema=schema)
+            # Dot-prefixed so Parquet dataset readers skip a half-written part
+            tmp_path = os.path.join(output_dir, f".part-{i:06d}.parquet.tmp")
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, part)
+            scored += len(chunk["id"])
+            elapsed = time.perf_counter() - start
+            logger.info(f"Chunk {i}: {scored} rows scored ({scored / elapsed:.0f} rows/s)")
+
+        elapsed = time.perf_counter() - start
+        rate = scored / elapsed if elapsed and scored else 0.0
+        logger.info(f"Scored {scored} students ({skipped} already done) into {output_dir} "
+                    f"in {elapsed:.2f}s ({rate:.0f} rows/s)")
+        return {"scored": scored, "skipped": skipped, "rows_per_sec": rate}
@@ -0,0 +1,153 @@
+import time
+import logging
+import argparse
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Dict, Tuple, Iterable, Optional
+import numpy as np
+from scipy import sparse
+from src.artifacts import find_artifact, load_cluster_artifacts, artifact_version
+from src.features import FeatureEncoder
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("ClusterAssigner")
+
+@dataclass
+class ClusterProfile:
+    cluster: int
+    size: int
+    share: float
+    avg_cgpa: float
+    # (skill, fraction of the cluster that has it), most common first
+    skills: List[Tuple[str, float]]
+
+@dataclass
+class ClusterAssignment:
+    profile: ClusterProfile
+    distance: float
+
+    @property
+    def cluster(self) -> int:
+        return self.profile.cluster
+
+class ClusterAssigner:
+    """
+    Places new student profiles into the peer clusters learned by
+    ProfileClustering.
+
+    The saved kmeans, mlb and scaler are loaded once and reduced to a
+    centroid matrix, its squared row norms, the CGPA scaling and a
+    FeatureEncoder over the training skill vocabulary. A profile's squared distance to each
+    centroid is ||c||^2 - 2 c.x (+ ||x||^2, the same for every centroid),
+    and x is one scaled CGPA value plus a few one-hot skills, so a single
+    assignment sums a handful of centroid columns. Cluster profiles (size,
+    average CGPA, skill shares) are precomputed from the training
+    aggregates saved in the bundle; bundles without them fall back to
+    training labels and the centroids' skill columns.
+    """
+    def __init__(self, models_dir: str = "models", top_skills: int = 10, latency_window: int = 10000):
+        model_path = find_artifact(models_dir, "kmeans_cluster_model")
+        if model_path is None:
+            raise FileNotFoundError(f"No cluster model in {models_dir}. Run ProfileClustering first.")
+        model_data = load_cluster_artifacts(model_path)
+        self.model_version = artifact_version(model_path)
+        kmeans, scaler = model_data['kmeans'], model_data['scaler']
+        self.skills = [str(s) for s in model_data['mlb'].classes_]
+        self.encoder = FeatureEncoder(self.skills, numeric=["cgpa"], scaler=scaler)
+        self.centers = np.ascontiguousarray(kmeans.cluster_centers_, dtype=np.float64)
+        self.center_norms = (self.centers ** 2).sum(axis=1)
+        self.cgpa_mean = float(scaler.mean_[0])
+        self.cgpa_scale = float(scaler.scale_[0])
+        self.profiles = self._build_profiles(kmeans, model_data.get('profiles') or {}, top_skills)
+        self.latencies = deque(maxlen=latency_window)
+        logger.info(f"Loaded {len(self.profiles)} clusters over {len(self.skills)} skills")
+
+    def _build_profiles(self, kmeans, profiles: Dict[str, np.ndarray], top_skills: int) -> List[ClusterProfile]:
+        n_clusters = len(self.centers)
+        if "cluster_sizes" in profiles:
+            sizes = profiles["cluster_sizes"].astype(np.int64)
+            cgpa = profiles["cluster_cgpa_sums"] / np.maximum(sizes, 1)
+            shares = profiles["cluster_skill_counts"] / np.maximum(sizes, 1)[:, None]
+        else:
+            labels = getattr(kmeans, "labels_", None)
+            sizes = np.bincount(labels, minlength=n_clusters) if labels is not None else np.zeros(n_clusters, np.int64)
+            # A centroid is the mean of its members: one-hot columns are skill shares
+            cgpa = self.centers[:, 0] * self.cgpa_scale + self.cgpa_mean
+            shares = np.clip(self.centers[:, 1:], 0.0, 1.0)
+        total = max(int(sizes.sum()), 1)
+        result = []
+        for i in range(n_clusters):
+            order = np.argsort(-shares[i], kind='stable')[:top_skills]
+            result.append(ClusterProfile(i, int(sizes[i]), int(sizes[i]) / total, float(cgpa[i]),
+                                         [(self.skills[j], float(shares[i, j])) for j in order if shares[i, j] > 0]))
+        return result
+
+    def _scaled_cgpa(self, cgpa: Optional[float]) -> float:
+        # Unknown CGPA sits at the population mean
+        return 0.0 if cgpa is None else (float(cgpa) - self.cgpa_mean) / self.cgpa_scale
+
+    def assign(self, skills: Iterable[str], cgpa: Optional[float] = None) -> ClusterAssignment:
+        """
+        Nearest cluster for one profile. Unknown skills are ignored.
+        """
+        start = time.perf_counter()
+        cols = self.encoder.skill_columns(skills)
+        x0 = self._scaled_cgpa(cgpa)
+        dots = self.centers[:, 0] * x0
+        if cols:
+            dots = dots + self.centers[:, cols].sum(axis=1)
+        distances = self.center_norms - 2.0 * dots
+        best = int(np.argmin(distances))
+        distance = float(np.sqrt(max(distances[best] + x0 * x0 + len(cols), 0.0)))
+        self.latencies.append(time.perf_counter() - start)
+        return ClusterAssignment(self.profiles[best], distance)
+
+    def encode_batch(self, skill_lists: List[Iterable[str]], cgpas: Optional[List[Optional[float]]] = None) -> sparse.csr_matrix:
+        """
+        Sparse [scaled CGPA | one-hot skills] rows, in the training feature order.
+        """
+        indptr, indices, data = [0], [], []
+        for i, skills in enumerate(skill_lists):
+            cols = self.encoder.skill_columns(skills)
+            indices.append(0)
+            data.append(self._scaled_cgpa(cgpas[i] if cgpas is not None else None))
+            indices.extend(cols)
+            data.extend([1.0] * len(cols))
+            indptr.append(len(indices))
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(skill_lists), self.centers.shape[1]))
+
+    def assign_batch(self, skill_lists: List[Iterable[str]],
+                     cgpas: Optional[List[Optional[float]]] = None) -> List[ClusterAssignment]:
+        """
+        Nearest clusters for many profiles with one sparse-dense product.
+        """
+        X = self.encode_batch(skill_lists, cgpas)
+        distances = self.center_norms[None, :] - 2.0 * np.asarray(X @ self.centers.T)
+        labels = distances.argmin(axis=1)
+        row_norms = np.asarray(X.multiply(X).sum(axis=1)).ravel()
+        best = np.sqrt(np.maximum(distances[np.arange(len(labels)), labels] + row_norms, 0.0))
+        return [ClusterAssignment(self.profiles[label], float(d)) for label, d in zip(labels, best)]
+
+    def latency_stats(self) -> Dict[str, float]:
+        """
+        p50/p99/max single-profile latency in milliseconds over the recent window.
+        """
+        if not self.latencies:
+            return {"count": 0}
+        ms = np.asarray(self.latencies) * 1000
+        return {"count": len(ms), "p50_ms": float(np.percentile(ms, 50)),
+                "p99_ms": float(np.percentile(ms, 99)), "max_ms": float(ms.max())}
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Assign a profile to its peer cluster.")
+    arg_parser.add_argument("skills", nargs="+")
+    arg_parser.add_argument("--cgpa", type=float)
+    arg_parser.add_argument("--models-dir", default="models")
+    args = arg_parser.parse_args()
+
+    assignment = ClusterAssigner(args.models_dir).assign(args.skills, args.cgpa)
+    profile = assignment.profile
+    print(f"Cluster {profile.cluster}: {profile.size} students ({profile.share:.0%}), avg CGPA {profile.avg_cgpa:.2f}")
+    for skill, share in profile.skills:
+        print(f"  {skill:<15} {share:.0%}")
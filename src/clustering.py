@@ -1,25 +1,56 @@
 import os
 import json
-import pickle
+import argparse
 import numpy as np
 import pandas as pd
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import MultiLabelBinarizer, StandardScaler
-from sklearn.pipeline import Pipeline
-from sklearn.compose import ColumnTransformer
+from scipy import sparse
+from sklearn.cluster import KMeans, MiniBatchKMeans, kmeans_plusplus
+from sklearn.metrics import silhouette_score
+from joblib import Parallel, delayed
 import logging
 import random
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from src.artifacts import save_cluster_model, BUNDLE_SUFFIX
+from src.features import FeatureEncoder
+from src.instrumentation import span, traced, count
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("ProfileClustering")
 
+def iter_chunks(students: List[Dict], chunk_size: int) -> Callable[[], Iterator[List[Dict]]]:
+    """
+    Chunk source for `train_clusters_streaming` over an in-memory list.
+    """
+    def chunks():
+        for start in range(0, len(students), chunk_size):
+            yield students[start:start + chunk_size]
+    return chunks
+
+def _fit_candidate(X, k: int, seed: int, batch_size: int, silhouette_size: int) -> Tuple[int, float, float]:
+    model = MiniBatchKMeans(n_clusters=k, batch_size=batch_size, random_state=seed, n_init=3).fit(X)
+    if len(set(model.labels_)) < 2:
+        return k, float(model.inertia_), -1.0
+    score = silhouette_score(X, model.labels_, sample_size=min(silhouette_size, X.shape[0]), random_state=seed)
+    return k, float(model.inertia_), float(score)
+
+def _elbow(ks: List[int], inertias: List[float]) -> int:
+    """
+    The k furthest below the straight line from the first to the last
+    point of the (normalised) inertia curve.
+    """
+    x = (np.array(ks) - ks[0]) / max(ks[-1] - ks[0], 1)
+    y = np.array(inertias)
+    y = (y - y.min()) / max(y.max() - y.min(), 1e-12)
+    line = y[0] + (y[-1] - y[0]) * x
+    return ks[int(np.argmax(line - y))]
+
 class ProfileClustering:
-    def __init__(self, output_dir: str = "models"):
+    def __init__(self, output_dir: str = "models", reports_dir: str = "reports"):
         self.output_dir = output_dir
+        self.reports_dir = reports_dir
         os.makedirs(self.output_dir, exist_ok=True)
-        self.mlb = MultiLabelBinarizer()
-        self.scaler = StandardScaler()
+        self.encoder = FeatureEncoder(numeric=["cgpa"])
         self.kmeans = None
 
     def generate_mock_students(self, count: int = 100):
@@ -27,7 +58,7 @@ class ProfileClustering:
         students = []
         skills_pool = ["python", "java", "sql", "react", "aws", "docker", "pandas", "pytorch", "node.js"]
         interests_pool = ["Data Science", "Web Development", "DevOps", "Cloud Computing"]
-        
+
         for i in range(count):
             students.append({
                 "id": f"student_{i}",
@@ -38,61 +69,203 @@ class ProfileClustering:
             })
         return students
 
+    @traced("clustering.train_clusters")
     def train_clusters(self, students: list, n_clusters: int = 4):
         logger.info("Preparing data for clustering...")
-        
-        # Features: CGPA (scaled), Skills (one-hot)
-        df = pd.DataFrame(students)
-        
-        # 1. Encode Skills
-        skills_encoded = self.mlb.fit_transform(df['skills'])
-        skills_df = pd.DataFrame(skills_encoded, columns=self.mlb.classes_)
-        
-        # 2. Scale CGPA
-        cgpa_scaled = self.scaler.fit_transform(df[['cgpa']])
-        
-        # 3. Combine
-        X = np.hstack([cgpa_scaled, skills_encoded])
-        
-        # 4. KMeans
+
+        # Features: CGPA (scaled), Skills (one-hot), as sparse rows
+        count("students", len(students))
+        X = self.encoder.fit_transform(students)
+
+        # KMeans
         logger.info(f"Training KMeans with k={n_clusters}...")
         self.kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-        self.kmeans.fit(X)
-        
-        # 5. Analyze Clusters
-        df['cluster'] = self.kmeans.labels_
+        with span("clustering.fit", n_clusters=n_clusters):
+            self.kmeans.fit(X)
+
+        # Analyze Clusters
         logger.info("Cluster centers (CGPA part):")
         logger.info(self.kmeans.cluster_centers_[:, 0]) # Just CGPA for quick check
-        
-        # Save models
-        model_path = os.path.join(self.output_dir, "kmeans_cluster_model.pkl")
-        with open(model_path, 'wb') as f:
-            pickle.dump({
-                "kmeans": self.kmeans,
-                "mlb": self.mlb,
-                "scaler": self.scaler,
-                "feature_names": ["cgpa"] + list(self.mlb.classes_)
-            }, f)
-            
+
+        cgpa = np.array([s.get('cgpa') or 0.0 for s in students], dtype=float)
+        summary = self._summarize(*self._aggregate(self.kmeans.labels_, X, cgpa, n_clusters))
+        self._save_model(summary)
+        self._write_report(summary, n_clusters)
+
+    @staticmethod
+    def _aggregate(labels: np.ndarray, X: sparse.csr_matrix, cgpa: np.ndarray,
+                   n_clusters: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Per-cluster sizes, CGPA sums and column sums of `X` for one block of
+        rows, through bincounts and a sparse cluster x student product.
+        """
+        members = sparse.csr_matrix((np.ones(len(labels)), (labels, np.arange(len(labels)))),
+                                    shape=(n_clusters, len(labels)))
+        return (np.bincount(labels, minlength=n_clusters).astype(np.int64),
+                np.bincount(labels, weights=cgpa, minlength=n_clusters),
+                (members @ X).toarray())
+
+    def _summarize(self, sizes: np.ndarray, cgpa_sums: np.ndarray, column_sums: np.ndarray) -> pd.DataFrame:
+        """
+        Size, CGPA sum and skill counts per cluster, one row per cluster.
+        """
+        start = len(self.encoder.numeric)
+        skills = self.encoder.skills
+        summary = pd.DataFrame(column_sums[:, start:start + len(skills)], columns=skills)
+        summary.insert(0, 'size', sizes)
+        summary['cgpa'] = cgpa_sums
+        return summary
+
+    def _save_model(self, summary: pd.DataFrame):
+        # Per-cluster aggregates travel with the model for online assignment
+        profiles = {"cluster_sizes": summary['size'].to_numpy(np.int64),
+                    "cluster_cgpa_sums": summary['cgpa'].to_numpy(float),
+                    "cluster_skill_counts": summary[self.encoder.skills].to_numpy(float)}
+        model_path = os.path.join(self.output_dir, "kmeans_cluster_model" + BUNDLE_SUFFIX)
+        save_cluster_model(model_path, self.kmeans, self.encoder.scaler, self.encoder, self.encoder.feature_names,
+                           profiles)
         logger.info(f"Saved clustering model to {model_path}")
-        
-        # Save cluster report
-        report_path = os.path.join("reports", "cluster_analysis.md")
+
+    def _write_report(self, summary: pd.DataFrame, n_clusters: int, k_curve: Optional[List[Dict]] = None):
+        skills = [c for c in summary.columns if c not in ('size', 'cgpa')]
+        report_path = os.path.join(self.reports_dir, "cluster_analysis.md")
+        os.makedirs(self.reports_dir, exist_ok=True)
         with open(report_path, 'w') as f:
             f.write(f"# Cluster Analysis\n\n")
             f.write(f"Number of clusters: {n_clusters}\n\n")
             for i in range(n_clusters):
-                cluster_students = df[df['cluster'] == i]
-                avg_cgpa = cluster_students['cgpa'].mean()
-                common_skills = pd.Series([s for sublist in cluster_students['skills'] for s in sublist]).value_counts().head(3).index.tolist()
+                row = summary.loc[i]
+                size = int(row['size'])
+                avg_cgpa = row['cgpa'] / size if size else float('nan')
+                common_skills = row[skills].astype(float).nlargest(3).index.tolist() if size else []
                 f.write(f"## Cluster {i}\n")
-                f.write(f"- Size: {len(cluster_students)}\n")
+                f.write(f"- Size: {size}\n")
                 f.write(f"- Avg CGPA: {avg_cgpa:.2f}\n")
                 f.write(f"- Top Skills: {', '.join(common_skills)}\n\n")
-                
+            if k_curve:
+                f.write("## k selection\n\n| k | inertia | silhouette |\n|---|---|---|\n")
+                for point in k_curve:
+                    f.write(f"| {point['k']} | {point['inertia']:.1f} | {point['silhouette']:.3f} |\n")
         logger.info(f"Saved cluster report to {report_path}")
 
+    def select_k(self, X, k_range: Iterable[int] = range(2, 11), method: str = "silhouette",
+                 seed: int = 42, batch_size: int = 4096, silhouette_size: int = 5000,
+                 n_jobs: int = -1) -> Tuple[int, List[Dict]]:
+        """
+        Fits one MiniBatchKMeans per candidate k on `X` (a sample) in
+        parallel and picks k by the best sampled silhouette score, or by
+        the elbow of the inertia curve with method="inertia". Returns the
+        chosen k and the curve.
+        """
+        ks = sorted(k for k in k_range if 2 <= k < X.shape[0])
+        if not ks:
+            raise ValueError(f"No candidate k fits a sample of {X.shape[0]} rows")
+        with span("clustering.select_k", candidates=len(ks), method=method):
+            results = Parallel(n_jobs=n_jobs)(
+                delayed(_fit_candidate)(X, k, seed, batch_size, silhouette_size) for k in ks)
+        curve = [{"k": k, "inertia": inertia, "silhouette": score} for k, inertia, score in results]
+        if method == "silhouette":
+            best = max(curve, key=lambda point: point["silhouette"])["k"]
+        elif method == "inertia":
+            best = _elbow(ks, [point["inertia"] for point in curve])
+        else:
+            raise ValueError(f"Unknown k selection method: {method}")
+        logger.info(f"Selected k={best} by {method} from {ks}")
+        return best, curve
+
+    @traced("clustering.train_clusters_streaming")
+    def train_clusters_streaming(self, chunks: Callable[[], Iterable[List[Dict]]],
+                                 n_clusters: Union[int, str] = 4, k_range: Iterable[int] = range(2, 11),
+                                 k_method: str = "silhouette", batch_size: int = 4096,
+                                 sample_size: int = 20000, seed: int = 42, n_jobs: int = -1) -> Dict:
+        """
+        Mini-batch clustering for populations that do not fit in memory.
+        `chunks` returns a fresh iterator over lists of student dicts and
+        is read three times:
+
+            1. FeatureEncoder.partial_fit (skill vocabulary and CGPA
+               scaler) and a reservoir sample of `sample_size` students
+            2. MiniBatchKMeans.partial_fit in `batch_size` slices, seeded
+               with k-means++ centres from the sample
+            3. assignment, inertia and per-cluster aggregates for the report
+
+        Rows stay sparse CSR throughout; the KMeans kernels use every core
+        through OpenMP and the k candidates (n_clusters="auto") are fit on
+        the sample in parallel with joblib.
+        """
+        rng = random.Random(seed)
+        sample, seen = [], 0
+        self.encoder = FeatureEncoder(numeric=["cgpa"])
+        with span("clustering.scan"):
+            for chunk in chunks():
+                self.encoder.partial_fit(chunk)
+                for student in chunk:
+                    if len(sample) < sample_size:
+                        sample.append(student)
+                    else:
+                        slot = rng.randint(0, seen)
+                        if slot < sample_size:
+                            sample[slot] = student
+                    seen += 1
+        if not seen:
+            raise ValueError("No students to cluster")
+        count("students", seen)
+        sample_X = self.encoder.transform(sample)
+
+        k_curve = None
+        if n_clusters == "auto":
+            n_clusters, k_curve = self.select_k(sample_X, k_range, k_method, seed, batch_size, n_jobs=n_jobs)
+
+        logger.info(f"Training MiniBatchKMeans with k={n_clusters} on {seen} students...")
+        centers, _ = kmeans_plusplus(sample_X, n_clusters, random_state=seed)
+        self.kmeans = MiniBatchKMeans(n_clusters=n_clusters, init=centers, n_init=1, batch_size=batch_size,
+                                      random_state=seed)
+        with span("clustering.fit", n_clusters=n_clusters):
+            for chunk in chunks():
+                X = self.encoder.transform(chunk)
+                for start in range(0, X.shape[0], batch_size):
+                    self.kmeans.partial_fit(X[start:start + batch_size])
+
+        sizes = np.zeros(n_clusters, dtype=np.int64)
+        cgpa_sums = np.zeros(n_clusters)
+        column_sums = np.zeros((n_clusters, self.encoder.n_features))
+        inertia = 0.0
+        with span("clustering.assign"):
+            for chunk in chunks():
+                X = self.encoder.transform(chunk)
+                labels = self.kmeans.predict(X)
+                inertia -= self.kmeans.score(X)
+                cgpa = np.array([s.get('cgpa') or 0.0 for s in chunk], dtype=float)
+                for total, part in zip((sizes, cgpa_sums, column_sums),
+                                       self._aggregate(labels, X, cgpa, n_clusters)):
+                    total += part
+        self.kmeans.inertia_ = inertia
+
+        summary = self._summarize(sizes, cgpa_sums, column_sums)
+        self._save_model(summary)
+        self._write_report(summary, n_clusters, k_curve)
+        return {"students": seen, "n_clusters": n_clusters, "inertia": inertia,
+                "sizes": sizes.tolist(), "k_curve": k_curve}
+
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Cluster student profiles into archetypes.")
+    arg_parser.add_argument("--students", type=int, default=200, help="number of mock students")
+    arg_parser.add_argument("--streaming", action="store_true", help="mini-batch mode over chunks of students")
+    arg_parser.add_argument("--chunk-size", type=int, default=100000)
+    arg_parser.add_argument("--k", default="4", help="number of clusters, or 'auto'")
+    arg_parser.add_argument("--k-method", choices=["silhouette", "inertia"], default="silhouette")
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args()
+
     clustering = ProfileClustering()
-    students = clustering.generate_mock_students(200)
-    clustering.train_clusters(students)
+    if not args.streaming:
+        clustering.train_clusters(clustering.generate_mock_students(args.students), int(args.k))
+    else:
+        def mock_chunks():
+            # Reseeded per pass so every pass sees the same students
+            random.seed(args.seed)
+            for start in range(0, args.students, args.chunk_size):
+                yield clustering.generate_mock_students(min(args.chunk_size, args.students - start))
+        k = args.k if args.k == "auto" else int(args.k)
+        result = clustering.train_clusters_streaming(mock_chunks, k, k_method=args.k_method, seed=args.seed)
+        logger.info(json.dumps({key: value for key, value in result.items() if key != "k_curve"}))
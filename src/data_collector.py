@@ -1,10 +1,15 @@
 import os
 import json
 import time
+import gzip
+import uuid
+import zlib
 import random
+import argparse
 import datetime
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
+from src.instrumentation import traced, count
 
 # Configure logging
 logging.basicConfig(
@@ -17,10 +22,120 @@ logging.basicConfig(
 )
 logger = logging.getLogger("DataCollector")
 
-class JobScraper:
+class JobSink:
+    """
+    Destination for scraped raw jobs.
+    """
+    def write(self, job_data: Dict, source: str):
+        raise NotImplementedError("Subclasses must implement write method")
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class FileJobSink(JobSink):
+    """
+    Legacy layout: one pretty-printed JSON file per job.
+    """
     def __init__(self, raw_data_dir: str = "data/jobs/raw"):
         self.raw_data_dir = raw_data_dir
         os.makedirs(self.raw_data_dir, exist_ok=True)
+
+    def write(self, job_data: Dict, source: str):
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        job_id = job_data.get('id', "unknown")
+        # The uuid suffix keeps names unique even within the same microsecond
+        filename = f"{source}_{job_id}_{timestamp}_{uuid.uuid4().hex[:8]}.json"
+        filepath = os.path.join(self.raw_data_dir, filename)
+        
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(job_data, f, indent=2)
+            count("bytes_written", f.tell())
+        count("rows_written")
+
+class ShardJobSink(JobSink):
+    """
+    Append-only JSONL shards, one job per line.
+
+    Writes are buffered and flushed with an fsync every `batch_size` jobs; a
+    shard is rotated once it reaches `max_shard_bytes`. The active shard is
+    written under a `.part` suffix and renamed when closed, so readers only
+    ever see complete shards. With `compress=True` shards are gzipped.
+    """
+    def __init__(self, raw_data_dir: str = "data/jobs/raw", batch_size: int = 500,
+                 max_shard_bytes: int = 64 * 1024 * 1024, compress: bool = False):
+        self.raw_data_dir = raw_data_dir
+        self.batch_size = batch_size
+        self.max_shard_bytes = max_shard_bytes
+        self.compress = compress
+        self.buffer = []
+        self._file = None
+        self._gzip = None
+        self._path = None
+        self._seq = 0
+        self._run_id = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        os.makedirs(self.raw_data_dir, exist_ok=True)
+
+    def write(self, job_data: Dict, source: str):
+        self.buffer.append(json.dumps(job_data) + "\n")
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def _open_shard(self):
+        suffix = ".jsonl.gz" if self.compress else ".jsonl"
+        self._path = os.path.join(self.raw_data_dir, f"shard_{self._run_id}_{self._seq:05d}{suffix}")
+        self._seq += 1
+        self._file = open(self._path + ".part", 'wb')
+        if self.compress:
+            self._gzip = gzip.GzipFile(fileobj=self._file, mode='wb')
+
+    def _close_shard(self):
+        if self._gzip is not None:
+            self._gzip.close()
+            self._gzip = None
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._path + ".part", self._path)
+        self._file = None
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self._file is None:
+            self._open_shard()
+        data = "".join(self.buffer).encode('utf-8')
+        count("rows_written", len(self.buffer))
+        count("bytes_written", len(data))
+        self.buffer = []
+        if self._gzip is not None:
+            self._gzip.write(data)
+            self._gzip.flush(zlib.Z_SYNC_FLUSH)
+        else:
+            self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if self._file.tell() >= self.max_shard_bytes:
+            self._close_shard()
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._close_shard()
+
+class JobScraper:
+    def __init__(self, raw_data_dir: str = "data/jobs/raw", sink: Optional[JobSink] = None):
+        self.raw_data_dir = raw_data_dir
+        os.makedirs(self.raw_data_dir, exist_ok=True)
+        self.sink = sink if sink is not None else ShardJobSink(raw_data_dir)
         
     def scrape(self, roles: List[str], count_per_role: int = 10):
         """
@@ -30,24 +145,16 @@ class JobScraper:
 
     def save_raw_job(self, job_data: Dict, source: str):
         """
-        Saves a single job entry to a JSON file.
+        Hands a single job entry to the configured sink.
         """
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        job_id = job_data.get('id', f"unknown_{random.randint(1000,9999)}")
-        filename = f"{source}_{job_id}_{timestamp}.json"
-        filepath = os.path.join(self.raw_data_dir, filename)
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(job_data, f, indent=2)
-        
-        # logger.info(f"Saved job {job_id} to {filepath}")
+        self.sink.write(job_data, source)
 
 class MockJobScraper(JobScraper):
     """
     Generates synthetic job data for testing and development.
     """
-    def __init__(self, raw_data_dir: str = "data/jobs/raw"):
-        super().__init__(raw_data_dir)
+    def __init__(self, raw_data_dir: str = "data/jobs/raw", sink: Optional[JobSink] = None):
+        super().__init__(raw_data_dir, sink)
         self.skills_pool = {
             "Data Engineer": ["Python", "SQL", "Spark", "AWS", "Airflow", "Kafka", "ETL", "BigQuery"],
             "Data Scientist": ["Python", "Pandas", "Scikit-learn", "TensorFlow", "PyTorch", "Statistics", "SQL"],
@@ -73,36 +180,48 @@ class MockJobScraper(JobScraper):
         - Bachelor's degree in Computer Science or related field.
         """
 
+    def generate_job(self, role: str) -> Dict:
+        relevant_skills = self.skills_pool.get(role, ["General Skills"])
+        job_id = f"mock_{role.replace(' ', '_')}_{random.randint(10000, 99999)}"
+        seniority = random.choice(self.seniority_levels)
+        
+        return {
+            "id": job_id,
+            "title": f"{seniority} {role}",
+            "company": f"MockCompany_{random.randint(1, 100)}",
+            "location": random.choice(["Remote", "New York, NY", "San Francisco, CA", "Bangalore, IN", "London, UK"]),
+            "description": self.generate_job_description(role, relevant_skills),
+            "posted_date": (datetime.datetime.now() - datetime.timedelta(days=random.randint(0, 30))).isoformat(),
+            "source": "mock_generator",
+            "url": f"https://example.com/jobs/{job_id}"
+        }
+
+    @traced("data_collector.scrape")
     def scrape(self, roles: List[str], count_per_role: int = 10):
         logger.info(f"Starting mock scrape for roles: {roles}")
         total_scraped = 0
         
         for role in roles:
             logger.info(f"Generating {count_per_role} jobs for {role}...")
-            relevant_skills = self.skills_pool.get(role, ["General Skills"])
             
             for i in range(count_per_role):
-                job_id = f"mock_{role.replace(' ', '_')}_{random.randint(10000, 99999)}"
-                seniority = random.choice(self.seniority_levels)
-                
-                job_data = {
-                    "id": job_id,
-                    "title": f"{seniority} {role}",
-                    "company": f"MockCompany_{random.randint(1, 100)}",
-                    "location": random.choice(["Remote", "New York, NY", "San Francisco, CA", "Bangalore, IN", "London, UK"]),
-                    "description": self.generate_job_description(role, relevant_skills),
-                    "posted_date": (datetime.datetime.now() - datetime.timedelta(days=random.randint(0, 30))).isoformat(),
-                    "source": "mock_generator",
-                    "url": f"https://example.com/jobs/{job_id}"
-                }
-                
-                self.save_raw_job(job_data, "mock")
+                self.save_raw_job(self.generate_job(role), "mock")
                 total_scraped += 1
                 
+        self.sink.close()
+        count("jobs_scraped", total_scraped)
         logger.info(f"Mock scrape completed. Total jobs generated: {total_scraped}")
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Generate mock raw job postings.")
+    arg_parser.add_argument("--sink", choices=["shards", "files"], default="shards",
+                            help="JSONL shards (default) or the legacy one-file-per-job layout")
+    arg_parser.add_argument("--compress", action="store_true", help="gzip the JSONL shards")
+    args = arg_parser.parse_args()
+
     # Example usage
-    scraper = MockJobScraper()
+    raw_data_dir = "data/jobs/raw"
+    sink = FileJobSink(raw_data_dir) if args.sink == "files" else ShardJobSink(raw_data_dir, compress=args.compress)
+    scraper = MockJobScraper(raw_data_dir, sink=sink)
     target_roles = ["Data Engineer", "Data Scientist", "Backend Engineer", "Frontend Engineer", "DevOps Engineer"]
     scraper.scrape(target_roles, count_per_role=20)
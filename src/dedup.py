@@ -0,0 +1,158 @@
+import os
+import re
+import zlib
+import pickle
+import logging
+from typing import List, Dict, Optional, Iterable, Tuple
+from collections import defaultdict, Counter
+import numpy as np
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("JobDeduplicator")
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_TOKEN = re.compile(r'[a-z0-9+#.]+')
+
+class MinHasher:
+    """
+    MinHash signatures over word shingles of a text.
+    """
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, 1 << 32, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, 1 << 32, size=num_perm).astype(np.uint64)
+
+    def shingles(self, text: str) -> set:
+        tokens = _TOKEN.findall(text.lower())
+        k = self.shingle_size
+        if len(tokens) < k:
+            return {" ".join(tokens)}
+        return {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in self.shingles(text)), dtype=np.uint64)
+        # Universal hashing (a*x + b mod p) applied to every shingle for every permutation
+        permuted = np.bitwise_and((np.outer(hashes, self.a) + self.b) % _MERSENNE_PRIME, _MAX_HASH)
+        return permuted.min(axis=0).astype(np.uint32)
+
+class JobDeduplicator:
+    """
+    Near-duplicate job detection with MinHash + LSH banding.
+
+    Each job's title and description is reduced to a MinHash signature; the
+    signature is split into `bands` bands and every band is hashed into a
+    bucket, so only jobs sharing a bucket are compared. A candidate counts as
+    a duplicate when its estimated Jaccard similarity reaches `threshold`.
+    Cost per job is constant, so a batch is checked in linear time, and the
+    index persists on disk so later batches are checked incrementally.
+    Dropped jobs are remembered by id and raw file, so they can be
+    re-admitted when the job they duplicated is removed.
+    """
+    def __init__(self, index_path: str = "data/jobs/parsed/dedup_index.pkl", threshold: float = 0.9,
+                 num_perm: int = 128, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.index_path = index_path
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self.reset()
+
+    def reset(self):
+        self.signatures = {}
+        self.buckets = [defaultdict(list) for _ in range(self.bands)]
+        # dropped job id -> (id of the job it duplicates, raw file it came from)
+        self.duplicates = {}
+        self.dropped = Counter()
+
+    def load(self) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+        with open(self.index_path, 'rb') as f:
+            data = pickle.load(f)
+        self.signatures = data["signatures"]
+        self.buckets = data["buckets"]
+        self.duplicates = data.get("duplicates", {})
+        self.dropped = Counter()
+        return True
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        with open(self.index_path, 'wb') as f:
+            pickle.dump({"signatures": self.signatures, "buckets": self.buckets, "duplicates": self.duplicates}, f)
+        logger.info(f"Saved dedup index ({len(self.signatures)} jobs) to {self.index_path}")
+
+    def job_signature(self, job: Dict) -> np.ndarray:
+        return self.hasher.signature(f"{job.get('title', '')} {job.get('description', '')}")
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def find_duplicate(self, signature: np.ndarray) -> Optional[str]:
+        """
+        Returns the id of an indexed job similar to `signature`, if any.
+        """
+        checked = set()
+        for band, key in zip(self.buckets, self._band_keys(signature)):
+            for job_id in band.get(key, ()):
+                if job_id in checked:
+                    continue
+                checked.add(job_id)
+                if np.mean(self.signatures[job_id] == signature) >= self.threshold:
+                    return job_id
+        return None
+
+    def add(self, job: Dict, signature: Optional[np.ndarray] = None,
+            source_file: Optional[str] = None) -> Optional[str]:
+        """
+        Indexes a job unless it duplicates one already indexed. Returns the
+        id of the job it duplicates, or None when it was added. A dropped
+        job is linked to the one it duplicates, with its `source_file`.
+        """
+        if signature is None:
+            signature = self.job_signature(job)
+        job_id = job['id']
+        duplicate_of = job_id if job_id in self.signatures else self.find_duplicate(signature)
+        if duplicate_of is not None:
+            self.dropped[job.get('source') or "unknown"] += 1
+            if duplicate_of != job_id:
+                self.duplicates[job_id] = (duplicate_of, source_file)
+            return duplicate_of
+        self.signatures[job_id] = signature
+        for band, key in zip(self.buckets, self._band_keys(signature)):
+            band[key].append(job_id)
+        return None
+
+    def remove(self, job_ids: Iterable[str]) -> List[Tuple[str, Optional[str]]]:
+        """
+        Drops `job_ids` from the index. Returns (id, source file) of the
+        dropped jobs that duplicated one of them; the caller re-adds those.
+        """
+        job_ids = set(job_ids)
+        for job_id in job_ids:
+            self.duplicates.pop(job_id, None)
+        orphans = [(dup_id, source_file) for dup_id, (original, source_file) in self.duplicates.items()
+                   if original in job_ids]
+        for dup_id, _ in orphans:
+            del self.duplicates[dup_id]
+        for job_id in job_ids:
+            signature = self.signatures.pop(job_id, None)
+            if signature is None:
+                continue
+            for band, key in zip(self.buckets, self._band_keys(signature)):
+                members = band[key]
+                members.remove(job_id)
+                if not members:
+                    del band[key]
+        return orphans
+
+    def report(self) -> Dict[str, int]:
+        """
+        Duplicates dropped since the last load/reset, per job source.
+        """
+        return dict(self.dropped)
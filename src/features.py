@@ -0,0 +1,133 @@
+import logging
+from typing import List, Dict, Iterable, Optional, Sequence
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import StandardScaler
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("FeatureEncoder")
+
+# Canonical names for common skill spellings (shared with SkillExtractor)
+SKILL_ALIASES = {
+    "py": "python",
+    "js": "javascript",
+    "ts": "typescript",
+    "reactjs": "react",
+    "aws cloud": "aws",
+    "ml": "machine learning",
+    "dl": "deep learning"
+}
+
+def normalize_skill(skill: str, aliases: Optional[Dict[str, str]] = None) -> str:
+    skill = skill.lower().strip()
+    return (SKILL_ALIASES if aliases is None else aliases).get(skill, skill)
+
+class FeatureEncoder:
+    """
+    Encodes student profiles as CSR rows over one shared skill vocabulary,
+    so the trainer, clustering, the recommender and the UI agree on columns.
+
+    Columns are the `numeric` fields first (e.g. cgpa, internships;
+    standardised by `scaler`), then one column per skill, then, with
+    `use_interests`, one column per interest. Skills go through
+    normalize_skill, so "Py", " python" and "Python" share a column;
+    unknown skills and interests are ignored. Rows are never densified:
+    each costs one entry per numeric field and per known skill or interest.
+
+    A vocabulary passed as `skills` keeps its order (to match a saved
+    model); otherwise `fit`/`partial_fit` learn a sorted one. `classes_`
+    mirrors MultiLabelBinarizer, so model bundles record the vocabulary.
+    """
+    def __init__(self, skills: Optional[Iterable[str]] = None, numeric: Sequence[str] = (),
+                 use_interests: bool = False, interests: Optional[Iterable[str]] = None,
+                 scaler: Optional[StandardScaler] = None):
+        self.numeric = list(numeric)
+        self.use_interests = use_interests or interests is not None
+        self.scaler = scaler if scaler is not None else (StandardScaler() if self.numeric else None)
+        self._seen_skills, self._seen_interests = set(), set()
+        self._set_vocabulary(skills or [], interests or [])
+
+    def _set_vocabulary(self, skills: Iterable[str], interests: Iterable[str]):
+        self.skills = [str(s) for s in skills]
+        self.interests = [str(i) for i in interests] if self.use_interests else []
+        offset = len(self.numeric)
+        self.skill_index, self.interest_index = {}, {}
+        for i, skill in enumerate(self.skills):
+            self.skill_index.setdefault(normalize_skill(skill), offset + i)
+        offset += len(self.skills)
+        for i, interest in enumerate(self.interests):
+            self.interest_index.setdefault(interest.strip().lower(), offset + i)
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return np.array(self.skills, dtype=object)
+
+    @property
+    def feature_names(self) -> List[str]:
+        return self.numeric + self.skills + [f"interest:{i}" for i in self.interests]
+
+    @property
+    def n_features(self) -> int:
+        return len(self.numeric) + len(self.skills) + len(self.interests)
+
+    def _numeric_frame(self, students: List[Dict]) -> pd.DataFrame:
+        return pd.DataFrame({name: [float(s.get(name) or 0.0) for s in students] for name in self.numeric})
+
+    def partial_fit(self, students: List[Dict]) -> "FeatureEncoder":
+        """
+        Grows the vocabulary and numeric statistics by one chunk of students.
+        """
+        for student in students:
+            self._seen_skills.update(normalize_skill(s) for s in student.get('skills', ()))
+            if self.use_interests:
+                self._seen_interests.update(i.strip().lower() for i in student.get('interests', ()))
+        if self.numeric and students:
+            self.scaler.partial_fit(self._numeric_frame(students))
+        self._set_vocabulary(sorted(self._seen_skills), sorted(self._seen_interests))
+        return self
+
+    def fit(self, students: List[Dict]) -> "FeatureEncoder":
+        self._seen_skills, self._seen_interests = set(), set()
+        if self.scaler is not None:
+            self.scaler = StandardScaler()
+        return self.partial_fit(students)
+
+    def fit_transform(self, students: List[Dict]) -> sparse.csr_matrix:
+        return self.fit(students).transform(students)
+
+    def skill_columns(self, skills: Iterable[str]) -> List[int]:
+        """
+        Sorted, de-duplicated feature columns of the known skills in `skills`.
+        """
+        index = self.skill_index
+        return sorted({index[key] for key in map(normalize_skill, skills) if key in index})
+
+    def _one_hot(self, values: List[Iterable[str]], columns) -> sparse.csr_matrix:
+        indptr, indices = [0], []
+        for items in values:
+            indices.extend(columns(items))
+            indptr.append(len(indices))
+        return sparse.csr_matrix((np.ones(len(indices)), np.asarray(indices, dtype=np.int32), indptr),
+                                 shape=(len(values), self.n_features))
+
+    def transform_skills(self, skill_lists: List[Iterable[str]]) -> sparse.csr_matrix:
+        """
+        Rows with only the skill columns set (numeric and interests left empty).
+        """
+        return self._one_hot(skill_lists, self.skill_columns)
+
+    def transform(self, students: List[Dict]) -> sparse.csr_matrix:
+        X = self.transform_skills([s.get('skills', ()) for s in students])
+        if self.use_interests:
+            index = self.interest_index
+            X = X + self._one_hot([s.get('interests', ()) for s in students],
+                                  lambda items: sorted({index[i.strip().lower()] for i in items
+                                                        if i.strip().lower() in index}))
+        if self.numeric:
+            values = self.scaler.transform(self._numeric_frame(students))
+            rows = np.repeat(np.arange(len(students)), len(self.numeric))
+            cols = np.tile(np.arange(len(self.numeric)), len(students))
+            X = X + sparse.csr_matrix((values.ravel(), (rows, cols)), shape=X.shape)
+        return X.tocsr()
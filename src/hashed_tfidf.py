@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import logging
+from typing import List, Iterable, Iterator, Optional, Set, Tuple
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from src.artifacts import FORMAT_VERSION
+from src.instrumentation import count
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("HashedTfidf")
+
+KIND = "hashed_tfidf"
+
+class HashedTfidfStore:
+    """
+    Out-of-core TF-IDF for job corpora of any size.
+
+    Terms are hashed into `n_features` columns, so no vocabulary pass is
+    needed. Each `add` writes its raw term counts as one compressed CSR
+    shard (shards/part-*.npz, with the shard's job ids) and adds its
+    document frequencies to a running total. IDF weights and L2
+    normalisation are applied when a shard is read, so appending or
+    removing jobs never rewrites the other shards and the weights always
+    reflect the current corpus (smooth idf, as TfidfVectorizer).
+
+    The directory has a bundle-style manifest.json (kind "hashed_tfidf")
+    and df.npy next to the shards; memory stays bounded by the shard size.
+    """
+    def __init__(self, path: str, n_features: int = 2 ** 18, stop_words: Optional[str] = 'english'):
+        self.path = path
+        manifest_path = os.path.join(path, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)["metadata"]
+            n_features, stop_words = metadata["n_features"], metadata["stop_words"]
+            self.n_docs = metadata["n_docs"]
+            self.df = np.load(os.path.join(path, "df.npy"))
+        else:
+            self.n_docs = 0
+            self.df = np.zeros(n_features, dtype=np.int64)
+        self.n_features = n_features
+        self.stop_words = stop_words
+        self.hasher = HashingVectorizer(n_features=n_features, stop_words=stop_words, alternate_sign=False,
+                                        norm=None, dtype=np.float32)
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        manifest_path = os.path.join(path, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return False
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("kind") == KIND
+
+    def _shard_dir(self) -> str:
+        return os.path.join(self.path, "shards")
+
+    def _shards(self) -> List[str]:
+        if not os.path.isdir(self._shard_dir()):
+            return []
+        return sorted(os.path.join(self._shard_dir(), name) for name in os.listdir(self._shard_dir())
+                      if name.endswith(".npz") and not name.endswith(".tmp.npz"))
+
+    def reset(self):
+        """
+        Drops every shard and document frequency, for a full rebuild.
+        """
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+        self.n_docs = 0
+        self.df = np.zeros(self.n_features, dtype=np.int64)
+
+    def add(self, texts: List[str], job_ids: List[str]):
+        """
+        Hashes one chunk of job texts into a new shard.
+        """
+        if not texts:
+            return
+        counts = self.hasher.transform(texts).tocsr()
+        counts.sum_duplicates()
+        os.makedirs(self._shard_dir(), exist_ok=True)
+        name = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.npz"
+        _write_shard(os.path.join(self._shard_dir(), name), counts, job_ids)
+        self.df += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_docs += len(job_ids)
+        count("tfidf_shards_written")
+        self._save_state()
+
+    def add_all(self, corpus: Iterable[str], job_ids: List[str], chunk_size: int = 10000):
+        """
+        Streams `corpus` (aligned with `job_ids`) into shards of `chunk_size` jobs.
+        """
+        texts, start = [], 0
+        for text in corpus:
+            texts.append(text)
+            if len(texts) >= chunk_size:
+                self.add(texts, job_ids[start:start + len(texts)])
+                start += len(texts)
+                texts = []
+        self.add(texts, job_ids[start:start + len(texts)])
+        if not self.n_docs:
+            self._save_state()
+
+    def remove(self, job_ids: Set[str]):
+        """
+        Drops jobs by id, rewriting only the shards that contain them.
+        """
+        if not job_ids:
+            return
+        for shard in self._shards():
+            counts, ids = _read_shard(shard)
+            keep = np.array([job_id not in job_ids for job_id in ids], dtype=bool)
+            if keep.all():
+                continue
+            dropped = counts[~keep]
+            self.df -= np.bincount(dropped.indices, minlength=self.n_features)
+            self.n_docs -= int((~keep).sum())
+            if keep.any():
+                _write_shard(shard, counts[keep], [job_id for job_id, k in zip(ids, keep) if k])
+            else:
+                os.remove(shard)
+        self._save_state()
+
+    def _save_state(self):
+        os.makedirs(self.path, exist_ok=True)
+        np.save(os.path.join(self.path, "df.tmp.npy"), self.df, allow_pickle=False)
+        os.replace(os.path.join(self.path, "df.tmp.npy"), os.path.join(self.path, "df.npy"))
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "kind": KIND,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "metadata": {"n_features": self.n_features, "stop_words": self.stop_words, "n_docs": self.n_docs},
+            "components": {"df": {"type": "array", "shape": [self.n_features], "dtype": str(self.df.dtype)}},
+        }
+        tmp_path = os.path.join(self.path, "manifest.json.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.path, "manifest.json"))
+
+    @property
+    def idf(self) -> np.ndarray:
+        return (np.log((1 + self.n_docs) / (1 + self.df)) + 1).astype(np.float32)
+
+    def _weigh(self, counts: sparse.csr_matrix, idf: np.ndarray) -> sparse.csr_matrix:
+        return normalize(counts @ sparse.diags(idf), copy=False).tocsr()
+
+    def transform(self, texts: List[str]) -> sparse.csr_matrix:
+        """
+        TF-IDF rows for new texts (e.g. queries) under the current weights.
+        """
+        return self._weigh(self.hasher.transform(texts), self.idf)
+
+    def iter_shards(self) -> Iterator[Tuple[List[str], sparse.csr_matrix]]:
+        """
+        Streams (job_ids, TF-IDF rows) one shard at a time.
+        """
+        idf = self.idf
+        for shard in self._shards():
+            counts, ids = _read_shard(shard)
+            yield ids, self._weigh(counts, idf)
+
+    def matrix(self) -> Tuple[List[str], sparse.csr_matrix]:
+        """
+        All job ids and the full TF-IDF matrix, for corpora that fit in memory.
+        """
+        job_ids, blocks = [], []
+        for ids, block in self.iter_shards():
+            job_ids.extend(ids)
+            blocks.append(block)
+        if not blocks:
+            return [], sparse.csr_matrix((0, self.n_features), dtype=np.float32)
+        return job_ids, sparse.vstack(blocks, format='csr')
+
+def _write_shard(path: str, counts: sparse.csr_matrix, job_ids: List[str]):
+    tmp_path = path[:-len(".npz")] + ".tmp.npz"
+    np.savez_compressed(tmp_path, data=counts.data, indices=counts.indices, indptr=counts.indptr,
+                        shape=np.array(counts.shape), job_ids=np.array(job_ids, dtype=str))
+    os.replace(tmp_path, path)
+
+def _read_shard(path: str) -> Tuple[sparse.csr_matrix, List[str]]:
+    with np.load(path, allow_pickle=False) as shard:
+        counts = sparse.csr_matrix((shard["data"], shard["indices"], shard["indptr"]), shape=tuple(shard["shape"]))
+        return counts, shard["job_ids"].tolist()
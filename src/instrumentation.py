@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import logging
+import itertools
+import threading
+import functools
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Callable
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Instrumentation")
+
+# Opt-in profiling without code edits: comma-separated span names (or "*")
+PROFILE_ENV = "CAREER_PROFILE"
+TRACEMALLOC_ENV = "CAREER_TRACEMALLOC"
+PROFILE_DIR_ENV = "CAREER_PROFILE_DIR"
+
+class Span:
+    __slots__ = ("id", "parent_id", "name", "attrs", "counters", "start", "end", "thread")
+
+    def __init__(self, span_id: int, parent_id: Optional[int], name: str, attrs: Dict):
+        self.id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.counters = Counter()
+        self.start = time.time()
+        self.end = None
+        self.thread = threading.get_ident()
+
+    @property
+    def seconds(self) -> float:
+        return (self.end if self.end is not None else time.time()) - self.start
+
+    def to_dict(self) -> Dict:
+        return {"id": self.id, "parent_id": self.parent_id, "name": self.name, "start": self.start,
+                "seconds": self.seconds, "thread": self.thread, "attrs": self.attrs,
+                "counters": dict(self.counters)}
+
+class Tracer:
+    """
+    Records timed spans and counters.
+
+    Spans nest per thread; `count` adds to every open span on the calling
+    thread (so a stage span totals its sub-spans) and to process-wide
+    totals. Finished spans are kept in a bounded buffer for export as JSON
+    lines or a Chrome trace (chrome://tracing, Perfetto).
+
+    Spans whose name is listed in $CAREER_PROFILE run under cProfile, and
+    those in $CAREER_TRACEMALLOC under tracemalloc; results go to
+    $CAREER_PROFILE_DIR (default reports/profiles).
+    """
+    def __init__(self, max_spans: int = 100000):
+        self.spans = deque(maxlen=max_spans)
+        self.totals = Counter()
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        stack = self._stack()
+        span = Span(next(self._ids), stack[-1].id if stack else None, name, attrs)
+        stack.append(span)
+        hooks = _ProfileHooks(name)
+        hooks.start()
+        try:
+            yield span
+        finally:
+            span.end = time.time()
+            hooks.stop(span)
+            stack.pop()
+            with self._lock:
+                self.spans.append(span)
+
+    def traced(self, name: Optional[str] = None) -> Callable:
+        """
+        Decorator form of `span`, named after the function by default.
+        """
+        def decorator(func):
+            span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, value: int = 1):
+        for span in self._stack():
+            span.counters[name] += value
+        with self._lock:
+            self.totals[name] += value
+
+    def finished(self, since: Optional[float] = None) -> List[Span]:
+        with self._lock:
+            spans = list(self.spans)
+        return [s for s in spans if since is None or s.start >= since]
+
+    def export_jsonl(self, path: str, since: Optional[float] = None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            for span in self.finished(since):
+                f.write(json.dumps(span.to_dict()) + "\n")
+
+    def export_chrome_trace(self, path: str, since: Optional[float] = None):
+        """
+        Complete ("X") events in the Chrome trace event format, with the
+        span's attributes and counters as args.
+        """
+        pid = os.getpid()
+        events = [{"name": span.name, "ph": "X", "ts": span.start * 1e6, "dur": span.seconds * 1e6,
+                   "pid": pid, "tid": span.thread, "args": {**span.attrs, **span.counters}}
+                  for span in self.finished(since)]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.totals.clear()
+
+def _enabled(env: str, name: str) -> bool:
+    names = {n.strip() for n in os.environ.get(env, "").split(",") if n.strip()}
+    return "*" in names or name in names
+
+# Spans currently tracing memory; tracemalloc has one process-wide peak,
+# so it is folded into each of them before a nested span resets it
+_memory_lock = threading.Lock()
+_memory_hooks = []
+
+def _fold_peak():
+    import tracemalloc
+    _, peak = tracemalloc.get_traced_memory()
+    for hook in _memory_hooks:
+        hook.peak = max(hook.peak, peak)
+
+class _ProfileHooks:
+    """
+    cProfile / tracemalloc around one span, when enabled for its name.
+    tracemalloc is process-wide, so its peak includes concurrent spans,
+    and an enclosing span's peak includes its nested spans'.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.profiler = None
+        self.tracing = False
+        self.peak = 0
+
+    def start(self):
+        if _enabled(PROFILE_ENV, self.name):
+            import cProfile
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except ValueError as e:
+                # Only one profiler can be active at a time
+                logger.warning(f"Not profiling {self.name}: {e}")
+                self.profiler = None
+        if _enabled(TRACEMALLOC_ENV, self.name):
+            import tracemalloc
+            with _memory_lock:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self.tracing = True
+                _fold_peak()
+                tracemalloc.reset_peak()
+                _memory_hooks.append(self)
+
+    def stop(self, span: Span):
+        if self.profiler is None and not _enabled(TRACEMALLOC_ENV, self.name):
+            return
+        out_dir = os.environ.get(PROFILE_DIR_ENV, "reports/profiles")
+        os.makedirs(out_dir, exist_ok=True)
+        file_name = self.name.replace(os.sep, "_")
+        if self.profiler is not None:
+            self.profiler.disable()
+            path = os.path.join(out_dir, f"{file_name}.prof")
+            self.profiler.dump_stats(path)
+            span.attrs["cprofile"] = path
+            logger.info(f"Saved cProfile stats for {self.name} to {path}")
+        if _enabled(TRACEMALLOC_ENV, self.name):
+            import tracemalloc
+            with _memory_lock:
+                _fold_peak()
+                _memory_hooks.remove(self)
+                peak = self.peak
+                snapshot = tracemalloc.take_snapshot()
+                if self.tracing:
+                    tracemalloc.stop()
+            path = os.path.join(out_dir, f"{file_name}.tracemalloc.txt")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f"peak traced: {peak / 2**20:.1f} MB\n")
+                for stat in snapshot.statistics('lineno')[:25]:
+                    f.write(f"{stat}\n")
+            span.attrs.update(tracemalloc=path, peak_traced_mb=peak / 2**20)
+            logger.info(f"Saved tracemalloc top allocations for {self.name} to {path}")
+
+# Process-wide tracer used by the pipeline modules and the UI
+tracer = Tracer()
+span = tracer.span
+traced = tracer.traced
+count = tracer.count
@@ -0,0 +1,196 @@
+import os
+import time
+import logging
+import argparse
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Dict, Tuple, Iterable, Optional
+import numpy as np
+from scipy import sparse
+from src.artifacts import ArtifactBundle, load_vectorizer, artifact_version, BUNDLE_SUFFIX
+from src.job_store import ParsedJobStore
+from src.hashed_tfidf import HashedTfidfStore
+from src.instrumentation import span
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("JobRetrieval")
+
+@dataclass
+class JobMatch:
+    job_id: str
+    score: float
+    title: Optional[str] = None
+    company: Optional[str] = None
+    location: Optional[str] = None
+    url: Optional[str] = None
+
+class InvertedIndex:
+    """
+    Term -> postings index over an L2-normalised job x term TF-IDF matrix.
+
+    Each term's postings (job rows and weights) are stored contiguously and
+    impact-ordered, highest weight first. A query reads the postings of its
+    own terms only, in rounds of growing depth (no-random-access top-k):
+    after each round every job seen so far has a partial score, and the
+    weights at the current depth bound what the unread postings can add.
+    Once the k-th best partial score beats every other job's bound, the
+    top k are final and the rest of the postings are never read. The k
+    winners are then rescored exactly from their matrix rows.
+
+    With `max_postings` no term is read past that depth: an approximate
+    search whose cost stays bounded however large the corpus grows.
+    """
+    def __init__(self, matrix: sparse.spmatrix, first_depth: int = 1024):
+        self.rows = sparse.csr_matrix(matrix)
+        csc = self.rows.tocsc()
+        self.n_docs, self.n_terms = csc.shape
+        self.indptr = csc.indptr.astype(np.int64)
+        self.docs = csc.indices.astype(np.int32)
+        self.weights = csc.data.astype(np.float32)
+        # Only terms with several postings need sorting (hashed spaces are mostly empty)
+        for term in np.flatnonzero(np.diff(self.indptr) > 1):
+            start, end = self.indptr[term], self.indptr[term + 1]
+            order = np.argsort(-csc.data[start:end], kind='stable')
+            self.docs[start:end] = csc.indices[start:end][order]
+            self.weights[start:end] = csc.data[start:end][order]
+        self.first_depth = first_depth
+
+    def _accumulate(self, docs: np.ndarray, values: List[np.ndarray]) -> Tuple[np.ndarray, List[np.ndarray]]:
+        """
+        Distinct jobs in `docs` and the per-job sums of each array in `values`.
+        """
+        if len(docs) * 8 >= self.n_docs:
+            # Dense accumulator: cheaper than sorting once most jobs are touched
+            sums = [np.bincount(docs, weights=v, minlength=self.n_docs) for v in values]
+            candidates = np.flatnonzero(sums[0])
+            return candidates, [s[candidates] for s in sums]
+        candidates, inverse = np.unique(docs, return_inverse=True)
+        return candidates, [np.bincount(inverse, weights=v) for v in values]
+
+    @staticmethod
+    def _top(scores: np.ndarray, k: int) -> np.ndarray:
+        k = min(k, len(scores))
+        return np.argpartition(-scores, k - 1)[:k]
+
+    def search(self, terms: np.ndarray, weights: np.ndarray, k: int,
+               max_postings: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-`k` (rows, scores) by dot product with the query, best first.
+        Jobs sharing no term with the query are never returned.
+        """
+        terms = np.asarray(terms, dtype=np.int64)
+        weights = np.asarray(weights, dtype=np.float64)
+        starts = self.indptr[terms]
+        lengths = self.indptr[terms + 1] - starts
+        if k <= 0 or not lengths.sum():
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        limit = int(lengths.max()) if max_postings is None else min(int(lengths.max()), max_postings)
+        depth = min(self.first_depth, limit)
+        while True:
+            seen = np.minimum(lengths, depth)
+            docs = np.concatenate([self.docs[s:s + n] for s, n in zip(starts, seen)])
+            contributions = np.concatenate([self.weights[s:s + n] * w for s, n, w in zip(starts, seen, weights)])
+            if depth >= limit:
+                # Last round: nothing left to bound
+                candidates, (lower,) = self._accumulate(docs, [contributions])
+                top = self._top(lower, k)
+                break
+            # Upper bound on what each term can still add to a job it has not reached
+            remaining = np.zeros(len(terms))
+            open_terms = seen < lengths
+            remaining[open_terms] = weights[open_terms] * self.weights[starts[open_terms] + seen[open_terms]]
+            candidates, (lower, seen_unread) = self._accumulate(docs, [contributions, np.repeat(remaining, seen)])
+            top = self._top(lower, k)
+            # Every other job, seen or not, must be unable to overtake the k-th
+            upper = lower + remaining.sum() - seen_unread
+            upper[top] = -np.inf
+            best_other = max(upper.max() if len(upper) else 0.0, remaining.sum())
+            if len(top) == k and lower[top].min() >= best_other:
+                break
+            depth = min(depth * 4, limit)
+
+        rows = candidates[top]
+        query = np.zeros(self.n_terms)
+        query[terms] = weights
+        scores = self.rows[rows] @ query
+        order = np.argsort(-scores, kind='stable')
+        return rows[order], scores[order]
+
+class JobRetriever:
+    """
+    Nearest-neighbour job search over the TF-IDF bundle (or hashed TF-IDF
+    shards) written by SkillExtractor. A profile's skills and interests are vectorized with
+    the saved vectorizer and matched against an InvertedIndex of the job
+    matrix by cosine similarity (both sides are L2-normalised). Titles,
+    companies and links come from the parsed job store when it exists.
+    """
+    def __init__(self, tfidf_path: str = os.path.join("data/embeddings", "job_tfidf" + BUNDLE_SUFFIX),
+                 store_dir: Optional[str] = "data/jobs/parsed/jobs_store", max_postings: Optional[int] = None,
+                 latency_window: int = 10000):
+        self.version = artifact_version(tfidf_path)
+        if HashedTfidfStore.exists(tfidf_path):
+            # Hashed shards: the store vectorizes queries with the current IDF
+            self.vectorizer = HashedTfidfStore(tfidf_path)
+            self.job_ids, matrix = self.vectorizer.matrix()
+        else:
+            bundle = ArtifactBundle(tfidf_path)
+            self.vectorizer = load_vectorizer(bundle)
+            self.job_ids, matrix = bundle.get("job_ids"), bundle.get("matrix")
+        self.max_postings = max_postings
+        with span("job_retrieval.build_index"):
+            self.index = InvertedIndex(matrix)
+        self.store_dir = store_dir
+        self._details = None
+        self.latencies = deque(maxlen=latency_window)
+        logger.info(f"Indexed {self.index.n_docs} jobs over {self.index.n_terms} terms")
+
+    def query_vector(self, skills: Iterable[str], interests: Iterable[str] = ()) -> sparse.csr_matrix:
+        return self.vectorizer.transform([" ".join(list(skills) + list(interests))])
+
+    def search(self, skills: Iterable[str], interests: Iterable[str] = (), k: int = 10) -> List[JobMatch]:
+        start = time.perf_counter()
+        query = self.query_vector(skills, interests)
+        rows, scores = self.index.search(query.indices, query.data, k, self.max_postings)
+        self.latencies.append(time.perf_counter() - start)
+        details = self._job_details()
+        matches = []
+        for row, score in zip(rows, scores):
+            job_id = self.job_ids[row]
+            title, company, location, url = details.get(job_id, (None, None, None, None))
+            matches.append(JobMatch(job_id, float(score), title, company, location, url))
+        return matches
+
+    def _job_details(self) -> Dict[str, Tuple]:
+        if self._details is None:
+            self._details = {}
+            store = ParsedJobStore(self.store_dir) if self.store_dir else None
+            if store is not None and store.exists():
+                for batch in store.iter_batches(columns=["id", "title", "company", "location", "url"]):
+                    self._details.update(zip(batch["id"], zip(batch["title"], batch["company"],
+                                                              batch["location"], batch["url"])))
+            else:
+                logger.warning(f"No parsed job store at {self.store_dir}; matches will only carry job ids")
+        return self._details
+
+    def latency_stats(self) -> Dict[str, float]:
+        """
+        p50/p99/max query latency in milliseconds over the recent window.
+        """
+        if not self.latencies:
+            return {"count": 0}
+        ms = np.asarray(self.latencies) * 1000
+        return {"count": len(ms), "p50_ms": float(np.percentile(ms, 50)),
+                "p99_ms": float(np.percentile(ms, 99)), "max_ms": float(ms.max())}
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Find the job postings closest to a student profile.")
+    arg_parser.add_argument("skills", nargs="+")
+    arg_parser.add_argument("--interests", nargs="*", default=[])
+    arg_parser.add_argument("--k", type=int, default=10)
+    arg_parser.add_argument("--max-postings", type=int, help="approximate search: strongest postings per term")
+    args = arg_parser.parse_args()
+
+    retriever = JobRetriever(max_postings=args.max_postings)
+    for match in retriever.search(args.skills, args.interests, args.k):
+        print(f"{match.score:.3f}  {match.job_id}  {match.title or ''} {'@ ' + match.company if match.company else ''}")
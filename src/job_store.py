@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import uuid
+import logging
+from typing import List, Dict, Iterable, Iterator, Optional, Set
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from src.instrumentation import count
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("ParsedJobStore")
+
+# Fields every job has; anything else is kept as JSON in the "extra" column
+STRING_FIELDS = ["id", "title", "company", "location", "description", "posted_date", "source", "url"]
+
+SCHEMA = pa.schema(
+    [(name, pa.string()) for name in STRING_FIELDS]
+    + [("extracted_skills", pa.list_(pa.string())), ("extra", pa.string())]
+)
+
+class ParsedJobStore:
+    """
+    Columnar store for parsed jobs: a directory of Parquet part files
+    sharing one schema, with `extracted_skills` as a list column.
+
+    Readers can select only the columns they need and stream them in record
+    batches. Appends add a new part file, so topping up the store never
+    rewrites existing data.
+    """
+    def __init__(self, store_dir: str = "data/jobs/parsed/jobs_store"):
+        self.store_dir = store_dir
+
+    def exists(self) -> bool:
+        return os.path.isdir(self.store_dir) and bool(self._parts())
+
+    def _parts(self) -> List[str]:
+        if not os.path.isdir(self.store_dir):
+            return []
+        return sorted(os.path.join(self.store_dir, f) for f in os.listdir(self.store_dir) if f.endswith('.parquet'))
+
+    @staticmethod
+    def _to_batch(jobs: List[Dict]) -> pa.RecordBatch:
+        columns = {name: [] for name in SCHEMA.names}
+        for job in jobs:
+            for name in STRING_FIELDS:
+                value = job.get(name)
+                columns[name].append(None if value is None else str(value))
+            columns["extracted_skills"].append(list(job.get("extracted_skills", [])))
+            extra = {k: v for k, v in job.items() if k not in STRING_FIELDS and k != "extracted_skills"}
+            columns["extra"].append(json.dumps(extra) if extra else None)
+        return pa.RecordBatch.from_pydict(columns, schema=SCHEMA)
+
+    def writer(self, overwrite: bool = False) -> "PartWriter":
+        """
+        Opens a new part file. With `overwrite=True` existing parts are
+        removed once the new part is closed.
+        """
+        os.makedirs(self.store_dir, exist_ok=True)
+        replaced = self._parts() if overwrite else []
+        # Time-ordered names keep parts (and so jobs) in write order
+        name = f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+        return PartWriter(os.path.join(self.store_dir, name), replaced)
+
+    def write(self, jobs: Iterable[Dict], batch_size: int = 10000):
+        """
+        Replaces the store contents with `jobs`.
+        """
+        with self.writer(overwrite=True) as writer:
+            batch = []
+            for job in jobs:
+                batch.append(job)
+                if len(batch) >= batch_size:
+                    writer.write(batch)
+                    batch = []
+            writer.write(batch)
+        logger.info(f"Saved parsed jobs to {self.store_dir}")
+
+    def append(self, jobs: List[Dict]):
+        if not jobs:
+            return
+        with self.writer() as writer:
+            writer.write(jobs)
+
+    def remove(self, job_ids: Set[str]):
+        """
+        Drops jobs by id, rewriting only the part files that contain them.
+        """
+        if not job_ids:
+            return
+        id_array = pa.array(list(job_ids), type=pa.string())
+        for part in self._parts():
+            table = pq.read_table(part)
+            keep = pc.invert(pc.is_in(table["id"], value_set=id_array))
+            if pc.all(keep).as_py():
+                continue
+            kept = table.filter(keep)
+            if kept.num_rows:
+                pq.write_table(kept, part + ".tmp")
+                os.replace(part + ".tmp", part)
+            else:
+                os.remove(part)
+
+    def count(self) -> int:
+        return sum(pq.ParquetFile(part).metadata.num_rows for part in self._parts())
+
+    def iter_batches(self, columns: Optional[List[str]] = None, batch_size: int = 10000) -> Iterator[Dict[str, list]]:
+        """
+        Streams the store as {column: values} batches of at most `batch_size`
+        rows, reading only `columns`.
+        """
+        for part in self._parts():
+            for batch in pq.ParquetFile(part).iter_batches(batch_size=batch_size, columns=columns):
+                yield batch.to_pydict()
+
+    def iter_jobs(self, columns: Optional[List[str]] = None, batch_size: int = 10000) -> Iterator[Dict]:
+        """
+        Streams jobs as dicts. Selecting all columns gives back the jobs as
+        they were written.
+        """
+        for batch in self.iter_batches(columns, batch_size):
+            names = list(batch)
+            for values in zip(*batch.values()):
+                job = dict(zip(names, values))
+                if columns is None:
+                    extra = job.pop("extra")
+                    job = {k: v for k, v in job.items() if v is not None or k == "id"}
+                    if extra:
+                        job.update(json.loads(extra))
+                yield job
+
+    def export_json(self, path: str):
+        """
+        Writes the store as the legacy indented jobs.json array, one job at a time.
+        """
+        with open(path, 'w') as f:
+            f.write('[')
+            for i, job in enumerate(self.iter_jobs()):
+                f.write((',\n' if i else '\n') + json.dumps(job, indent=2))
+            f.write('\n]')
+        logger.info(f"Exported parsed jobs to {path}")
+
+class PartWriter:
+    """
+    Writes record batches into a single Parquet part file.
+    """
+    def __init__(self, path: str, replaced: List[str]):
+        self.path = path
+        self.replaced = replaced
+        self._writer = pq.ParquetWriter(path + ".tmp", SCHEMA)
+
+    def write(self, jobs: List[Dict]):
+        if jobs:
+            self._writer.write_batch(ParsedJobStore._to_batch(jobs))
+            count("rows_written", len(jobs))
+
+    def close(self):
+        self._writer.close()
+        count("bytes_written", os.path.getsize(self.path + ".tmp"))
+        os.replace(self.path + ".tmp", self.path)
+        for part in self.replaced:
+            os.remove(part)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._writer.close()
+            os.remove(self.path + ".tmp")
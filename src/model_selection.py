@@ -0,0 +1,299 @@
+import os
+import json
+import math
+import time
+import pickle
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import List, Dict, Optional, Union
+import numpy as np
+from scipy import sparse
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from src.instrumentation import span, count
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("ModelSelection")
+
+# Default grid per model family (xgboost is skipped when it is not installed)
+MODEL_GRIDS = {
+    "random_forest": {"n_estimators": [100, 300], "max_depth": [None, 16], "min_samples_leaf": [1, 3]},
+    "extra_trees": {"n_estimators": [100, 300], "max_depth": [None, 16], "min_samples_leaf": [1, 3]},
+    "logistic_regression": {"C": [0.1, 1.0, 10.0]},
+    "xgboost": {"n_estimators": [100, 300], "max_depth": [4, 8], "learning_rate": [0.1, 0.3]},
+}
+
+def build_estimator(family: str, params: Dict, seed: int = 42):
+    """
+    Unfitted single-threaded estimator of `family` with `params`; the
+    search parallelises across candidates instead.
+    """
+    if family == "random_forest":
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(random_state=seed, n_jobs=1, **params)
+    if family == "extra_trees":
+        from sklearn.ensemble import ExtraTreesClassifier
+        return ExtraTreesClassifier(random_state=seed, n_jobs=1, **params)
+    if family == "logistic_regression":
+        from sklearn.linear_model import LogisticRegression
+        return LogisticRegression(max_iter=1000, **params)
+    if family == "xgboost":
+        from xgboost import XGBClassifier
+        return XGBClassifier(random_state=seed, n_jobs=1, tree_method="hist", **params)
+    raise ValueError(f"Unknown model family: {family}")
+
+def _available(family: str) -> bool:
+    if family != "xgboost":
+        return True
+    try:
+        import xgboost  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("xgboost is not installed; skipping it in the model search")
+        return False
+
+def candidate_grid(families: Union[None, List[str], Dict[str, Dict[str, list]]] = None) -> List[Dict]:
+    """
+    Every {"family", "params"} combination of the given families: a list
+    of names (default grids), a {name: grid} dict, or None for all.
+    """
+    if families is None or isinstance(families, (list, tuple)):
+        families = {name: MODEL_GRIDS[name] for name in (families or MODEL_GRIDS)}
+    candidates = []
+    for family, grid in families.items():
+        if not _available(family):
+            continue
+        keys = sorted(grid)
+        for values in product(*(grid[key] for key in keys)):
+            candidates.append({"family": family, "params": dict(zip(keys, values))})
+    return candidates
+
+def _fingerprint(X: sparse.csr_matrix, y: np.ndarray) -> str:
+    digest = hashlib.sha1()
+    for part in (X.data, X.indices, X.indptr, y):
+        digest.update(np.ascontiguousarray(part).tobytes())
+    digest.update(str(X.shape).encode())
+    return digest.hexdigest()
+
+class ModelSearch:
+    """
+    Cross-validated model selection over several model families with
+    successive halving.
+
+    Round 1 scores every candidate on a stratified subset of the training
+    rows; each later round keeps the best 1/`factor` of the candidates and
+    gives them `factor` times more rows, until the survivors see all of
+    them. Each (candidate, fold, rows) fit is one task for a process
+    pool. Its result is written to `cache_dir` as JSON, keyed by the data
+    fingerprint and the settings, so an interrupted search resumes where
+    it stopped and a repeated one costs nothing.
+
+    Alongside the score, every fit records its fit time, single-row
+    predict_proba latency and pickled size for the leaderboard.
+    """
+    def __init__(self, families: Union[None, List[str], Dict[str, Dict[str, list]]] = None, cv: int = 3,
+                 factor: int = 3, min_resources: Optional[int] = None, scoring: str = "accuracy",
+                 halving: bool = True, n_jobs: int = -1, cache_dir: Optional[str] = "reports/model_search",
+                 seed: int = 42):
+        self.candidates = candidate_grid(families)
+        if not self.candidates:
+            raise ValueError("No model candidates to search")
+        self.cv = cv
+        self.factor = factor
+        self.min_resources = min_resources
+        self.scoring = scoring
+        self.halving = halving
+        if n_jobs is not None and n_jobs != -1 and n_jobs < 1:
+            raise ValueError(f"n_jobs must be -1, None or a positive integer, got {n_jobs}")
+        self.n_jobs = os.cpu_count() if n_jobs in (None, -1) else n_jobs
+        self.cache_dir = cache_dir
+        self.seed = seed
+        self.cache_hits = 0
+
+    def _schedule(self, n_samples: int, n_classes: int) -> List[int]:
+        """
+        Training rows per round, smallest first, ending at `n_samples`.
+        """
+        if not self.halving or len(self.candidates) == 1:
+            return [n_samples]
+        min_resources = self.min_resources or max(2 * self.cv * n_classes, 30)
+        rounds = 1 + int(math.log(len(self.candidates), self.factor))
+        rounds = max(1, min(rounds, 1 + int(math.log(max(n_samples / min_resources, 1), self.factor))))
+        return [n_samples // self.factor ** (rounds - 1 - i) for i in range(rounds)]
+
+    def _cache_path(self, key: Dict) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        name = hashlib.sha1(json.dumps(key, sort_keys=True).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def _run_tasks(self, tasks: List[Dict]) -> List[Dict]:
+        results, pending = [None] * len(tasks), []
+        for i, task in enumerate(tasks):
+            path = self._cache_path(task["key"])
+            if path and os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    results[i] = json.load(f)
+                self.cache_hits += 1
+            else:
+                pending.append(i)
+        count("model_search_fits", len(pending))
+
+        def store(i, result):
+            results[i] = result
+            path = self._cache_path(tasks[i]["key"])
+            if path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(path + ".tmp", 'w', encoding='utf-8') as f:
+                    json.dump(result, f)
+                os.replace(path + ".tmp", path)
+
+        if self.n_jobs == 1 or len(pending) <= 1:
+            for i in pending:
+                store(i, _evaluate(tasks[i]))
+        elif pending:
+            with ProcessPoolExecutor(max_workers=min(self.n_jobs, len(pending)), initializer=_init_worker,
+                                     initargs=(self._X, self._y, self.scoring, self.seed)) as pool:
+                futures = {i: pool.submit(_evaluate, tasks[i]) for i in pending}
+                for i, future in futures.items():
+                    # Cached as each fit lands, so an interrupt keeps the finished ones
+                    store(i, future.result())
+        return results
+
+    def run(self, X: sparse.spmatrix, y) -> List[Dict]:
+        """
+        Searches all candidates on (X, y) and returns the leaderboard, best
+        first: the candidates that reached the last round by score (then
+        predict latency), followed by the ones dropped earlier.
+        """
+        X = sparse.csr_matrix(X)
+        classes, y_codes = np.unique(np.asarray(y), return_inverse=True)
+        self._X, self._y = X, y_codes
+        _init_worker(X, y_codes, self.scoring, self.seed)
+        data = _fingerprint(X, y_codes)
+        folds = list(StratifiedKFold(self.cv, shuffle=True, random_state=self.seed).split(np.zeros(len(y_codes)), y_codes))
+        schedule = self._schedule(int(max(len(train) for train, _ in folds)), len(classes))
+        self.cache_hits = 0
+
+        survivors = list(range(len(self.candidates)))
+        reached = {}
+        start = time.perf_counter()
+        for round_index, resources in enumerate(schedule):
+            tasks = []
+            for c in survivors:
+                for fold, (train, val) in enumerate(folds):
+                    candidate = self.candidates[c]
+                    key = {"data": data, "family": candidate["family"], "params": candidate["params"],
+                           "cv": self.cv, "fold": fold, "resources": resources, "scoring": self.scoring,
+                           "seed": self.seed}
+                    tasks.append({"candidate": c, "family": candidate["family"], "params": candidate["params"],
+                                  "train": train, "val": val, "resources": resources, "key": key})
+            with span("model_search.round", round=round_index, candidates=len(survivors), rows=resources):
+                results = self._run_tasks(tasks)
+            for task, result in zip(tasks, results):
+                reached.setdefault(task["candidate"], {}).setdefault(round_index, []).append(result)
+            scores = {c: np.mean([r["score"] for r in reached[c][round_index]]) for c in survivors}
+            logger.info(f"Round {round_index + 1}/{len(schedule)}: {len(survivors)} candidates on {resources} rows, "
+                        f"best {max(scores.values()):.4f}")
+            if round_index < len(schedule) - 1:
+                keep = max(1, math.ceil(len(survivors) / self.factor))
+                survivors = sorted(survivors, key=lambda c: -scores[c])[:keep]
+        self.seconds = time.perf_counter() - start
+
+        leaderboard = []
+        for c, rounds in reached.items():
+            last = max(rounds)
+            fold_results = rounds[last]
+            leaderboard.append({
+                "family": self.candidates[c]["family"],
+                "params": self.candidates[c]["params"],
+                "rounds": last + 1,
+                "rows": schedule[last],
+                "score": float(np.mean([r["score"] for r in fold_results])),
+                "score_std": float(np.std([r["score"] for r in fold_results])),
+                "fit_seconds": float(np.mean([r["fit_seconds"] for r in fold_results])),
+                "predict_ms": float(np.mean([r["predict_ms"] for r in fold_results])),
+                "size_kb": float(np.mean([r["size_bytes"] for r in fold_results])) / 1024,
+            })
+        # Ties go to the faster model at serving time
+        leaderboard.sort(key=lambda row: (-row["rounds"], -row["score"], row["predict_ms"]))
+        for rank, row in enumerate(leaderboard, 1):
+            row["rank"] = rank
+        logger.info(f"Searched {len(self.candidates)} candidates in {self.seconds:.1f}s "
+                    f"({self.cache_hits} fits from cache); best: {leaderboard[0]['family']} {leaderboard[0]['params']}")
+        return leaderboard
+
+    def write_leaderboard(self, leaderboard: List[Dict], reports_dir: str = "reports"):
+        """
+        reports/model_leaderboard.json (with the search settings) and a
+        markdown table next to it.
+        """
+        os.makedirs(reports_dir, exist_ok=True)
+        with open(os.path.join(reports_dir, "model_leaderboard.json"), 'w') as f:
+            json.dump({"scoring": self.scoring, "cv": self.cv, "factor": self.factor, "halving": self.halving,
+                       "candidates": len(self.candidates), "seconds": self.seconds, "cache_hits": self.cache_hits,
+                       "leaderboard": leaderboard}, f, indent=2)
+        with open(os.path.join(reports_dir, "model_leaderboard.md"), 'w') as f:
+            f.write("# Model Leaderboard\n\n")
+            f.write(f"| rank | family | params | rows | {self.scoring} | fit (s) | predict (ms) | size (KB) |\n")
+            f.write("|---|---|---|---|---|---|---|---|\n")
+            for row in leaderboard:
+                params = ", ".join(f"{k}={v}" for k, v in row["params"].items())
+                f.write(f"| {row['rank']} | {row['family']} | {params} | {row['rows']} | "
+                        f"{row['score']:.4f} ± {row['score_std']:.4f} | {row['fit_seconds']:.2f} | "
+                        f"{row['predict_ms']:.3f} | {row['size_kb']:.0f} |\n")
+
+# Per-process training data for the search pool, set once by the initializer
+_worker_X = None
+_worker_y = None
+_worker_scoring = None
+_worker_seed = None
+
+def _init_worker(X: sparse.csr_matrix, y: np.ndarray, scoring: str, seed: int):
+    global _worker_X, _worker_y, _worker_scoring, _worker_seed
+    _worker_X, _worker_y, _worker_scoring, _worker_seed = X, y, scoring, seed
+
+def _subsample(train: np.ndarray, size: int, seed: int) -> np.ndarray:
+    """
+    `size` rows of `train`, stratified by label when every class has at
+    least two rows there and the subset can hold one of each. Otherwise
+    (rare roles can have a single row per fold) one random row of every
+    class in `train` plus random rows up to `size`, so estimators that
+    need contiguous labels (XGBClassifier) still see every class.
+    """
+    try:
+        subset, _ = train_test_split(train, train_size=size, stratify=_worker_y[train], random_state=seed)
+        return subset
+    except ValueError:
+        pass
+    rng = np.random.default_rng(seed)
+    shuffled = rng.permutation(train)
+    _, first = np.unique(_worker_y[shuffled], return_index=True)
+    rest = np.delete(shuffled, first)
+    return np.concatenate([shuffled[first], rest[:max(size - len(first), 0)]])
+
+def _evaluate(task: Dict) -> Dict:
+    """
+    Fits one candidate on a `resources`-row subset of one fold's training
+    rows (see _subsample) and scores it on the fold's validation rows.
+    """
+    train, val = task["train"], task["val"]
+    if task["resources"] < len(train):
+        train = _subsample(train, task["resources"], _worker_seed)
+    model = build_estimator(task["family"], task["params"], _worker_seed)
+    start = time.perf_counter()
+    model.fit(_worker_X[train], _worker_y[train])
+    fit_seconds = time.perf_counter() - start
+    score = get_scorer(_worker_scoring)(model, _worker_X[val], _worker_y[val])
+    # Single-row latency, as one UI request sees it
+    rows = [_worker_X[i:i + 1] for i in val[:20]]
+    latencies = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict_proba(row)
+        latencies.append(time.perf_counter() - start)
+    return {"score": float(score), "fit_seconds": fit_seconds, "predict_ms": float(np.median(latencies)) * 1000,
+            "size_bytes": len(pickle.dumps(model)), "rows": int(len(train))}
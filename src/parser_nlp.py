@@ -1,21 +1,117 @@
 import os
 import json
-import pickle
+import gzip
+import hashlib
 import logging
-from typing import List, Dict, Set
-from collections import defaultdict
+import argparse
+import shutil
+import tempfile
+from typing import List, Dict, Set, Iterable, Iterator, Optional, Tuple
+from collections import defaultdict, Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 import re
+import zlib
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
+from src.job_store import ParsedJobStore
+from src.dedup import JobDeduplicator, MinHasher
+from src.artifacts import ArtifactBundle, save_tfidf, load_vectorizer, BUNDLE_SUFFIX
+from src.hashed_tfidf import HashedTfidfStore
+from src.features import SKILL_ALIASES, normalize_skill
+from src.instrumentation import span, traced, count
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("ParserAndNLP")
 
+# Raw inputs: legacy single-job files and JSONL shards from ShardJobSink
+RAW_SUFFIXES = ('.json', '.jsonl', '.jsonl.gz')
+MANIFEST_VERSION = 2
+
+class SkillMatcher:
+    """
+    Finds every vocabulary term in a text in a single regex scan.
+
+    The terms are folded into a prefix trie and compiled into one pattern,
+    so matching cost depends on the text length rather than on the number
+    of terms. Semantics are the same as running `\\b<term>\\b` once per term:
+    overlapping matches are reported and terms that are prefixes of a longer
+    match are re-checked for a word boundary.
+    """
+    _boundary = re.compile(r'\b')
+
+    def __init__(self, terms: Dict[str, Set[str]]):
+        # term -> canonical skills it stands for
+        self.targets = {term: set(canonical) for term, canonical in terms.items() if term}
+        trie = {}
+        for term in self.targets:
+            node = trie
+            for ch in term:
+                node = node.setdefault(ch, {})
+            node[''] = True
+
+        # For each term, the shorter terms it starts with
+        self.prefixes = {}
+        for term in self.targets:
+            node = trie
+            found = []
+            for i, ch in enumerate(term[:-1]):
+                node = node[ch]
+                if '' in node:
+                    found.append(term[:i + 1])
+            if found:
+                self.prefixes[term] = found
+
+        self.pattern = None
+        if trie:
+            # The lookahead makes finditer try every start position, so
+            # matches that overlap are not swallowed by an earlier one.
+            self.pattern = re.compile(r'(?=\b(' + self._trie_to_regex(trie) + r')\b)')
+
+    @classmethod
+    def _trie_to_regex(cls, node: Dict) -> str:
+        branches = [re.escape(ch) + cls._trie_to_regex(child)
+                    for ch, child in sorted(node.items()) if ch != '']
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # Greedy optional: prefer the longest term, backtrack to this one
+            body = '(?:' + body + ')?'
+        return body
+
+    def find(self, text: str) -> Set[str]:
+        found = set()
+        if self.pattern is None:
+            return found
+        for m in self.pattern.finditer(text):
+            term = m.group(1)
+            found.update(self.targets[term])
+            start = m.start()
+            for prefix in self.prefixes.get(term, ()):
+                if self._boundary.match(text, start + len(prefix)):
+                    found.update(self.targets[prefix])
+        return found
+
 class SkillExtractor:
-    def __init__(self, raw_data_dir: str = "data/jobs/raw", output_dir: str = "data/skills", embeddings_dir: str = "data/embeddings"):
+    def __init__(self, raw_data_dir: str = "data/jobs/raw", output_dir: str = "data/skills", embeddings_dir: str = "data/embeddings",
+                 parsed_dir: str = "data/jobs/parsed", export_json: bool = True, dedup: bool = True,
+                 hashing: bool = False, hashing_features: int = 2 ** 18, refit_threshold: float = 0.2):
         self.raw_data_dir = raw_data_dir
         self.output_dir = output_dir
         self.embeddings_dir = embeddings_dir
+        self.parsed_dir = parsed_dir
+        # Parsed jobs live in a columnar store; jobs.json is kept as an export
+        self.store = ParsedJobStore(os.path.join(parsed_dir, "jobs_store"))
+        self.export_json = export_json
+        # Near-duplicate postings are dropped before they reach the outputs
+        self.deduplicator = JobDeduplicator(os.path.join(parsed_dir, "dedup_index.pkl")) if dedup else None
+        # Hashed TF-IDF shards instead of a fitted vocabulary: bounded memory, appendable
+        self.hashing = hashing
+        self.hashing_features = hashing_features
+        # Incremental runs refit the fitted vocabulary once this share of the
+        # jobs it was fit on has been added or removed since
+        self.refit_threshold = refit_threshold
         os.makedirs(self.output_dir, exist_ok=True)
         os.makedirs(self.embeddings_dir, exist_ok=True)
         
@@ -31,72 +127,398 @@ class SkillExtractor:
         }
         
         # Normalization mapping
-        self.skill_aliases = {
-            "py": "python",
-            "js": "javascript",
-            "ts": "typescript",
-            "reactjs": "react",
-            "aws cloud": "aws",
-            "ml": "machine learning",
-            "dl": "deep learning"
-        }
+        self.skill_aliases = dict(SKILL_ALIASES)
+        self.build_matcher()
 
     def normalize_skill(self, skill: str) -> str:
-        skill = skill.lower().strip()
-        return self.skill_aliases.get(skill, skill)
+        return normalize_skill(skill, self.skill_aliases)
 
-    def extract_skills(self, text: str) -> List[str]:
+    def build_matcher(self):
         """
-        Extracts skills from text using simple keyword matching.
+        (Re)compiles the skill matcher. Call again after changing
+        `common_skills` or `skill_aliases`.
         """
-        text_lower = text.lower()
-        found_skills = set()
-        
-        # 1. Exact match from common_skills
+        terms = defaultdict(set)
         for skill in self.common_skills:
-            # Simple regex to ensure word boundary
-            if re.search(r'\b' + re.escape(skill) + r'\b', text_lower):
-                found_skills.add(skill)
-                
-        # 2. Check for aliases
+            terms[skill].add(skill)
         for alias, canonical in self.skill_aliases.items():
-             if re.search(r'\b' + re.escape(alias) + r'\b', text_lower):
-                found_skills.add(canonical)
-                
-        return list(found_skills)
+            terms[alias].add(canonical)
+        self.matcher = SkillMatcher(terms)
+
+    def extract_skills(self, text: str) -> List[str]:
+        """
+        Extracts skills from text using simple keyword matching.
+        """
+        return list(self.matcher.find(text.lower()))
+
+    def iter_job_files(self) -> Iterator[str]:
+        """
+        Lazily yields the paths of raw job files: single-job JSON files and
+        closed JSONL shards (optionally gzipped).
+        """
+        with os.scandir(self.raw_data_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(RAW_SUFFIXES) and entry.is_file():
+                    yield entry.path
+
+    @traced("parser_nlp.process_jobs")
+    def process_jobs(self, streaming: bool = False, chunk_size: int = 1000, workers: Optional[int] = None,
+                     incremental: bool = False, refit: bool = False):
+        """
+        Extracts skills from every raw job and writes the skill dictionary,
+        TF-IDF embeddings and parsed jobs.
+
+        With `streaming=True` raw files are read lazily in chunks of
+        `chunk_size` and extracted across a pool of `workers` processes.
+        Skill postings and job ids are spilled to disk as chunks complete,
+        so with `hashing=True` peak memory follows the chunk size instead
+        of the corpus size. The fitted-vocabulary TF-IDF still holds the
+        whole job matrix and its job ids when it is saved.
+
+        With `incremental=True` only raw files that are new or changed since
+        the last run (per the processed-file manifest) are parsed and merged
+        into the existing outputs. Falls back to a full run when there is no
+        usable manifest. New jobs are vectorized with the fitted TF-IDF
+        vocabulary; it is refit on the whole parsed corpus (matching a full
+        run) when `refit=True` or once the jobs added and removed since the
+        last fit exceed `refit_threshold` of the jobs it was fit on.
+        """
+        if incremental:
+            manifest = self._load_manifest()
+            if manifest is not None:
+                return self._process_jobs_incremental(manifest, refit)
+            logger.info("No usable manifest found, running a full rebuild.")
+        self._remove_other_tfidf()
+        if streaming:
+            return self._process_jobs_streaming(chunk_size, workers)
 
-    def process_jobs(self):
         logger.info("Starting job processing...")
-        job_files = [f for f in os.listdir(self.raw_data_dir) if f.endswith('.json')]
+        if self.deduplicator:
+            self.deduplicator.reset()
         
         all_jobs_data = []
         corpus = []
         job_ids = []
         skill_counts = defaultdict(int)
         skill_to_jobs = defaultdict(list)
+        files = {}
         
-        for job_file in job_files:
-            with open(os.path.join(self.raw_data_dir, job_file), 'r', encoding='utf-8') as f:
-                job = json.load(f)
+        for job_path in self.iter_job_files():
+            jobs = _read_raw_file(job_path)
+            files[os.path.basename(job_path)] = signature = _file_signature(job_path, [job['id'] for job in jobs])
+            _count_read(signature, len(jobs))
+
+            for job in jobs:
+                if self.deduplicator and self.deduplicator.add(job, source_file=os.path.basename(job_path)) is not None:
+                    continue
+                text = _job_text(job)
+                skills = self.extract_skills(text)
                 
-            text = f"{job.get('title', '')} {job.get('description', '')}"
-            skills = self.extract_skills(text)
-            
-            # Enrich job data
-            job['extracted_skills'] = skills
-            all_jobs_data.append(job)
-            
-            # For TF-IDF
+                # Enrich job data
+                job['extracted_skills'] = skills
+                all_jobs_data.append(job)
+                
+                # For TF-IDF
+                corpus.append(text)
+                job_ids.append(job['id'])
+                
+                # Stats
+                for skill in skills:
+                    skill_counts[skill] += 1
+                    skill_to_jobs[skill].append(job['id'])
+
+        count("jobs_parsed", len(all_jobs_data))
+        count("skills_matched", sum(skill_counts.values()))
+        self._save_skill_dict(skill_counts, skill_to_jobs)
+        self._save_tfidf(corpus, job_ids)
+        
+        # Also save the parsed jobs with extracted skills for the next step
+        self.store.write(all_jobs_data)
+        if self.export_json:
+            parsed_jobs_path = os.path.join(self.parsed_dir, "jobs.json")
+            with open(parsed_jobs_path, 'w') as f:
+                json.dump(all_jobs_data, f, indent=2)
+            logger.info(f"Saved parsed jobs to {parsed_jobs_path}")
+        self._save_dedup()
+        self._save_manifest(files, len(job_ids))
+
+    def _process_jobs_streaming(self, chunk_size: int, workers: Optional[int]):
+        logger.info(f"Starting streaming job processing (chunk_size={chunk_size}, workers={workers or os.cpu_count()})...")
+        skill_counts = Counter()
+        files = {}
+        processed = 0
+
+        # Postings and job ids go to disk per chunk instead of growing in memory
+        spill_dir = tempfile.mkdtemp(prefix=".spill-", dir=self.parsed_dir)
+        postings = _PostingSpill(spill_dir)
+        ids_path = os.path.join(spill_dir, "job_ids.jsonl")
+        corpus_path = os.path.join(self.embeddings_dir, "corpus.jsonl")
+        tfidf_store = self._hashed_store(reset=True) if self.hashing else None
+        if self.deduplicator:
+            self.deduplicator.reset()
+        hasher = self.deduplicator.hasher if self.deduplicator else None
+
+        with self.store.writer(overwrite=True) as store_writer, \
+                open(os.devnull if self.hashing else corpus_path, 'w', encoding='utf-8') as corpus_file, \
+                open(os.devnull if self.hashing else ids_path, 'w', encoding='utf-8') as ids_file, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.matcher, hasher)) as pool:
+            pending = deque()
+            max_pending = 2 * (workers or os.cpu_count() or 1)
+            chunks = _work_units(self.iter_job_files(), chunk_size)
+
+            def drain_one():
+                nonlocal processed
+                jobs, texts, signatures, minhashes, job_files = pending.popleft().result()
+                files.update(signatures)
+                for _, signature in signatures:
+                    _count_read(signature, len(signature["job_ids"]))
+                kept, kept_texts = [], []
+                for job, text, minhash, job_file in zip(jobs, texts, minhashes, job_files):
+                    # Signatures are computed in the workers; only the index lookup runs here
+                    if self.deduplicator and self.deduplicator.add(job, minhash, job_file) is not None:
+                        continue
+                    kept.append(job)
+                    kept_texts.append(text)
+                    corpus_file.write(json.dumps(text) + '\n')
+                    ids_file.write(json.dumps(job['id']) + '\n')
+                    skill_counts.update(job['extracted_skills'])
+                    postings.add(job['id'], job['extracted_skills'])
+                    processed += 1
+                count("jobs_parsed", len(kept))
+                count("skills_matched", sum(len(job['extracted_skills']) for job in kept))
+                store_writer.write(kept)
+                if tfidf_store is not None:
+                    with span("parser_nlp.tfidf", hashing=True):
+                        tfidf_store.add(kept_texts, [job['id'] for job in kept])
+
+            # Bounded submission keeps at most `max_pending` chunks in flight
+            for chunk in chunks:
+                pending.append(pool.submit(_extract_chunk, chunk))
+                if len(pending) >= max_pending:
+                    drain_one()
+            while pending:
+                drain_one()
+
+        logger.info(f"Extracted skills from {processed} jobs")
+        logger.info(f"Saved parsed jobs to {self.store.store_dir}")
+        if self.export_json:
+            self.store.export_json(os.path.join(self.parsed_dir, "jobs.json"))
+        postings.close()
+        self._save_skill_dict_spilled(skill_counts, postings)
+        if not self.hashing:
+            self._save_tfidf(_iter_corpus(corpus_path), list(_iter_corpus(ids_path)))
+            os.remove(corpus_path)
+        shutil.rmtree(spill_dir)
+        self._save_dedup()
+        self._save_manifest(files, processed)
+
+    def _process_jobs_incremental(self, manifest: Dict, refit: bool = False):
+        logger.info("Starting incremental job processing...")
+        known = manifest["files"]
+        new_files = {}
+        stale_ids = set()
+        seen = set()
+        skipped = 0
+
+        for path in self.iter_job_files():
+            job_file = os.path.basename(path)
+            seen.add(job_file)
+            stat = os.stat(path)
+            previous = known.get(job_file)
+            if previous and previous["mtime_ns"] == stat.st_mtime_ns and previous["size"] == stat.st_size:
+                skipped += 1
+                continue
+            if previous:
+                stale_ids.update(previous["job_ids"])
+            new_files[job_file] = path
+
+        removed = [job_file for job_file in known if job_file not in seen]
+        for job_file in removed:
+            stale_ids.update(known[job_file]["job_ids"])
+
+        stats = {"processed": len(new_files), "skipped": skipped, "removed": len(removed)}
+        if not new_files and not removed and not refit:
+            logger.info(f"No new or changed raw jobs; skipped {skipped} files.")
+            return stats
+
+        # Reposts dropped in favour of a stale job sit in unchanged files;
+        # those jobs are re-read and offered to the index again
+        readmit = defaultdict(set)
+        if self.deduplicator:
+            self.deduplicator.load()
+            for job_id, job_file in self.deduplicator.remove(stale_ids):
+                if job_file in seen and job_file not in new_files:
+                    readmit[job_file].add(job_id)
+
+        new_jobs, corpus = [], []
+
+        def admit(job: Dict, job_file: str):
+            if self.deduplicator and self.deduplicator.add(job, source_file=job_file) is not None:
+                return
+            text = _job_text(job)
+            job['extracted_skills'] = self.extract_skills(text)
+            new_jobs.append(job)
             corpus.append(text)
-            job_ids.append(job['id'])
-            
-            # Stats
-            for skill in skills:
-                skill_counts[skill] += 1
+
+        for job_file, path in new_files.items():
+            jobs = _read_raw_file(path)
+            for job in jobs:
+                admit(job, job_file)
+            known[job_file] = _file_signature(path, [job['id'] for job in jobs])
+            _count_read(known[job_file], len(jobs))
+        readmitted = len(new_jobs)
+        for job_file, job_ids in readmit.items():
+            for job in _read_raw_file(os.path.join(self.raw_data_dir, job_file)):
+                if job['id'] in job_ids:
+                    admit(job, job_file)
+        stats["readmitted"] = len(new_jobs) - readmitted
+        count("jobs_parsed", len(new_jobs))
+        count("skills_matched", sum(len(job['extracted_skills']) for job in new_jobs))
+        for job_file in removed:
+            del known[job_file]
+
+        # Skill dictionary: drop stale job ids, append new ones, recount
+        with open(os.path.join(self.output_dir, "skill_dict.json"), 'r') as f:
+            mapping = json.load(f)["mapping"]
+        if stale_ids:
+            mapping = {skill: [j for j in ids if j not in stale_ids] for skill, ids in mapping.items()}
+        skill_to_jobs = defaultdict(list, mapping)
+        for job in new_jobs:
+            for skill in job['extracted_skills']:
                 skill_to_jobs[skill].append(job['id'])
-                
-        # Save parsed jobs (optional, or just keep in memory for next step if small)
-        # We'll save a summary skill dict
+        skill_to_jobs = {skill: ids for skill, ids in skill_to_jobs.items() if ids}
+        self._save_skill_dict({skill: len(ids) for skill, ids in skill_to_jobs.items()}, skill_to_jobs)
+
+        # Parsed jobs: new jobs go into a new store part; a pure top-up is
+        # appended to the JSON export in place
+        self.store.remove(stale_ids)
+        self.store.append(new_jobs)
+        logger.info(f"Updated parsed jobs at {self.store.store_dir}")
+        if self.export_json:
+            parsed_jobs_path = os.path.join(self.parsed_dir, "jobs.json")
+            if stale_ids or not os.path.exists(parsed_jobs_path):
+                self.store.export_json(parsed_jobs_path)
+            else:
+                _append_to_json_array(parsed_jobs_path, new_jobs)
+
+        # TF-IDF: only new jobs are vectorized
+        tfidf_path = self._tfidf_path()
+        if self.hashing:
+            # Hashed shards: drop stale rows, append new ones; IDF follows the corpus
+            with span("parser_nlp.tfidf", incremental=True, hashing=True):
+                tfidf_store = self._hashed_store()
+                tfidf_store.remove(stale_ids)
+                tfidf_store.add_all(corpus, [job['id'] for job in new_jobs])
+        else:
+            tfidf = ArtifactBundle(tfidf_path)
+            job_ids = tfidf.get("job_ids")
+            fit = manifest.get("tfidf_fit") or {"jobs": len(job_ids), "changed": 0}
+            removed_rows = sum(1 for job_id in job_ids if job_id in stale_ids)
+            changed = fit["changed"] + removed_rows + len(new_jobs)
+            stats["tfidf_refit"] = refit or changed > self.refit_threshold * max(fit["jobs"], 1)
+            if stats["tfidf_refit"]:
+                # New terms and shifted document frequencies: refit on the parsed corpus
+                logger.info(f"Refitting TF-IDF ({changed} jobs changed since the last fit of {fit['jobs']})")
+                job_ids = [job['id'] for job in self.store.iter_jobs(columns=["id"])]
+                self._save_tfidf((_job_text(job) for job in self.store.iter_jobs(columns=["title", "description"])),
+                                 job_ids)
+                manifest["tfidf_fit"] = {"jobs": len(job_ids), "changed": 0}
+            else:
+                # Reuse the fitted vectorizer
+                with span("parser_nlp.tfidf", incremental=True):
+                    vectorizer = load_vectorizer(tfidf)
+                    matrix = tfidf.get("matrix")
+                    if stale_ids:
+                        keep = [i for i, job_id in enumerate(job_ids) if job_id not in stale_ids]
+                        matrix, job_ids = matrix[keep], [job_ids[i] for i in keep]
+                    if corpus:
+                        matrix = sparse.vstack([matrix, vectorizer.transform(corpus)], format='csr')
+                        job_ids = job_ids + [job['id'] for job in new_jobs]
+                    save_tfidf(tfidf_path, vectorizer, matrix, job_ids)
+                manifest["tfidf_fit"] = {"jobs": fit["jobs"], "changed": changed}
+        logger.info(f"Updated TF-IDF data at {tfidf_path}")
+
+        stats["duplicates"] = self._save_dedup()
+        manifest["files"] = known
+        self._write_manifest(manifest)
+        logger.info(f"Incremental run: processed {stats['processed']} new/changed files, "
+                    f"skipped {stats['skipped']} unchanged, removed {stats['removed']} deleted.")
+        return stats
+
+    def _save_dedup(self) -> Dict[str, int]:
+        """
+        Persists the dedup index and a per-source report of dropped jobs.
+        """
+        if not self.deduplicator:
+            return {}
+        self.deduplicator.save()
+        report = self.deduplicator.report()
+        with open(os.path.join(self.parsed_dir, "dedup_report.json"), 'w') as f:
+            json.dump({"dropped": report, "indexed": len(self.deduplicator.signatures)}, f, indent=2)
+        logger.info(f"Dropped {sum(report.values())} near-duplicate jobs: {report}")
+        return report
+
+    def _tfidf_path(self) -> str:
+        if self.hashing:
+            return os.path.join(self.embeddings_dir, "job_tfidf_hashed")
+        return os.path.join(self.embeddings_dir, "job_tfidf" + BUNDLE_SUFFIX)
+
+    def _remove_other_tfidf(self):
+        """
+        Deletes the TF-IDF artifact of the mode this extractor is not using,
+        so a full rebuild leaves only one for JobRetriever to load.
+        """
+        other = (os.path.join(self.embeddings_dir, "job_tfidf" + BUNDLE_SUFFIX) if self.hashing
+                 else os.path.join(self.embeddings_dir, "job_tfidf_hashed"))
+        if os.path.exists(other):
+            logger.info(f"Removing {other} left by a {'vocabulary' if self.hashing else 'hashing'} run")
+            shutil.rmtree(other)
+
+    def _tfidf_mode(self) -> str:
+        return "hashing" if self.hashing else "vocabulary"
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.parsed_dir, "manifest.json")
+
+    def _vocabulary_fingerprint(self) -> str:
+        vocab = json.dumps([sorted(self.common_skills), sorted(self.skill_aliases.items())])
+        return hashlib.sha1(vocab.encode('utf-8')).hexdigest()
+
+    def _load_manifest(self) -> Optional[Dict]:
+        """
+        Returns the processed-file manifest, or None when it is missing, was
+        built with a different skill vocabulary or its outputs are gone.
+        """
+        outputs = [self._manifest_path(),
+                   os.path.join(self.output_dir, "skill_dict.json"),
+                   os.path.join(self._tfidf_path(), "manifest.json")]
+        if self.deduplicator:
+            outputs.append(self.deduplicator.index_path)
+        if not all(os.path.exists(path) for path in outputs) or not self.store.exists():
+            return None
+        with open(self._manifest_path(), 'r') as f:
+            manifest = json.load(f)
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        if manifest.get("vocabulary") != self._vocabulary_fingerprint():
+            logger.info("Skill vocabulary changed since the last run.")
+            return None
+        if manifest.get("tfidf_mode", "vocabulary") != self._tfidf_mode():
+            logger.info("TF-IDF mode changed since the last run.")
+            return None
+        return manifest
+
+    def _save_manifest(self, files: Dict[str, Dict], n_jobs: int):
+        self._write_manifest({"version": MANIFEST_VERSION, "vocabulary": self._vocabulary_fingerprint(),
+                              "tfidf_mode": self._tfidf_mode(), "files": files,
+                              "tfidf_fit": {"jobs": n_jobs, "changed": 0}})
+
+    def _write_manifest(self, manifest: Dict):
+        with open(self._manifest_path(), 'w') as f:
+            json.dump(manifest, f)
+        logger.info(f"Saved processed-file manifest to {self._manifest_path()}")
+
+    def _save_skill_dict(self, skill_counts: Dict[str, int], skill_to_jobs: Dict[str, List[str]]):
         skill_dict = {
             "counts": dict(skill_counts),
             "mapping": dict(skill_to_jobs)
@@ -106,29 +528,178 @@ class SkillExtractor:
             json.dump(skill_dict, f, indent=2)
             
         logger.info(f"Saved skill dictionary to {os.path.join(self.output_dir, 'skill_dict.json')}")
-        
-        # Compute TF-IDF
+
+    def _save_skill_dict_spilled(self, skill_counts: Dict[str, int], postings: "_PostingSpill"):
+        """
+        Same file as _save_skill_dict, written one spill bucket at a time.
+        """
+        path = os.path.join(self.output_dir, "skill_dict.json")
+        with open(path, 'w') as f:
+            f.write('{\n  "counts": ' + json.dumps(dict(skill_counts)) + ',\n  "mapping": {')
+            for i, (skill, job_ids) in enumerate(postings.iter_postings()):
+                f.write((',' if i else '') + '\n    ' + json.dumps(skill) + ': ' + json.dumps(job_ids))
+            f.write('\n  }\n}\n')
+        logger.info(f"Saved skill dictionary to {path}")
+
+    def _hashed_store(self, reset: bool = False) -> HashedTfidfStore:
+        store = HashedTfidfStore(self._tfidf_path(), n_features=self.hashing_features)
+        if reset:
+            store.reset()
+        return store
+
+    @traced("parser_nlp.tfidf")
+    def _save_tfidf(self, corpus: Iterable[str], job_ids: List[str]):
+        if self.hashing:
+            logger.info("Hashing TF-IDF shards...")
+            self._hashed_store(reset=True).add_all(corpus, job_ids)
+            return
         logger.info("Computing TF-IDF vectors...")
         vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
         tfidf_matrix = vectorizer.fit_transform(corpus)
         
         # Save TF-IDF model and matrix
-        with open(os.path.join(self.embeddings_dir, "job_tfidf.pkl"), 'wb') as f:
-            pickle.dump({
-                "vectorizer": vectorizer,
-                "matrix": tfidf_matrix,
-                "job_ids": job_ids
-            }, f)
-            
-        logger.info(f"Saved TF-IDF data to {os.path.join(self.embeddings_dir, 'job_tfidf.pkl')}")
-        
-        # Also save the parsed jobs with extracted skills for the next step
-        parsed_jobs_path = os.path.join("data/jobs/parsed", "jobs.json")
-        os.makedirs(os.path.dirname(parsed_jobs_path), exist_ok=True)
-        with open(parsed_jobs_path, 'w') as f:
-            json.dump(all_jobs_data, f, indent=2)
-        logger.info(f"Saved parsed jobs to {parsed_jobs_path}")
+        save_tfidf(self._tfidf_path(), vectorizer, tfidf_matrix, job_ids)
+
+def _job_text(job: Dict) -> str:
+    return f"{job.get('title', '')} {job.get('description', '')}"
+
+def _read_raw_file(path: str) -> List[Dict]:
+    """
+    Loads the jobs in a raw file: one job for .json, one per line for shards.
+    """
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.load(f)]
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def _count_read(signature: Dict, n_jobs: int):
+    count("files_read")
+    count("bytes_read", signature["size"])
+    count("jobs_read", n_jobs)
+
+def _file_signature(path: str, job_ids: List[str]) -> Dict:
+    stat = os.stat(path)
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "job_ids": job_ids}
+
+def _append_to_json_array(path: str, items: List[Dict]):
+    """
+    Appends items to a JSON array file in place, without loading it.
+    """
+    if not items:
+        return
+    with open(path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        # Walk back to the closing bracket, then check whether the array is empty
+        tail = b''
+        while pos > 0 and b']' not in tail:
+            step = min(4096, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+        end = pos + tail.rindex(b']')
+        f.seek(0)
+        is_empty = f.read(end).strip() == b'['
+        f.seek(end)
+        f.truncate()
+        body = ',\n'.join(json.dumps(item, indent=2) for item in items)
+        f.write((('\n' if is_empty else ',\n') + body + '\n]').encode('utf-8'))
+
+def _work_units(paths: Iterable[str], size: int) -> Iterator[List[str]]:
+    """
+    Groups single-job files into chunks of `size`; each shard (already
+    bounded by its rotation size) is a unit of its own.
+    """
+    chunk = []
+    for path in paths:
+        if not path.endswith('.json'):
+            yield [path]
+            continue
+        chunk.append(path)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class _PostingSpill:
+    """
+    Skill -> job id postings appended to a fixed number of files, bucketed
+    by a hash of the skill, so streaming runs keep no per-job state in
+    memory and a 10k-skill vocabulary needs only `buckets` open files.
+    Postings are grouped per skill one bucket at a time on the way out.
+    """
+    def __init__(self, directory: str, buckets: int = 64):
+        self.files = [open(os.path.join(directory, f"postings_{i:03d}.jsonl"), 'w', encoding='utf-8')
+                      for i in range(buckets)]
+
+    def add(self, job_id: str, skills: Iterable[str]):
+        for skill in skills:
+            self.files[zlib.crc32(skill.encode('utf-8')) % len(self.files)].write(json.dumps([skill, job_id]) + '\n')
+
+    def close(self):
+        for f in self.files:
+            f.close()
+
+    def iter_postings(self) -> Iterator[Tuple[str, List[str]]]:
+        for f in self.files:
+            grouped = defaultdict(list)
+            for skill, job_id in _iter_corpus(f.name):
+                grouped[skill].append(job_id)
+            yield from grouped.items()
+
+def _iter_corpus(path: str) -> Iterator[str]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+# Per-process matcher and MinHasher for the streaming pool, set once by the initializer
+_worker_matcher = None
+_worker_hasher = None
+
+def _init_worker(matcher: SkillMatcher, hasher: Optional[MinHasher]):
+    global _worker_matcher, _worker_hasher
+    _worker_matcher = matcher
+    _worker_hasher = hasher
+
+def _extract_chunk(paths: List[str]):
+    """
+    Loads and extracts one chunk of raw job files in a worker process.
+    Returns the enriched jobs, their texts, file signatures, the jobs'
+    MinHash signatures (None when dedup is off) and their file names.
+    """
+    jobs, texts, signatures, minhashes, job_files = [], [], [], [], []
+    for path in paths:
+        file_jobs = _read_raw_file(path)
+        job_file = os.path.basename(path)
+        signatures.append((job_file, _file_signature(path, [job['id'] for job in file_jobs])))
+        for job in file_jobs:
+            text = _job_text(job)
+            job['extracted_skills'] = list(_worker_matcher.find(text.lower()))
+            minhashes.append(_worker_hasher.signature(text) if _worker_hasher else None)
+            jobs.append(job)
+            texts.append(text)
+            job_files.append(job_file)
+    return jobs, texts, signatures, minhashes, job_files
 
 if __name__ == "__main__":
-    parser = SkillExtractor()
-    parser.process_jobs()
+    arg_parser = argparse.ArgumentParser(description="Extract skills and TF-IDF embeddings from raw jobs.")
+    arg_parser.add_argument("--streaming", action="store_true", help="stream raw files through a process pool")
+    arg_parser.add_argument("--chunk-size", type=int, default=1000)
+    arg_parser.add_argument("--workers", type=int, default=None)
+    arg_parser.add_argument("--incremental", action="store_true", help="only parse raw files that are new or changed since the last run")
+    arg_parser.add_argument("--no-dedup", action="store_true", help="keep near-duplicate job postings")
+    arg_parser.add_argument("--hashing", action="store_true",
+                            help="hashed TF-IDF shards (data/embeddings/job_tfidf_hashed) instead of a fitted vocabulary")
+    arg_parser.add_argument("--hashing-features", type=int, default=2 ** 18)
+    arg_parser.add_argument("--refit", action="store_true", help="with --incremental, refit the TF-IDF vocabulary now")
+    arg_parser.add_argument("--refit-threshold", type=float, default=0.2,
+                            help="with --incremental, refit once this share of jobs changed since the last fit")
+    args = arg_parser.parse_args()
+
+    parser = SkillExtractor(dedup=not args.no_dedup, hashing=args.hashing, hashing_features=args.hashing_features,
+                            refit_threshold=args.refit_threshold)
+    parser.process_jobs(streaming=args.streaming, chunk_size=args.chunk_size, workers=args.workers,
+                        incremental=args.incremental, refit=args.refit)
@@ -0,0 +1,310 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Callable, Optional, Iterable
+from src.instrumentation import tracer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Pipeline")
+
+@dataclass
+class Stage:
+    """
+    One pipeline step. `inputs` and `outputs` are file or directory paths;
+    a stage depends on every stage that produces one of its inputs.
+    `code` lists source files whose changes should also rerun it. With
+    `once` the stage only runs while one of its outputs is missing.
+    """
+    name: str
+    run: Callable[[], object]
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+    code: List[str] = field(default_factory=list)
+    once: bool = False
+
+class _FileHasher:
+    """
+    Content hashes for files and directory trees. A file's hash is reused
+    while its size and mtime match the previous run's fingerprint, so
+    unchanged inputs are not re-read.
+    """
+    def __init__(self, fingerprints: Optional[Dict[str, list]] = None):
+        self.fingerprints = dict(fingerprints or {})
+        self._lock = threading.Lock()
+
+    def _file_hash(self, path: str) -> str:
+        stat = os.stat(path)
+        with self._lock:
+            known = self.fingerprints.get(path)
+        if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+            return known[2]
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        with self._lock:
+            self.fingerprints[path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def hash_paths(self, paths: Iterable[str]) -> str:
+        digest = hashlib.sha1()
+        for path in paths:
+            digest.update(path.encode('utf-8'))
+            if os.path.isdir(path):
+                for root, dirs, files in os.walk(path):
+                    dirs.sort()
+                    for name in sorted(files):
+                        file_path = os.path.join(root, name)
+                        digest.update(f"{os.path.relpath(file_path, path)}:{self._file_hash(file_path)}".encode('utf-8'))
+            elif os.path.exists(path):
+                digest.update(self._file_hash(path).encode('utf-8'))
+            else:
+                digest.update(b"<missing>")
+        return digest.hexdigest()
+
+class _RssSampler:
+    """
+    Samples the process's resident set size in a background thread and
+    keeps the high-water mark per running stage. Stages share one process,
+    so overlapping stages see each other's memory.
+    """
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.peaks = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def rss_mb() -> float:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+        except (OSError, ValueError, AttributeError):
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def begin(self, name: str):
+        with self._lock:
+            self.peaks[name] = self.rss_mb()
+
+    def end(self, name: str) -> float:
+        self._sample()
+        with self._lock:
+            return self.peaks.pop(name)
+
+    def _sample(self):
+        rss = self.rss_mb()
+        with self._lock:
+            for name, peak in self.peaks.items():
+                self.peaks[name] = max(peak, rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+class Pipeline:
+    """
+    Runs stages in dependency order inside this process, so libraries are
+    imported once.
+
+    A stage is skipped when its outputs exist and the hash of its inputs
+    and code matches the last successful run (kept in `state_path`).
+    Stages whose dependencies are done run concurrently on up to `workers`
+    threads. Each run writes a report with per-stage status, wall time,
+    peak RSS and counters to `report_path`, and its spans as JSON lines and
+    a Chrome trace to `trace_path` (.jsonl / .json).
+    """
+    def __init__(self, stages: List[Stage], state_path: str = "reports/pipeline_state.json",
+                 report_path: str = "reports/pipeline_run.json", workers: int = 4,
+                 trace_path: Optional[str] = "reports/pipeline_trace"):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = state_path
+        self.report_path = report_path
+        self.trace_path = trace_path
+        self.workers = workers
+        self.dependencies = self._resolve_dependencies(stages)
+
+    @staticmethod
+    def _resolve_dependencies(stages: List[Stage]) -> Dict[str, List[str]]:
+        producers = {}
+        for stage in stages:
+            for path in stage.outputs:
+                producers[os.path.normpath(path)] = stage.name
+        dependencies = {}
+        for stage in stages:
+            deps = set()
+            for path in stage.inputs:
+                path = os.path.normpath(path)
+                # An input inside a produced directory depends on its producer too
+                for produced, producer in producers.items():
+                    if producer != stage.name and (path == produced or path.startswith(produced + os.sep)
+                                                   or produced.startswith(path + os.sep)):
+                        deps.add(producer)
+            dependencies[stage.name] = sorted(deps)
+
+        # Reject cycles up front rather than deadlocking the scheduler
+        visiting, done = set(), set()
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline stages form a cycle through {name}")
+            visiting.add(name)
+            for dep in dependencies[name]:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+        for name in dependencies:
+            visit(name)
+        return dependencies
+
+    def _load_state(self) -> Dict:
+        if not os.path.exists(self.state_path):
+            return {"stages": {}, "fingerprints": {}}
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _outputs_exist(stage: Stage) -> bool:
+        return all(os.path.exists(path) and not (os.path.isdir(path) and not os.listdir(path))
+                   for path in stage.outputs)
+
+    def _run_stage(self, stage: Stage, hasher: _FileHasher, state: Dict, force: bool,
+                   sampler: _RssSampler) -> Dict:
+        input_hash = hasher.hash_paths(stage.inputs + stage.code)
+        if not force and self._outputs_exist(stage) and (
+                stage.once or state["stages"].get(stage.name) == input_hash):
+            logger.info(f"Skipping {stage.name} (inputs unchanged)")
+            return {"status": "skipped", "input_hash": input_hash}
+
+        logger.info(f"Starting {stage.name}...")
+        sampler.begin(stage.name)
+        start = time.perf_counter()
+        try:
+            with tracer.span(stage.name, stage=True) as stage_span:
+                stage.run()
+        except Exception as e:
+            sampler.end(stage.name)
+            logger.exception(f"{stage.name} failed")
+            return {"status": "failed", "error": repr(e), "seconds": time.perf_counter() - start}
+        seconds = time.perf_counter() - start
+        peak = sampler.end(stage.name)
+        logger.info(f"{stage.name} completed in {seconds:.2f}s")
+        return {"status": "ran", "input_hash": input_hash, "seconds": seconds, "peak_rss_mb": peak,
+                "counters": dict(stage_span.counters)}
+
+    def run(self, force: Iterable[str] = ()) -> Dict:
+        """
+        Runs every stage that is out of date (plus those named in `force`)
+        and returns the run report. Dependents of a failed stage are not
+        started.
+        """
+        force = set(force)
+        unknown = force - set(self.stages) - {"all"}
+        if unknown:
+            raise ValueError(f"Unknown stages: {sorted(unknown)}")
+        state = self._load_state()
+        hasher = _FileHasher(state.get("fingerprints"))
+        results = {}
+        started = time.perf_counter()
+        trace_since = time.time()
+        pending = dict(self.stages)
+        running = {}
+
+        with _RssSampler() as sampler, ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                for name in list(pending):
+                    deps = self.dependencies[name]
+                    if any(results.get(dep, {}).get("status") in ("failed", "blocked") for dep in deps):
+                        results[name] = {"status": "blocked"}
+                        del pending[name]
+                    elif all(dep in results for dep in deps):
+                        stage = pending.pop(name)
+                        running[pool.submit(self._run_stage, stage, hasher, state,
+                                            "all" in force or name in force, sampler)] = name
+                if not running:
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    results[running.pop(future)] = future.result()
+
+        for name, result in results.items():
+            if result["status"] in ("ran", "skipped"):
+                state["stages"][name] = result["input_hash"]
+            else:
+                state["stages"].pop(name, None)
+        state["fingerprints"] = hasher.fingerprints
+        report = {
+            "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seconds": time.perf_counter() - started,
+            "stages": {name: {**results[name], "depends_on": self.dependencies[name]} for name in self.stages},
+        }
+        for path, data in ((self.state_path, state), (self.report_path, report)):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+        if self.trace_path:
+            tracer.export_jsonl(self.trace_path + ".jsonl", since=trace_since)
+            tracer.export_chrome_trace(self.trace_path + ".json", since=trace_since)
+        return report
+
+def _collect_jobs():
+    from src.data_collector import MockJobScraper, ShardJobSink
+    raw_data_dir = "data/jobs/raw"
+    scraper = MockJobScraper(raw_data_dir, sink=ShardJobSink(raw_data_dir))
+    scraper.scrape(["Data Engineer", "Data Scientist", "Backend Engineer", "Frontend Engineer", "DevOps Engineer"],
+                   count_per_role=20)
+
+def _parse_jobs():
+    from src.parser_nlp import SkillExtractor
+    # Only new or changed raw jobs after the first run
+    SkillExtractor().process_jobs(incremental=True)
+
+def _map_skills():
+    from src.skill_mapper import SkillRoleMapper
+    SkillRoleMapper().map_skills()
+
+def _train_clusters():
+    from src.clustering import ProfileClustering
+    clustering = ProfileClustering()
+    clustering.train_clusters(clustering.generate_mock_students(200))
+
+def _train_model():
+    from src.trainer import ModelTrainer
+    ModelTrainer().train()
+
+def default_stages() -> List[Stage]:
+    """
+    The end-to-end pipeline, run from the project root.
+    """
+    return [
+        Stage("data_collector", _collect_jobs, outputs=["data/jobs/raw"], once=True),
+        Stage("parser_nlp", _parse_jobs, inputs=["data/jobs/raw"],
+              outputs=["data/jobs/parsed/jobs_store", "data/skills/skill_dict.json", "data/embeddings/job_tfidf.bundle"],
+              code=["src/parser_nlp.py", "src/dedup.py", "src/job_store.py", "src/features.py", "src/hashed_tfidf.py",
+                    "src/artifacts.py"]),
+        Stage("skill_mapper", _map_skills, inputs=["data/jobs/parsed/jobs_store", "data/roles/role_taxonomy.json"],
+              outputs=["models/role_skill_matrix.csv", "data/examples_by_role.json"],
+              code=["src/skill_mapper.py", "src/role_taxonomy.py", "src/job_store.py"]),
+        Stage("clustering", _train_clusters, outputs=["models/kmeans_cluster_model.bundle", "reports/cluster_analysis.md"],
+              code=["src/clustering.py", "src/features.py", "src/artifacts.py"]),
+        Stage("trainer", _train_model, inputs=["models/role_skill_matrix.csv"],
+              outputs=["models/best_model.bundle", "reports/metrics.json"],
+              code=["src/trainer.py", "src/model_selection.py", "src/features.py", "src/clustering.py",
+                    "src/artifacts.py"]),
+    ]
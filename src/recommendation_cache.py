@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import argparse
+import itertools
+from collections import OrderedDict, Counter
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Tuple, Iterable, Optional
+from src.recommender import Recommender, Recommendation, RoleScore
+from src.features import normalize_skill
+from src.roadmap import RoadmapGenerator
+from src.instrumentation import count
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("RecommendationCache")
+
+@dataclass
+class CachedRecommendation:
+    recommendation: Recommendation
+    roadmap: Dict
+    pdf: bytes
+
+class RecommendationCache:
+    """
+    Caches the full result of a submission -- top-k roles, skill gaps, the
+    roadmap dict and its rendered PDF -- keyed by the model version and the
+    canonical (normalize_skill, de-duplicated, sorted) skill set.
+
+    Lookups go memory (LRU, `max_entries`) -> disk (`cache_dir`, optional,
+    one JSON + PDF pair per key under a directory per model version) ->
+    compute. Disk hits are promoted to memory. The version combines
+    `Recommender.model_version` with the role-skill matrix's, so retraining
+    or rebuilding the matrix never serves stale roles or skill gaps.
+    Matched skills are re-derived on every hit so they keep the caller's
+    spelling.
+    """
+    def __init__(self, recommender: Recommender, roadmaps: Optional[RoadmapGenerator] = None,
+                 max_entries: int = 1024, cache_dir: Optional[str] = None, k: int = 3,
+                 student_id: str = "current_user"):
+        self.recommender = recommender
+        self.roadmaps = roadmaps or RoadmapGenerator()
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.k = k
+        self.student_id = student_id
+        self._memory = OrderedDict()
+        self.counts = Counter()
+        self._compute_seconds = 0.0
+        self._hit_seconds = 0.0
+
+    def key(self, skills: Iterable[str]) -> Tuple[str, Tuple[str, ...]]:
+        version = self.recommender.model_version
+        if self.recommender.role_skills_version:
+            version += "-" + self.recommender.role_skills_version
+        return version, tuple(sorted(set(map(normalize_skill, skills))))
+
+    def _disk_path(self, key: Tuple[str, Tuple[str, ...]]) -> str:
+        version, skills = key
+        digest = hashlib.sha1(json.dumps([self.k, list(skills)]).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, version, digest)
+
+    def get(self, skills: Iterable[str]) -> CachedRecommendation:
+        start = time.perf_counter()
+        skills = list(skills)
+        key = self.key(skills)
+        entry = self._memory.get(key)
+        if entry is not None:
+            self._memory.move_to_end(key)
+            tier = "memory_hits"
+        else:
+            entry = self._read_disk(key) if self.cache_dir else None
+            tier = "disk_hits" if entry is not None else "misses"
+            if entry is None:
+                entry = self._compute(skills)
+                if self.cache_dir:
+                    self._write_disk(key, entry)
+            self._remember(key, entry)
+        self.counts[tier] += 1
+        count(f"rec_cache_{tier}")
+        elapsed = time.perf_counter() - start
+        if tier == "misses":
+            self._compute_seconds += elapsed
+        else:
+            self._hit_seconds += elapsed
+
+        recommendation = entry.recommendation
+        if recommendation.best_role is not None:
+            matched, _ = self.recommender.skill_gaps(recommendation.best_role, skills)
+            recommendation = Recommendation(recommendation.roles, matched, recommendation.missing_skills)
+        return CachedRecommendation(recommendation, entry.roadmap, entry.pdf)
+
+    def _compute(self, skills: List[str]) -> CachedRecommendation:
+        recommendation = self.recommender.recommend(skills, k=self.k)
+        roadmap = self.roadmaps.generate_roadmap(self.student_id, recommendation.best_role,
+                                                 recommendation.missing_skills, save=False)
+        return CachedRecommendation(recommendation, roadmap, self.roadmaps.render_pdf(roadmap))
+
+    def _remember(self, key, entry: CachedRecommendation):
+        self._memory[key] = entry
+        if len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.counts["evictions"] += 1
+
+    def _read_disk(self, key) -> Optional[CachedRecommendation]:
+        path = self._disk_path(key)
+        try:
+            with open(path + ".json", 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            with open(path + ".pdf", 'rb') as f:
+                pdf = f.read()
+        except (OSError, ValueError):
+            return None
+        recommendation = Recommendation([RoleScore(**r) for r in data["recommendation"]["roles"]],
+                                        data["recommendation"]["matched_skills"],
+                                        data["recommendation"]["missing_skills"])
+        return CachedRecommendation(recommendation, data["roadmap"], pdf)
+
+    def _write_disk(self, key, entry: CachedRecommendation):
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # PDF first: the JSON file marks the entry as complete
+        with open(path + ".pdf.tmp", 'wb') as f:
+            f.write(entry.pdf)
+        os.replace(path + ".pdf.tmp", path + ".pdf")
+        with open(path + ".json.tmp", 'w', encoding='utf-8') as f:
+            json.dump({"skills": list(key[1]), "k": self.k,
+                       "recommendation": asdict(entry.recommendation), "roadmap": entry.roadmap}, f)
+        os.replace(path + ".json.tmp", path + ".json")
+
+    def warm(self, skill_lists: Iterable[List[str]], top: Optional[int] = None) -> int:
+        """
+        Precomputes the `top` most frequent skill sets in `skill_lists`
+        (all of them when `top` is None). Returns how many were computed.
+        Warm-up lookups are not counted in `stats`.
+        """
+        frequency = Counter(self.key(skills)[1] for skills in skill_lists if skills)
+        counts, compute_seconds, hit_seconds = self.counts.copy(), self._compute_seconds, self._hit_seconds
+        for skills, _ in frequency.most_common(top):
+            self.get(skills)
+        computed = self.counts["misses"] - counts["misses"]
+        self.counts, self._compute_seconds, self._hit_seconds = counts, compute_seconds, hit_seconds
+        return computed
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Hit counts per tier, hit rate, and latency saved: what the hits
+        would have cost at the mean miss latency, minus what they cost.
+        """
+        hits = self.counts["memory_hits"] + self.counts["disk_hits"]
+        requests = hits + self.counts["misses"]
+        stats = {"requests": requests, "memory_hits": self.counts["memory_hits"],
+                 "disk_hits": self.counts["disk_hits"], "misses": self.counts["misses"],
+                 "evictions": self.counts["evictions"], "entries": len(self._memory),
+                 "hit_rate": hits / requests if requests else 0.0}
+        if self.counts["misses"]:
+            miss_ms = self._compute_seconds / self.counts["misses"] * 1000
+            stats["mean_miss_ms"] = miss_ms
+            stats["saved_ms"] = max(0.0, hits * miss_ms - self._hit_seconds * 1000)
+        return stats
+
+def skill_combinations(skills: List[str], max_size: int) -> Iterable[List[str]]:
+    """
+    Every combination of 1..`max_size` skills from a menu.
+    """
+    for size in range(1, max_size + 1):
+        for combination in itertools.combinations(skills, size):
+            yield list(combination)
+
+if __name__ == "__main__":
+    from src.batch_scorer import iter_student_chunks
+
+    arg_parser = argparse.ArgumentParser(
+        description="Warm the on-disk recommendation cache with the most common skill sets.")
+    arg_parser.add_argument("--models-dir", default="models")
+    arg_parser.add_argument("--cache-dir", default="outputs/rec_cache")
+    arg_parser.add_argument("--students", help="CSV (id,skills) or JSONL of observed profiles to rank skill sets by")
+    arg_parser.add_argument("--top", type=int, default=1000, help="how many of the most frequent skill sets to precompute")
+    arg_parser.add_argument("--menu", nargs="+", help="skill menu to enumerate combinations from instead")
+    arg_parser.add_argument("--max-size", type=int, default=3, help="largest combination taken from --menu")
+    arg_parser.add_argument("--top-k", type=int, default=3)
+    args = arg_parser.parse_args()
+    if not args.students and not args.menu:
+        arg_parser.error("pass --students or --menu")
+
+    cache = RecommendationCache(Recommender(args.models_dir), cache_dir=args.cache_dir, k=args.top_k)
+    if args.students:
+        skill_lists = (skills for chunk in iter_student_chunks(args.students, 10000) for skills in chunk["skills"])
+    else:
+        skill_lists = skill_combinations(args.menu, args.max_size)
+    logger.info(f"Precomputed {cache.warm(skill_lists, args.top)} skill sets into {args.cache_dir}")
@@ -0,0 +1,176 @@
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from typing import List, Dict, Tuple, Iterable, Optional
+from collections import deque
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from src.artifacts import find_artifact, load_model_artifacts, artifact_version
+from src.features import FeatureEncoder, normalize_skill
+from src.serving import load_serving_model
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Recommender")
+
+@dataclass
+class RoleScore:
+    role: str
+    score: float
+
+@dataclass
+class Recommendation:
+    roles: List[RoleScore]
+    matched_skills: List[str] = field(default_factory=list)
+    missing_skills: List[str] = field(default_factory=list)
+
+    @property
+    def best_role(self) -> Optional[str]:
+        return self.roles[0].role if self.roles else None
+
+class Recommender:
+    """
+    In-process inference engine for role recommendations.
+
+    The trained model and role-skill matrix are loaded once. The skill ->
+    feature column index and each role's top skills (sorted by
+    P(skill|role)) are precomputed, so a request only encodes the skills,
+    runs the forest and does a few set lookups. Skills are matched through
+    the shared FeatureEncoder vocabulary (normalize_skill). Per-request latency is recorded for `latency_stats`.
+
+    `serving` picks the scoring form: the trained "forest", or one of the
+    compact forms exported by `python -m src.serving` ("compiled",
+    "distilled", "linear").
+    """
+    def __init__(self, models_dir: str = "models", top_skills: int = 10, cache_size: int = 4096,
+                 latency_window: int = 10000, serving: str = "forest"):
+        self.models_dir = models_dir
+        self.top_skills = top_skills
+        self.serving = serving
+        model_path = find_artifact(models_dir, "best_model" if serving == "forest" else f"serving_{serving}")
+        if model_path is None:
+            if serving != "forest":
+                raise FileNotFoundError(f"No {serving} serving model in {models_dir}. Run python -m src.serving first.")
+            raise FileNotFoundError(f"No trained model in {models_dir}. Run ModelTrainer first.")
+        model_data = load_model_artifacts(model_path) if serving == "forest" else load_serving_model(model_path)
+        self.model_version = artifact_version(model_path)
+        best_path = find_artifact(models_dir, "best_model")
+        teacher_version = model_data.get('teacher_version')
+        if teacher_version and best_path and teacher_version != artifact_version(best_path):
+            logger.warning(f"The {serving} serving model was exported from an older best_model; re-run python -m src.serving")
+        self.model = model_data['model']
+        self.classes = np.asarray(self.model.classes_, dtype=object)
+        self.encoder = FeatureEncoder(model_data['mlb_classes'])
+        matrix_path = os.path.join(models_dir, "role_skill_matrix.csv")
+        self.role_skills = self._load_role_skills(matrix_path)
+        self.role_skills_version = artifact_version(matrix_path) if os.path.exists(matrix_path) else None
+        self.latencies = deque(maxlen=latency_window)
+        self._cached_proba = lru_cache(maxsize=cache_size)(self._predict_proba)
+        logger.info(f"Loaded recommender with {self.encoder.n_features} skills and {len(self.classes)} roles")
+
+    def _load_role_skills(self, path: str) -> Dict[str, Tuple[List[str], frozenset]]:
+        if not os.path.exists(path):
+            logger.warning(f"Role-skill matrix not found at {path}; skill gaps will be empty")
+            return {}
+        df = pd.read_csv(path, usecols=['role', 'skill', 'p_skill_given_role'])
+        df = df.sort_values('p_skill_given_role', ascending=False, kind='stable')
+        role_skills = {}
+        for role, group in df.groupby('role', sort=False):
+            skills = group['skill'].astype(str).head(self.top_skills).tolist()
+            role_skills[role] = (skills, frozenset(map(normalize_skill, skills)))
+        return role_skills
+
+    def encode(self, skills: Iterable[str]) -> np.ndarray:
+        """
+        Multi-hot feature row for `skills`; unknown skills are ignored.
+        """
+        X = np.zeros((1, self.encoder.n_features), dtype=np.float32)
+        X[0, self.encoder.skill_columns(skills)] = 1.0
+        return X
+
+    def encode_many(self, skill_lists: List[List[str]]) -> sparse.csr_matrix:
+        """
+        Multi-hot CSR matrix with one row per skill list.
+        """
+        return self.encoder.transform_skills(skill_lists).astype(np.float32)
+
+    def forest_proba(self, X) -> np.ndarray:
+        """
+        Same as model.predict_proba(X), averaging the trees directly. This
+        skips the per-call validation and thread-pool setup that dominate
+        RandomForestClassifier.predict_proba for small inputs. Other model
+        families go through their own predict_proba.
+        """
+        if not hasattr(self.model, "estimators_") or self.model.n_jobs not in (None, 1):
+            return self.model.predict_proba(X)
+        if sparse.issparse(X):
+            X = X.tocsr().astype(np.float32)
+            X.sort_indices()
+        proba = np.zeros((X.shape[0], len(self.classes)))
+        for tree in self.model.estimators_:
+            values = tree.tree_.predict(X)[:, :len(self.classes)]
+            proba += values / values.sum(axis=1, keepdims=True)
+        return proba / len(self.model.estimators_)
+
+    def _predict_proba(self, key: Tuple[str, ...]) -> np.ndarray:
+        proba = self.forest_proba(self.encode(key))[0]
+        proba.setflags(write=False)
+        return proba
+
+    def predict_proba(self, skills: Iterable[str]) -> np.ndarray:
+        key = tuple(sorted({key for key in map(normalize_skill, skills) if key in self.encoder.skill_index}))
+        return self._cached_proba(key)
+
+    def skill_gaps(self, role: str, skills: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """
+        Splits `role`'s top skills into the ones `skills` covers (in the
+        caller's spelling) and the ones still missing. Both sides go
+        through normalize_skill, so "Py" covers "python".
+        """
+        role_skills, role_set = self.role_skills.get(role, ([], frozenset()))
+        skills = list(skills)
+        have = set(map(normalize_skill, skills))
+        matched = [s for s in skills if normalize_skill(s) in role_set]
+        missing = [s for s in role_skills if normalize_skill(s) not in have]
+        return matched, missing
+
+    def recommend(self, skills: Iterable[str], k: int = 3) -> Recommendation:
+        start = time.perf_counter()
+        skills = list(skills)
+        proba = self.predict_proba(skills)
+        top = np.argsort(proba, kind='stable')[::-1][:k]
+        roles = [RoleScore(str(self.classes[i]), float(proba[i])) for i in top]
+        matched, missing = self.skill_gaps(roles[0].role, skills) if roles else ([], [])
+        self.latencies.append(time.perf_counter() - start)
+        return Recommendation(roles, matched, missing)
+
+    def recommend_batch(self, skill_lists: List[List[str]], k: int = 3) -> Dict[str, list]:
+        """
+        Scores many students with one forest pass over the whole matrix
+        (parallel across trees when the model's n_jobs is set).
+        Returns columns: top_roles, top_scores, matched_skills, missing_skills.
+        """
+        proba = self.forest_proba(self.encode_many(skill_lists))
+        top = np.argsort(proba, axis=1, kind='stable')[:, ::-1][:, :k]
+        top_scores = np.take_along_axis(proba, top, axis=1)
+        top_roles = self.classes[top]
+        matched, missing = [], []
+        for skills, best in zip(skill_lists, top_roles[:, 0]):
+            have, gaps = self.skill_gaps(best, skills)
+            matched.append(have)
+            missing.append(gaps)
+        return {"top_roles": top_roles.tolist(), "top_scores": top_scores.tolist(),
+                "matched_skills": matched, "missing_skills": missing}
+
+    def latency_stats(self) -> Dict[str, float]:
+        """
+        p50/p99/max request latency in milliseconds over the recent window.
+        """
+        if not self.latencies:
+            return {"count": 0}
+        ms = np.asarray(self.latencies) * 1000
+        return {"count": len(ms), "p50_ms": float(np.percentile(ms, 50)),
+                "p99_ms": float(np.percentile(ms, 99)), "max_ms": float(ms.max())}
@@ -36,8 +36,12 @@ class RoadmapGenerator:
             ]
         }
 
-    def generate_roadmap(self, student_id: str, role: str, missing_skills: list):
-        logger.info(f"Generating roadmap for {student_id} -> {role}")
+    def generate_roadmap(self, student_id: str, role: str, missing_skills: list, save: bool = True):
+        """
+        Builds the roadmap dict; with `save` it is also written as JSON and PDF.
+        """
+        if save:
+            logger.info(f"Generating roadmap for {student_id} -> {role}")
         
         roadmap = {
             "student_id": student_id,
@@ -76,6 +80,9 @@ class RoadmapGenerator:
             "description": f"Build a complete {role} project using {', '.join(missing_skills[:3])}."
         })
         
+        if not save:
+            return roadmap
+
         # Save JSON
         json_path = os.path.join(self.output_dir, f"{student_id}.json")
         with open(json_path, 'w') as f:
@@ -87,6 +94,11 @@ class RoadmapGenerator:
         return roadmap
 
     def generate_pdf(self, roadmap: dict, filepath: str):
+        with open(filepath, 'wb') as f:
+            f.write(self.render_pdf(roadmap))
+        logger.info(f"Saved PDF roadmap to {filepath}")
+
+    def render_pdf(self, roadmap: dict) -> bytes:
         pdf = FPDF()
         pdf.add_page()
         pdf.set_font("Arial", size=12)
@@ -115,8 +127,7 @@ class RoadmapGenerator:
             
             pdf.ln(5)
             
-        pdf.output(filepath)
-        logger.info(f"Saved PDF roadmap to {filepath}")
+        return pdf.output(dest='S').encode('latin-1')
 
 if __name__ == "__main__":
     gen = RoadmapGenerator()
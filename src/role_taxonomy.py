@@ -0,0 +1,65 @@
+import re
+import json
+import logging
+from functools import lru_cache
+from typing import List, Dict, Iterable
+from collections import defaultdict
+from src.parser_nlp import SkillMatcher
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("RoleClassifier")
+
+_SEPARATORS = re.compile(r'[^a-z0-9+#.]+')
+
+def normalize_title(title: str) -> str:
+    """
+    Lowercases a title and collapses punctuation/whitespace runs, so
+    "Sr. Back-End  Engineer" and "sr. back end engineer" are the same key.
+    """
+    return _SEPARATORS.sub(' ', (title or '').lower()).strip()
+
+class RoleClassifier:
+    """
+    Maps job titles to role families from a configurable taxonomy.
+
+    Every role's patterns/synonyms are compiled into one SkillMatcher, so a
+    title is classified with a single scan regardless of how many roles the
+    taxonomy has. When several roles match, the one listed first in the
+    taxonomy wins. Results are memoized per raw and per normalized title.
+    """
+    def __init__(self, roles: List[Dict], default_role: str = "Unknown", cache_size: int = 1 << 16):
+        self.roles = [role["name"] for role in roles]
+        self.default_role = default_role
+        self.priority = {name: i for i, name in enumerate(self.roles)}
+        terms = defaultdict(set)
+        for role in roles:
+            for pattern in [role["name"]] + list(role.get("patterns", [])):
+                key = normalize_title(pattern)
+                if key:
+                    terms[key].add(role["name"])
+        self.matcher = SkillMatcher(terms)
+        # Raw titles are memoized too, so repeats skip normalization as well
+        self._classify_normalized = lru_cache(maxsize=cache_size)(self._match)
+        self._classify_raw = lru_cache(maxsize=cache_size)(
+            lambda title: self._classify_normalized(normalize_title(title)))
+
+    @classmethod
+    def from_file(cls, path: str = "data/roles/role_taxonomy.json", **kwargs) -> "RoleClassifier":
+        with open(path, 'r', encoding='utf-8') as f:
+            taxonomy = json.load(f)
+        classifier = cls(taxonomy["roles"], taxonomy.get("default_role", "Unknown"), **kwargs)
+        logger.info(f"Loaded {len(classifier.roles)} roles from {path}")
+        return classifier
+
+    def _match(self, normalized: str) -> str:
+        matches = self.matcher.find(normalized)
+        if not matches:
+            return self.default_role
+        return min(matches, key=self.priority.__getitem__)
+
+    def classify(self, title: str) -> str:
+        return self._classify_raw(title)
+
+    def classify_many(self, titles: Iterable[str]) -> List[str]:
+        return [self.classify(title) for title in titles]
@@ -0,0 +1,354 @@
+import os
+import json
+import time
+import logging
+import argparse
+from typing import List, Dict, Iterable, Optional
+import numpy as np
+from scipy import sparse
+from src.artifacts import (ArtifactBundle, save_bundle, find_artifact, load_model_artifacts, artifact_version,
+                           BUNDLE_SUFFIX)
+from src.features import FeatureEncoder
+from src.instrumentation import span
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("Serving")
+
+# "forest" is the trained model itself; the others are exported by export_serving
+SERVING_FORMS = ("forest", "compiled", "distilled", "linear")
+
+class CompiledTrees:
+    """
+    A tree ensemble flattened into contiguous node arrays for scoring.
+
+    All trees' nodes share one feature/threshold/left/right table, and each
+    leaf holds its class probabilities. Leaves point back at themselves
+    with an infinite threshold, so every row walks all trees at once in
+    at most `depth` steps of a few vectorised lookups, with no per-tree
+    Python calls or input validation; (row, tree) pairs drop out as they
+    reach a leaf. Sparse input is densified about `chunk_cells` values at
+    a time. As in sklearn, inputs are float32 and thresholds stay float64
+    (midpoints between float32 training values), so every split goes the
+    same way as in the source trees.
+    """
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray, right: np.ndarray,
+                 values: np.ndarray, roots: np.ndarray, depth: int, classes: Iterable[str], chunk_cells: int = 2 ** 20):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.values = values
+        self.roots = roots
+        self.depth = int(depth)
+        self.classes_ = np.asarray(list(classes), dtype=object)
+        self.n_features_in_ = int(feature.max()) + 1 if len(feature) else 0
+        self.chunk_cells = chunk_cells
+        self._nodes = None
+        self.n_jobs = 1
+
+    @classmethod
+    def from_trees(cls, trees: List, values: List[np.ndarray], classes: Iterable[str]) -> "CompiledTrees":
+        """
+        Flattens sklearn `tree_` objects; `values` are each tree's per-node
+        class probabilities, kept in their dtype.
+        """
+        features, thresholds, lefts, rights, roots = [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            n = tree.node_count
+            leaf = tree.children_left < 0
+            index = np.arange(n)
+            features.append(np.where(leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold).astype(np.float64))
+            lefts.append((np.where(leaf, index, tree.children_left) + offset).astype(np.int32))
+            rights.append((np.where(leaf, index, tree.children_right) + offset).astype(np.int32))
+            roots.append(offset)
+            offset += n
+        return cls(np.concatenate(features), np.concatenate(thresholds), np.concatenate(lefts),
+                   np.concatenate(rights), np.concatenate(values), np.array(roots, dtype=np.int32),
+                   max(tree.max_depth for tree in trees), classes)
+
+    @classmethod
+    def from_forest(cls, model) -> "CompiledTrees":
+        """
+        The forest with float64 leaf probabilities, averaged tree by tree
+        as RandomForestClassifier.predict_proba does, so scores match it.
+        """
+        values = []
+        for estimator in model.estimators_:
+            value = estimator.tree_.value[:, 0, :]
+            values.append(value / np.maximum(value.sum(axis=1, keepdims=True), 1e-12))
+        return cls.from_trees([estimator.tree_ for estimator in model.estimators_], values, model.classes_)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.feature, self.threshold, self.left, self.right, self.values, self.roots))
+
+    def _walk(self, X: np.ndarray) -> np.ndarray:
+        """
+        Leaf reached by each (row, tree) pair, row-major.
+        """
+        n_trees = len(self.roots)
+        nodes = np.tile(self.roots, X.shape[0])
+        # Offset of each (row, tree) pair's row in the flattened batch
+        rows = np.repeat(np.arange(X.shape[0], dtype=np.int64) * X.shape[1], n_trees)
+        flat = X.ravel()
+        active = np.arange(len(nodes))
+        for _ in range(self.depth):
+            current = nodes[active]
+            moved = np.where(flat[rows[active] + self.feature[current]] <= self.threshold[current],
+                             self.left[current], self.right[current])
+            nodes[active] = moved
+            # Pairs that reached a leaf stop moving and drop out
+            active = active[moved != current]
+            if not len(active):
+                break
+        return nodes
+
+    def _proba(self, X: np.ndarray) -> np.ndarray:
+        return self.values[self._walk(X)].reshape(X.shape[0], len(self.roots), -1).mean(axis=1)
+
+    def _walk_one(self, x: Dict[int, float]) -> np.ndarray:
+        """
+        One sparse row through a few small trees: plain Python steps beat
+        numpy's per-call overhead there (the distilled tree).
+        """
+        if self._nodes is None:
+            self._nodes = (self.feature.tolist(), self.threshold.tolist(), self.left.tolist(), self.right.tolist())
+        feature, threshold, left, right = self._nodes
+        leaves = []
+        for node in self.roots.tolist():
+            while True:
+                nxt = left[node] if x.get(feature[node], 0.0) <= threshold[node] else right[node]
+                if nxt == node:
+                    break
+                node = nxt
+            leaves.append(node)
+        return self.values[leaves].mean(axis=0, keepdims=True)
+
+    def apply(self, X) -> np.ndarray:
+        """
+        Index of the leaf each row reaches in each tree, numbered within
+        its tree like sklearn's `apply`.
+        """
+        X = _dense(sparse.csr_matrix(X, dtype=np.float32), 0, X.shape[0]) if sparse.issparse(X) \
+            else np.asarray(X, dtype=np.float32)
+        return self._walk(X).reshape(X.shape[0], len(self.roots)) - self.roots
+
+    def predict_proba(self, X) -> np.ndarray:
+        if not sparse.issparse(X):
+            return self._proba(np.asarray(X, dtype=np.float32))
+        X = sparse.csr_matrix(X, dtype=np.float32)
+        if X.shape[0] == 1 and len(self.roots) * self.depth <= 256:
+            return self._walk_one(dict(zip(X.indices.tolist(), X.data.tolist())))
+        inverse = None
+        if X.shape[0] > 1:
+            # Cohorts repeat skill sets: walk each distinct row once
+            X.sort_indices()
+            distinct, inverse = {}, np.empty(X.shape[0], dtype=np.int64)
+            for i in range(X.shape[0]):
+                lo, hi = X.indptr[i], X.indptr[i + 1]
+                inverse[i] = distinct.setdefault((X.indices[lo:hi].tobytes(), X.data[lo:hi].tobytes()), len(distinct))
+            X = X[np.unique(inverse, return_index=True)[1]]
+        # Densify about `chunk_cells` values at a time
+        step = max(1, self.chunk_cells // max(X.shape[1], 1))
+        proba = np.empty((X.shape[0], len(self.classes_)), dtype=self.values.dtype)
+        for start in range(0, X.shape[0], step):
+            proba[start:start + step] = self._proba(_dense(X, start, min(start + step, X.shape[0])))
+        return proba if inverse is None else proba[inverse]
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"feature": self.feature, "threshold": self.threshold, "left": self.left, "right": self.right,
+                "values": self.values, "roots": self.roots}
+
+def _dense(X: sparse.csr_matrix, start: int, end: int) -> np.ndarray:
+    lo, hi = X.indptr[start], X.indptr[end]
+    dense = np.zeros((end - start, X.shape[1]), dtype=np.float32)
+    dense[np.repeat(np.arange(end - start), np.diff(X.indptr[start:end + 1])), X.indices[lo:hi]] = X.data[lo:hi]
+    return dense
+
+class LinearScorer:
+    """
+    Softmax over one weight per (class, skill): a single request sums the
+    weight columns of its skills. Fit by distillation from the forest.
+    """
+    def __init__(self, coef: np.ndarray, intercept: np.ndarray, classes: Iterable[str]):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.coef_t = np.ascontiguousarray(self.coef.T)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.classes_ = np.asarray(list(classes), dtype=object)
+        self.n_features_in_ = self.coef.shape[1]
+        self.n_jobs = 1
+
+    @property
+    def nbytes(self) -> int:
+        return self.coef.nbytes + self.intercept.nbytes
+
+    def predict_proba(self, X) -> np.ndarray:
+        if sparse.issparse(X):
+            X = sparse.csr_matrix(X)
+            if X.shape[0] == 1:
+                scores = (self.coef_t[X.indices] * X.data[:, None]).sum(axis=0, keepdims=True) + self.intercept
+            else:
+                scores = np.asarray(X @ self.coef_t) + self.intercept
+        else:
+            scores = np.asarray(X, dtype=np.float64) @ self.coef_t + self.intercept
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        return scores / scores.sum(axis=1, keepdims=True)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {"coef": self.coef, "intercept": self.intercept}
+
+def distillation_set(encoder: FeatureEncoder, n_samples: int, max_skills: int = 8, seed: int = 42) -> sparse.csr_matrix:
+    """
+    Synthetic profiles over the model's skill vocabulary: 1..`max_skills`
+    distinct skills each, drawn uniformly.
+    """
+    rng = np.random.default_rng(seed)
+    skills = encoder.skills
+    sizes = rng.integers(1, min(max_skills, len(skills)) + 1, size=n_samples)
+    return encoder.transform_skills([[skills[j] for j in rng.choice(len(skills), size=k, replace=False)]
+                                     for k in sizes])
+
+def _fidelity(proba: np.ndarray, reference: np.ndarray) -> Dict[str, float]:
+    top = np.argsort(-reference, axis=1, kind='stable')[:, :3]
+    return {"top1_agreement": float(np.mean(proba.argmax(axis=1) == reference.argmax(axis=1))),
+            "top3_overlap": float(np.mean([len(set(a) & set(b)) / len(a) for a, b in
+                                           zip(np.argsort(-proba, axis=1, kind='stable')[:, :3], top)])),
+            "mean_abs_diff": float(np.abs(proba - reference).mean()),
+            "max_abs_diff": float(np.abs(proba - reference).max())}
+
+def _latency(model, rows: List[sparse.csr_matrix]) -> Dict[str, float]:
+    seconds = []
+    for row in rows:
+        start = time.perf_counter()
+        model.predict_proba(row)
+        seconds.append(time.perf_counter() - start)
+    us = np.asarray(seconds) * 1e6
+    return {"p50_us": float(np.percentile(us, 50)), "p99_us": float(np.percentile(us, 99))}
+
+def _forest_nbytes(model) -> int:
+    if hasattr(model, "estimators_"):
+        return sum(e.tree_.__getstate__()["nodes"].nbytes + e.tree_.value.nbytes for e in model.estimators_)
+    return sum(np.asarray(v).nbytes for v in vars(model).values() if isinstance(v, np.ndarray))
+
+def save_serving_model(path: str, form: str, model, mlb_classes: List[str], metadata: Dict):
+    save_bundle(path, "serving_model", {"form": form, "classes": [str(c) for c in model.classes_],
+                                        "mlb_classes": list(mlb_classes),
+                                        "depth": getattr(model, "depth", None), **metadata},
+                arrays=model.arrays())
+
+def load_serving_model(path: str) -> Dict:
+    """
+    {"model", "mlb_classes", "classes", "teacher_version"} from a serving bundle.
+    """
+    bundle = ArtifactBundle(path)
+    meta = bundle.metadata
+    if meta["form"] == "linear":
+        model = LinearScorer(bundle.get("coef"), bundle.get("intercept"), meta["classes"])
+    else:
+        model = CompiledTrees(*(np.asarray(bundle.get(name)) for name in
+                                ("feature", "threshold", "left", "right", "values", "roots")),
+                              meta["depth"], meta["classes"])
+    return {"model": model, "mlb_classes": meta["mlb_classes"], "classes": meta["classes"],
+            "teacher_version": meta.get("teacher_version")}
+
+def export_serving(models_dir: str = "models", forms: Iterable[str] = ("compiled", "distilled", "linear"),
+                   n_samples: int = 20000, depth: int = 10, seed: int = 42,
+                   reports_dir: Optional[str] = "reports") -> Dict:
+    """
+    Converts the trained best_model into compact serving forms, saved as
+    models/serving_<form>.bundle:
+
+        compiled   the same forest as CompiledTrees (identical scores)
+        distilled  one regression tree of depth `depth` fit to the
+                   forest's probabilities, as CompiledTrees
+        linear     a LinearScorer fit to the forest's top role
+
+    Distillation uses `n_samples` synthetic profiles over the model's
+    vocabulary; a held-out fifth measures each form's agreement with the
+    forest, alongside its size and single-row/batch latency. The report
+    goes to reports/serving_report.json.
+    """
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.tree import DecisionTreeRegressor
+
+    model_path = find_artifact(models_dir, "best_model")
+    if model_path is None:
+        raise FileNotFoundError(f"No trained model in {models_dir}. Run ModelTrainer first.")
+    artifacts = load_model_artifacts(model_path)
+    teacher, mlb_classes = artifacts["model"], artifacts["mlb_classes"]
+    encoder = FeatureEncoder(mlb_classes)
+    X = distillation_set(encoder, n_samples, seed=seed).astype(np.float32)
+    split = int(0.8 * X.shape[0])
+    X_fit, X_eval = X[:split], X[split:]
+    with span("serving.teacher_proba", rows=X.shape[0]):
+        proba_fit, proba_eval = teacher.predict_proba(X_fit), teacher.predict_proba(X_eval)
+    rows = [X_eval[i:i + 1] for i in range(min(200, X_eval.shape[0]))]
+
+    def measure(model, size: int) -> Dict:
+        start = time.perf_counter()
+        proba = model.predict_proba(X_eval)
+        batch = time.perf_counter() - start
+        return {**_fidelity(proba, proba_eval), "size_kb": size / 1024, **_latency(model, rows),
+                "batch_rows_per_sec": X_eval.shape[0] / batch if batch else 0.0}
+
+    report = {"teacher": type(teacher).__name__, "teacher_version": artifact_version(model_path),
+              "samples": n_samples, "forms": {"forest": measure(teacher, _forest_nbytes(teacher))}}
+    for form in forms:
+        with span("serving.export", form=form):
+            if form == "compiled":
+                if not hasattr(teacher, "estimators_"):
+                    logger.warning(f"{type(teacher).__name__} is not a tree ensemble; skipping the compiled form")
+                    continue
+                model = CompiledTrees.from_forest(teacher)
+            elif form == "distilled":
+                tree = DecisionTreeRegressor(max_depth=depth, min_samples_leaf=5, random_state=seed)
+                tree.fit(X_fit, proba_fit)
+                values = np.clip(tree.tree_.value[:, :, 0], 0.0, None)
+                values /= np.maximum(values.sum(axis=1, keepdims=True), 1e-12)
+                model = CompiledTrees.from_trees([tree.tree_], [values.astype(np.float32)], teacher.classes_)
+            elif form == "linear":
+                targets = proba_fit.argmax(axis=1)
+                labels = np.unique(targets)
+                # Classes the forest never ranks first get no weights; keep them at zero probability
+                coef = np.zeros((len(teacher.classes_), X.shape[1]))
+                intercept = np.full(len(teacher.classes_), -1e9)
+                if len(labels) == 1:
+                    intercept[labels[0]] = 0.0
+                elif len(labels) == 2:
+                    student = LogisticRegression(max_iter=1000).fit(X_fit, targets)
+                    coef[labels[1]], intercept[labels[1]] = student.coef_[0], student.intercept_[0]
+                    intercept[labels[0]] = 0.0
+                else:
+                    student = LogisticRegression(max_iter=1000).fit(X_fit, targets)
+                    coef[labels], intercept[labels] = student.coef_, student.intercept_
+                model = LinearScorer(coef, intercept, teacher.classes_)
+            else:
+                raise ValueError(f"Unknown serving form: {form} (expected one of {SERVING_FORMS[1:]})")
+        report["forms"][form] = measure(model, model.nbytes)
+        path = os.path.join(models_dir, f"serving_{form}" + BUNDLE_SUFFIX)
+        save_serving_model(path, form, model, mlb_classes, {"teacher_version": report["teacher_version"],
+                                                            "fidelity": report["forms"][form]})
+        logger.info(f"Exported {form} serving model to {path}: {json.dumps(report['forms'][form])}")
+    if reports_dir:
+        os.makedirs(reports_dir, exist_ok=True)
+        with open(os.path.join(reports_dir, "serving_report.json"), 'w') as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Export the trained model in compact serving forms.")
+    arg_parser.add_argument("--models-dir", default="models")
+    arg_parser.add_argument("--forms", nargs="+", choices=SERVING_FORMS[1:], default=list(SERVING_FORMS[1:]))
+    arg_parser.add_argument("--samples", type=int, default=20000, help="synthetic profiles for distillation")
+    arg_parser.add_argument("--depth", type=int, default=10, help="depth of the distilled tree")
+    arg_parser.add_argument("--seed", type=int, default=42)
+    args = arg_parser.parse_args()
+
+    report = export_serving(args.models_dir, args.forms, args.samples, args.depth, args.seed)
+    for form, stats in report["forms"].items():
+        print(f"{form:<10} agree={stats['top1_agreement']:.3f} size={stats['size_kb']:.0f}KB "
+              f"p50={stats['p50_us']:.0f}us batch={stats['batch_rows_per_sec']:.0f} rows/s")
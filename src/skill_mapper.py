@@ -1,98 +1,170 @@
 import os
 import json
+import numpy as np
 import pandas as pd
 import logging
+from typing import Dict, List, Iterable, Iterator
+from itertools import chain
 from collections import defaultdict
+from scipy import sparse
+from src.job_store import ParsedJobStore
+from src.role_taxonomy import RoleClassifier
+from src.instrumentation import span, traced, count
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("SkillRoleMapper")
 
+class RoleSkillCounts:
+    """
+    Sparse job x skill incidence matrix plus a role index per job.
+    """
+    def __init__(self, incidence: sparse.csr_matrix, job_roles: np.ndarray, roles: List[str], skills: List[str]):
+        self.incidence = incidence
+        self.job_roles = job_roles
+        self.roles = roles
+        self.skills = skills
+
+    def role_skill_counts(self) -> sparse.csr_matrix:
+        # One sparse product: (roles x jobs) one-hot times (jobs x skills)
+        n_jobs = len(self.job_roles)
+        role_onehot = sparse.csr_matrix(
+            (np.ones(n_jobs, dtype=np.int64), (self.job_roles, np.arange(n_jobs))),
+            shape=(len(self.roles), n_jobs))
+        return (role_onehot @ self.incidence).tocsr()
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Long (role, skill) table with counts, P(skill|role) and P(role|skill)
+        for every role/skill pair.
+        """
+        counts = self.role_skill_counts().toarray()
+        role_totals = np.bincount(self.job_roles, minlength=len(self.roles))
+        skill_totals = counts.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # P(skill|role) = count(skill, role) / count(role)
+            p_skill_given_role = np.nan_to_num(counts / role_totals[:, None])
+            # P(role|skill) = count(skill, role) / count(skill)
+            p_role_given_skill = np.nan_to_num(counts / skill_totals[None, :])
+        n_roles, n_skills = counts.shape
+        return pd.DataFrame({
+            "role": np.repeat(np.array(self.roles, dtype=object), n_skills),
+            "skill": np.tile(np.array(self.skills, dtype=object), n_roles),
+            "count": counts.ravel(),
+            "p_skill_given_role": p_skill_given_role.ravel(),
+            "p_role_given_skill": p_role_given_skill.ravel(),
+        })
+
 class SkillRoleMapper:
-    def __init__(self, parsed_data_path: str = "data/jobs/parsed/jobs.json", output_dir: str = "models"):
+    def __init__(self, parsed_data_path: str = "data/jobs/parsed/jobs.json", output_dir: str = "models",
+                 parsed_store_dir: str = "data/jobs/parsed/jobs_store",
+                 examples_path: str = "data/examples_by_role.json",
+                 taxonomy_path: str = "data/roles/role_taxonomy.json"):
         self.parsed_data_path = parsed_data_path
+        # Simplify titles to base roles (e.g., "Senior Data Engineer" -> "Data Engineer")
+        self.classifier = RoleClassifier.from_file(taxonomy_path)
+        self.store = ParsedJobStore(parsed_store_dir)
         self.output_dir = output_dir
+        self.examples_path = examples_path
         os.makedirs(self.output_dir, exist_ok=True)
 
+    def iter_batches(self, batch_size: int = 50000) -> Iterator[Dict[str, list]]:
+        """
+        Streams {id, title, extracted_skills} column batches, preferring the
+        columnar store over the jobs.json export.
+        """
+        columns = ["id", "title", "extracted_skills"]
+        if self.store.exists():
+            yield from self.store.iter_batches(columns=columns, batch_size=batch_size)
+            return
+        with open(self.parsed_data_path, 'r', encoding='utf-8') as f:
+            jobs = json.load(f)
+        for start in range(0, len(jobs), batch_size):
+            chunk = jobs[start:start + batch_size]
+            yield {
+                "id": [job['id'] for job in chunk],
+                "title": [job.get('title') for job in chunk],
+                "extracted_skills": [job.get('extracted_skills', []) for job in chunk],
+            }
+
+    def build_counts(self, batches: Iterable[Dict[str, list]], examples_per_role: int = 5):
+        """
+        Builds the incidence matrix in one pass over the batches. Each
+        distinct title is classified once, and the first few job ids per
+        role are collected as examples along the way.
+        """
+        role_index = {}
+        title_roles = {}
+        examples = defaultdict(list)
+        role_parts, length_parts, skill_parts = [], [], []
+
+        for batch in batches:
+            # Classify each distinct title once, then broadcast the role ids
+            title_codes, titles = pd.factorize(pd.Series(batch["title"], dtype=object).fillna('Unknown'))
+            title_role_ids = np.empty(len(titles), dtype=np.int64)
+            for i, title in enumerate(titles):
+                role_id = title_roles.get(title)
+                if role_id is None:
+                    role_id = role_index.setdefault(self.classifier.classify(title), len(role_index))
+                    title_roles[title] = role_id
+                title_role_ids[i] = role_id
+            job_roles = title_role_ids[title_codes]
+            role_parts.append(job_roles)
+
+            skill_lists = batch["extracted_skills"]
+            length_parts.append(np.fromiter(map(len, skill_lists), dtype=np.int64, count=len(skill_lists)))
+            skill_parts.append(list(chain.from_iterable(skill_lists)))
+
+            if len(examples) < len(role_index) or any(len(ids) < examples_per_role for ids in examples.values()):
+                roles = list(role_index)
+                for role_id, job_id in zip(job_roles, batch["id"]):
+                    ids = examples[roles[role_id]]
+                    if len(ids) < examples_per_role:
+                        ids.append(job_id)
+
+        job_roles = np.concatenate(role_parts) if role_parts else np.empty(0, dtype=np.int64)
+        lengths = np.concatenate(length_parts) if length_parts else np.empty(0, dtype=np.int64)
+        # One factorize over every (job, skill) occurrence gives the skill columns
+        skill_codes, skills = pd.factorize(pd.Series(list(chain.from_iterable(skill_parts)), dtype=object))
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        incidence = sparse.csr_matrix((np.ones(len(rows), dtype=np.int64), (rows, skill_codes)),
+                                      shape=(len(lengths), len(skills)))
+        # A skill listed twice in one job still counts once
+        incidence.data[:] = 1
+        counts = RoleSkillCounts(incidence, job_roles, list(role_index), list(skills))
+        return counts, dict(examples)
+
+    @traced("skill_mapper.map_skills")
     def map_skills(self):
         logger.info("Loading parsed job data...")
-        if not os.path.exists(self.parsed_data_path):
+        if not self.store.exists() and not os.path.exists(self.parsed_data_path):
             logger.error(f"Parsed data not found at {self.parsed_data_path}")
             return
 
-        with open(self.parsed_data_path, 'r', encoding='utf-8') as f:
-            jobs = json.load(f)
-
-        # 1. Compute Skill Frequency by Role
-        role_skill_counts = defaultdict(lambda: defaultdict(int))
-        role_counts = defaultdict(int)
-
-        for job in jobs:
-            # Extract role from title (simple heuristic for mock data)
-            # In real scenario, we might use a classifier or more complex logic
-            title = job.get('title', 'Unknown')
-            # Simplify title to base role if possible (e.g., "Senior Data Engineer" -> "Data Engineer")
-            # For mock data, titles are like "Senior Data Engineer"
-            role = "Unknown"
-            if "Data Engineer" in title: role = "Data Engineer"
-            elif "Data Scientist" in title: role = "Data Scientist"
-            elif "Backend" in title: role = "Backend Engineer"
-            elif "Frontend" in title: role = "Frontend Engineer"
-            elif "DevOps" in title: role = "DevOps Engineer"
-            
-            role_counts[role] += 1
-            for skill in job.get('extracted_skills', []):
-                role_skill_counts[role][skill] += 1
+        # 1. Skill incidence by job, role per job
+        with span("skill_mapper.build_counts"):
+            counts, examples = self.build_counts(self.iter_batches())
+        count("jobs_read", counts.incidence.shape[0])
+        logger.info(f"Built {counts.incidence.shape[0]} x {counts.incidence.shape[1]} job-skill matrix "
+                    f"over {len(counts.roles)} roles")
 
         # 2. Compute Probabilities P(skill|role) and P(role|skill)
         # We want to know: Given a skill, how likely is it associated with a role?
         # And: Given a role, how important is this skill?
-        
-        data = []
-        all_skills = set()
-        for role, skills in role_skill_counts.items():
-            for skill, count in skills.items():
-                all_skills.add(skill)
-                
-        for role in role_counts:
-            for skill in all_skills:
-                count = role_skill_counts[role].get(skill, 0)
-                role_total = role_counts[role]
-                
-                # P(skill|role) = count(skill, role) / count(role)
-                p_skill_given_role = count / role_total if role_total > 0 else 0
-                
-                data.append({
-                    "role": role,
-                    "skill": skill,
-                    "count": count,
-                    "p_skill_given_role": p_skill_given_role
-                })
-                
-        df = pd.DataFrame(data)
-        
+        df = counts.to_frame()
+
         # Save matrix
         matrix_path = os.path.join(self.output_dir, "role_skill_matrix.csv")
-        df.to_csv(matrix_path, index=False)
+        with span("skill_mapper.write_matrix"):
+            df.to_csv(matrix_path, index=False)
+        count("rows_written", len(df))
+        count("bytes_written", os.path.getsize(matrix_path))
         logger.info(f"Saved role-skill matrix to {matrix_path}")
-        
+
         # Save examples by role
-        examples = defaultdict(list)
-        for job in jobs:
-             title = job.get('title', 'Unknown')
-             role = "Unknown"
-             if "Data Engineer" in title: role = "Data Engineer"
-             elif "Data Scientist" in title: role = "Data Scientist"
-             elif "Backend" in title: role = "Backend Engineer"
-             elif "Frontend" in title: role = "Frontend Engineer"
-             elif "DevOps" in title: role = "DevOps Engineer"
-             
-             if len(examples[role]) < 5:
-                 examples[role].append(job['id'])
-                 
-        with open(os.path.join("data", "examples_by_role.json"), 'w') as f:
+        with open(self.examples_path, 'w') as f:
             json.dump(examples, f, indent=2)
-        logger.info(f"Saved examples by role to data/examples_by_role.json")
+        logger.info(f"Saved examples by role to {self.examples_path}")
 
 if __name__ == "__main__":
     mapper = SkillRoleMapper()
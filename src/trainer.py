@@ -1,15 +1,20 @@
 import os
 import json
-import pickle
+import argparse
 import pandas as pd
 import numpy as np
+from itertools import chain
+from scipy import sparse
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
-from sklearn.preprocessing import MultiLabelBinarizer
 import logging
 import random
 from src.clustering import ProfileClustering
+from src.artifacts import save_classifier, BUNDLE_SUFFIX
+from src.features import FeatureEncoder
+from src.model_selection import ModelSearch, build_estimator
+from src.instrumentation import span, traced, count
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -21,7 +26,7 @@ class ModelTrainer:
         self.reports_dir = reports_dir
         os.makedirs(self.models_dir, exist_ok=True)
         os.makedirs(self.reports_dir, exist_ok=True)
-        self.mlb = MultiLabelBinarizer()
+        self.encoder = FeatureEncoder()
         
     def load_role_skill_matrix(self):
         path = os.path.join(self.models_dir, "role_skill_matrix.csv")
@@ -29,40 +34,72 @@ class ModelTrainer:
             raise FileNotFoundError(f"Role-Skill Matrix not found at {path}. Run SkillRoleMapper first.")
         return pd.read_csv(path)
 
+    @staticmethod
+    def skill_role_weights(role_skill_df: pd.DataFrame):
+        """
+        Pivots the long role-skill matrix into a dense skill x role array of
+        P(skill|role). Skills and roles keep their first-seen order.
+        """
+        skills = pd.unique(role_skill_df['skill'])
+        roles = pd.unique(role_skill_df['role'])
+        weights = (role_skill_df.pivot_table(index='skill', columns='role', values='p_skill_given_role',
+                                             aggfunc='last', fill_value=0.0)
+                   .reindex(index=skills, columns=roles, fill_value=0.0))
+        return list(skills), np.asarray(roles, dtype=object), weights.to_numpy(dtype=np.float64)
+
+    @traced("trainer.label_students")
     def label_students(self, students: list, role_skill_df: pd.DataFrame):
         """
         Assigns a target role to each student based on their skills and the matrix.
         """
         logger.info("Labeling synthetic students...")
+        skills, roles, weights = self.skill_role_weights(role_skill_df)
+
+        # Multi-hot student x skill matrix (skills outside the matrix are ignored)
+        lengths = np.fromiter((len(s['skills']) for s in students), dtype=np.int64, count=len(students))
+        cols = pd.Index(skills).get_indexer(list(chain.from_iterable(s['skills'] for s in students)))
+        rows = np.repeat(np.arange(len(students)), lengths)
+        known = cols >= 0
+        X = sparse.csr_matrix((np.ones(known.sum()), (rows[known], cols[known])),
+                              shape=(len(students), len(skills)))
+
+        # Score every student against every role in one product
+        scores = np.asarray(X @ weights)
+        has_known_skill = X.getnnz(axis=1) > 0
+        if len(roles):
+            best = roles[scores.argmax(axis=1)]
+        else:
+            best = np.full(len(students), "Generalist", dtype=object)
+        target_roles = np.where(has_known_skill, best, "Generalist") # Fallback
+
         labeled_data = []
-        
-        # Create a lookup: skill -> {role: score}
-        skill_role_map = {}
-        for _, row in role_skill_df.iterrows():
-            skill = row['skill']
-            role = row['role']
-            score = row['p_skill_given_role'] # or use raw count
-            if skill not in skill_role_map: skill_role_map[skill] = {}
-            skill_role_map[skill][role] = score
-            
-        for student in students:
-            scores = {}
-            for skill in student['skills']:
-                if skill in skill_role_map:
-                    for role, score in skill_role_map[skill].items():
-                        scores[role] = scores.get(role, 0) + score
-            
-            if not scores:
-                target_role = "Generalist" # Fallback
-            else:
-                target_role = max(scores, key=scores.get)
-                
+        for student, target_role in zip(students, target_roles):
             student['target_role'] = target_role
             labeled_data.append(student)
             
         return labeled_data
 
-    def train(self):
+    def select_model(self, X, y, families=None, n_jobs: int = -1):
+        """
+        Searches the model families with ModelSearch (parallel, successive
+        halving, fold results cached under reports/model_search/), writes
+        the leaderboard and refits the winner on all of (X, y).
+        """
+        search = ModelSearch(families, n_jobs=n_jobs, cache_dir=os.path.join(self.reports_dir, "model_search"))
+        leaderboard = search.run(X, y)
+        search.write_leaderboard(leaderboard, self.reports_dir)
+        best = leaderboard[0]
+        logger.info(f"Selected {best['family']} {best['params']} (cv {search.scoring} {best['score']:.4f})")
+        clf = build_estimator(best['family'], best['params'])
+        # Integer labels suit every family (xgboost needs them); names go back on after
+        classes, codes = np.unique(np.asarray(y), return_inverse=True)
+        with span("trainer.fit", rows=len(codes), family=best['family']):
+            clf.fit(X, codes)
+        clf.classes_ = classes.astype(object)
+        return clf
+
+    @traced("trainer.train")
+    def train(self, search: bool = False, families=None, n_jobs: int = -1):
         # 1. Generate Data
         clustering = ProfileClustering()
         students = clustering.generate_mock_students(500)
@@ -80,22 +117,26 @@ class ModelTrainer:
                 s['target_role'] = random.choice(roles)
 
         # 3. Prepare Features
-        df = pd.DataFrame(labeled_students)
-        X_skills = self.mlb.fit_transform(df['skills'])
-        # We could add CGPA, Interests etc. For now, just skills.
-        X = X_skills
-        y = df['target_role']
+        count("students", len(labeled_students))
+        # Sparse skill columns; the encoder can add CGPA, internships and interests too
+        X = self.encoder.fit_transform(labeled_students)
+        y = pd.Series([s['target_role'] for s in labeled_students])
         
         # 4. Train Test Split
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
         
         # 5. Train Model
-        logger.info("Training RandomForest Classifier...")
-        clf = RandomForestClassifier(n_estimators=100, random_state=42)
-        clf.fit(X_train, y_train)
-        
+        if search:
+            clf = self.select_model(X_train, y_train, families, n_jobs)
+        else:
+            logger.info("Training RandomForest Classifier...")
+            clf = RandomForestClassifier(n_estimators=100, random_state=42)
+            with span("trainer.fit", rows=len(y_train)):
+                clf.fit(X_train, y_train)
+
         # 6. Evaluate
-        y_pred = clf.predict(X_test)
+        with span("trainer.evaluate", rows=len(y_test)):
+            y_pred = clf.classes_[clf.predict_proba(X_test).argmax(axis=1)]
         report = classification_report(y_test, y_pred, output_dict=True)
         logger.info("Model Evaluation:\n" + classification_report(y_test, y_pred))
         
@@ -103,15 +144,16 @@ class ModelTrainer:
         with open(os.path.join(self.reports_dir, "metrics.json"), 'w') as f:
             json.dump(report, f, indent=2)
             
-        with open(os.path.join(self.models_dir, "best_model.pkl"), 'wb') as f:
-            pickle.dump({
-                "model": clf,
-                "mlb": self.mlb,
-                "classes": clf.classes_
-            }, f)
-            
-        logger.info(f"Saved model to {os.path.join(self.models_dir, 'best_model.pkl')}")
+        model_path = os.path.join(self.models_dir, "best_model" + BUNDLE_SUFFIX)
+        save_classifier(model_path, clf, self.encoder)
+        logger.info(f"Saved model to {model_path}")
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Train the role classifier.")
+    arg_parser.add_argument("--search", action="store_true", help="select the model family and params by cross-validation")
+    arg_parser.add_argument("--families", nargs="+", help="model families to search (default: all installed)")
+    arg_parser.add_argument("--jobs", type=int, default=-1, help="search worker processes")
+    args = arg_parser.parse_args()
+
     trainer = ModelTrainer()
-    trainer.train()
+    trainer.train(search=args.search, families=args.families, n_jobs=args.jobs)
@@ -2,13 +2,36 @@ import unittest
 import sys
 import os
 import json
+import tempfile
+import numpy as np
+import pandas as pd
 
 # Add project root to path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.parser_nlp import SkillExtractor
+from src.job_store import ParsedJobStore
+from src.data_collector import MockJobScraper, ShardJobSink
+from src.async_scraper import AsyncMockJobScraper, FixtureJobBoard
+from src.skill_mapper import SkillRoleMapper
+from src.role_taxonomy import RoleClassifier
+from src.trainer import ModelTrainer
+from src.recommender import Recommender
+from src.batch_scorer import BatchScorer
+from src.api import RecommendationAPI
+from src.recommendation_cache import RecommendationCache
+from src.pipeline import Pipeline, Stage, default_stages
+from src.instrumentation import Tracer
 from src.roadmap import RoadmapGenerator
-from src.clustering import ProfileClustering
+from src.clustering import ProfileClustering, iter_chunks
+from src.cluster_assigner import ClusterAssigner
+from src.job_retrieval import JobRetriever, InvertedIndex
+from src.hashed_tfidf import HashedTfidfStore
+from src.features import FeatureEncoder
+from src.model_selection import ModelSearch
+from src.serving import export_serving, CompiledTrees
+from src.artifacts import (ArtifactBundle, save_forest_model, load_forest, save_cluster_model,
+                           load_cluster_model, save_tfidf, load_vectorizer, BUNDLE_SUFFIX)
 
 class TestAgents(unittest.TestCase):
     def test_skill_extraction(self):
@@ -18,7 +41,658 @@ class TestAgents(unittest.TestCase):
         self.assertIn("python", skills)
         self.assertIn("sql", skills)
         self.assertIn("aws", skills)
+
+    def test_skill_matcher_matches_per_term_regex(self):
+        import re
+        extractor = SkillExtractor()
+        extractor.common_skills |= {"spring", "c"}
+        extractor.build_matcher()
+        text = "Spring Boot, C++/c# and Node.js; ML with py, aws cloud and big data. c++x"
+        expected = set()
+        for skill in extractor.common_skills:
+            if re.search(r'\b' + re.escape(skill) + r'\b', text.lower()):
+                expected.add(skill)
+        for alias, canonical in extractor.skill_aliases.items():
+            if re.search(r'\b' + re.escape(alias) + r'\b', text.lower()):
+                expected.add(canonical)
+        self.assertEqual(set(extractor.extract_skills(text)), expected)
+        self.assertIn("spring", expected)
         
+    def test_streaming_process_jobs_matches_in_memory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_dir = os.path.join(tmp, "raw")
+            os.makedirs(raw_dir)
+            for i in range(25):
+                with open(os.path.join(raw_dir, f"mock_{i}.json"), 'w') as f:
+                    json.dump({"id": f"job_{i}", "title": "Data Engineer",
+                               "description": "Python, SQL and Spark" if i % 2 else "React and CSS"}, f)
+
+            results = []
+            for streaming in (False, True):
+                out = os.path.join(tmp, "streaming" if streaming else "memory")
+                extractor = SkillExtractor(raw_data_dir=raw_dir, output_dir=out, embeddings_dir=out, parsed_dir=out, dedup=False)
+                extractor.process_jobs(streaming=streaming, chunk_size=4, workers=2)
+                with open(os.path.join(out, "skill_dict.json")) as f:
+                    skill_dict = json.load(f)
+                with open(os.path.join(out, "jobs.json")) as f:
+                    jobs = json.load(f)
+                mapping = {skill: sorted(ids) for skill, ids in skill_dict["mapping"].items()}
+                results.append((skill_dict["counts"], mapping, {j["id"]: sorted(j["extracted_skills"]) for j in jobs}))
+
+            self.assertEqual(results[0], results[1])
+            self.assertEqual(results[1][0]["python"], 12)
+            # Postings were spilled to a scratch directory that is gone afterwards
+            self.assertFalse([name for name in os.listdir(out) if name.startswith(".spill-")])
+
+    def test_streaming_process_jobs_spills_a_large_vocabulary_in_few_files(self):
+        import resource
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_dir = os.path.join(tmp, "raw")
+            os.makedirs(raw_dir)
+            vocabulary = [f"tool{i}" for i in range(3000)]
+            for i in range(30):
+                with open(os.path.join(raw_dir, f"mock_{i}.json"), 'w') as f:
+                    json.dump({"id": f"job_{i}", "title": "Engineer",
+                               "description": " ".join(vocabulary[i * 100:(i + 1) * 100])}, f)
+            extractor = SkillExtractor(raw_data_dir=raw_dir, output_dir=tmp, embeddings_dir=tmp, parsed_dir=tmp,
+                                       dedup=False, export_json=False)
+            extractor.common_skills = set(vocabulary)
+            extractor.build_matcher()
+            # One spill file per skill would need 3000 descriptors
+            soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+            resource.setrlimit(resource.RLIMIT_NOFILE, (min(512, hard), hard))
+            try:
+                extractor.process_jobs(streaming=True, chunk_size=10, workers=2)
+            finally:
+                resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+            with open(os.path.join(tmp, "skill_dict.json")) as f:
+                mapping = json.load(f)["mapping"]
+            self.assertEqual(len(mapping), 3000)
+            self.assertEqual(mapping["tool1234"], ["job_12"])
+
+    def test_incremental_process_jobs_only_parses_new_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_dir = os.path.join(tmp, "raw")
+            os.makedirs(raw_dir)
+
+            def write_job(i, description):
+                with open(os.path.join(raw_dir, f"mock_{i}.json"), 'w') as f:
+                    json.dump({"id": f"job_{i}", "title": "Backend Engineer", "description": description}, f)
+
+            for i in range(5):
+                write_job(i, "Java and Docker")
+            extractor = SkillExtractor(raw_data_dir=raw_dir, output_dir=tmp, embeddings_dir=tmp, parsed_dir=tmp, dedup=False)
+            extractor.process_jobs()
+
+            write_job(5, "Python and Docker")
+            os.remove(os.path.join(raw_dir, "mock_0.json"))
+            stats = extractor.process_jobs(incremental=True)
+            self.assertEqual(stats, {"processed": 1, "skipped": 4, "removed": 1, "readmitted": 0,
+                                     "tfidf_refit": True, "duplicates": {}})
+
+            with open(os.path.join(tmp, "skill_dict.json")) as f:
+                counts = json.load(f)["counts"]
+            with open(os.path.join(tmp, "jobs.json")) as f:
+                ids = sorted(job["id"] for job in json.load(f))
+            self.assertEqual(counts, {"java": 4, "docker": 5, "python": 1})
+            self.assertEqual(ids, [f"job_{i}" for i in range(1, 6)])
+            self.assertEqual(extractor.process_jobs(incremental=True)["processed"], 0)
+
+    def test_incremental_tfidf_refits_to_match_a_full_run(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_dir = os.path.join(tmp, "raw")
+            os.makedirs(raw_dir)
+
+            def write_job(i, description):
+                with open(os.path.join(raw_dir, f"mock_{i}.json"), 'w') as f:
+                    json.dump({"id": f"job_{i}", "title": "Backend Engineer", "description": description}, f)
+
+            def tfidf(directory):
+                bundle = ArtifactBundle(os.path.join(directory, "job_tfidf.bundle"))
+                rows = dict(zip(bundle.get("job_ids"), bundle.get("matrix").toarray().tolist()))
+                return bundle.get("vocabulary"), np.array(bundle.get("idf")).tolist(), rows
+
+            for i in range(20):
+                write_job(i, "Java services and Docker" if i % 2 else "Python pipelines and SQL")
+            out = os.path.join(tmp, "incremental")
+            extractor = SkillExtractor(raw_data_dir=raw_dir, output_dir=out, embeddings_dir=out, parsed_dir=out, dedup=False)
+            extractor.process_jobs()
+
+            # 1 new job out of 20 is under the 20% threshold: the old vocabulary is reused
+            write_job(20, "Kotlin microservices")
+            self.assertFalse(extractor.process_jobs(incremental=True)["tfidf_refit"])
+            self.assertNotIn("kotlin", tfidf(out)[0])
+            self.assertTrue(extractor.process_jobs(incremental=True, refit=True)["tfidf_refit"])
+
+            full = os.path.join(tmp, "full")
+            SkillExtractor(raw_data_dir=raw_dir, output_dir=full, embeddings_dir=full, parsed_dir=full,
+                           dedup=False).process_jobs()
+            vocabulary, idf, rows = tfidf(out)
+            self.assertIn("kotlin", vocabulary)
+            self.assertEqual((vocabulary, rows.keys()), (tfidf(full)[0], tfidf(full)[2].keys()))
+            np.testing.assert_allclose(idf, tfidf(full)[1])
+            for job_id, row in rows.items():
+                np.testing.assert_allclose(row, tfidf(full)[2][job_id])
+
+            # Changes add up across runs until they pass the threshold
+            refits = []
+            for i in range(21, 26):
+                write_job(i, "Rust services")
+                refits.append(extractor.process_jobs(incremental=True)["tfidf_refit"])
+            self.assertEqual(refits, [False] * 4 + [True])
+            self.assertIn("rust", tfidf(out)[0])
+
+    def test_hashed_tfidf_streams_shards_and_updates_incrementally(self):
+        from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_dir = os.path.join(tmp, "raw")
+            os.makedirs(raw_dir)
+            descriptions = ["Python, SQL and Spark pipelines", "React and CSS interfaces", "Docker and Kubernetes ops"]
+
+            def write_job(i):
+                with open(os.path.join(raw_dir, f"mock_{i}.json"), 'w') as f:
+                    json.dump({"id": f"job_{i}", "title": "Engineer", "description": descriptions[i % 3]}, f)
+
+            for i in range(9):
+                write_job(i)
+            SkillExtractor(raw_data_dir=raw_dir, output_dir=tmp, embeddings_dir=tmp, parsed_dir=tmp,
+                           dedup=False).process_jobs()
+            self.assertTrue(os.path.exists(os.path.join(tmp, "job_tfidf.bundle")))
+            extractor = SkillExtractor(raw_data_dir=raw_dir, output_dir=tmp, embeddings_dir=tmp, parsed_dir=tmp,
+                                       dedup=False, hashing=True, hashing_features=2 ** 10)
+            extractor.process_jobs(streaming=True, chunk_size=4, workers=2)
+            # A full rebuild in one mode drops the other mode's artifact
+            self.assertFalse(os.path.exists(os.path.join(tmp, "job_tfidf.bundle")))
+            store = HashedTfidfStore(os.path.join(tmp, "job_tfidf_hashed"))
+            self.assertGreaterEqual(len(store._shards()), 2)
+
+            write_job(9)
+            os.remove(os.path.join(raw_dir, "mock_0.json"))
+            self.assertEqual(extractor.process_jobs(incremental=True)["processed"], 1)
+
+            # Same weights as fitting TF-IDF over the current corpus in one go
+            store = HashedTfidfStore(os.path.join(tmp, "job_tfidf_hashed"))
+            job_ids, matrix = store.matrix()
+            texts = {f"job_{i}": f"Engineer {descriptions[i % 3]}" for i in range(1, 10)}
+            hasher = HashingVectorizer(n_features=2 ** 10, stop_words='english', alternate_sign=False, norm=None)
+            expected = TfidfTransformer().fit_transform(hasher.transform([texts[j] for j in job_ids]))
+            self.assertEqual(sorted(job_ids), sorted(texts))
+            self.assertLess(abs(matrix - expected).max(), 1e-5)
+            self.assertEqual(store.n_docs, 9)
+
+            retriever = JobRetriever(os.path.join(tmp, "job_tfidf_hashed"), os.path.join(tmp, "jobs_store"))
+            self.assertIn(retriever.search(["React", "CSS"], k=1)[0].job_id, {"job_1", "job_4", "job_7"})
+
+    def test_dedup_drops_reposts_incrementally(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_dir = os.path.join(tmp, "raw")
+            os.makedirs(raw_dir)
+            scraper = MockJobScraper(raw_dir)
+            base = scraper.generate_job("Data Scientist")
+
+            def write_job(name, **changes):
+                with open(os.path.join(raw_dir, f"{name}.json"), 'w') as f:
+                    json.dump(dict(base, **changes), f)
+
+            write_job("original", id="job_0", source="board_a")
+            write_job("repost", id="job_1", source="board_b", company="Other Co")
+            write_job("distinct", id="job_2", source="board_a", title="Frontend Engineer",
+                      description=scraper.generate_job_description("Frontend Engineer", ["React", "CSS"]))
+            extractor = SkillExtractor(raw_data_dir=raw_dir, output_dir=tmp, embeddings_dir=tmp, parsed_dir=tmp)
+            extractor.process_jobs()
+            kept = [job["id"] for job in extractor.store.iter_jobs(columns=["id"])]
+            self.assertEqual(len(kept), 2)
+            self.assertIn("job_2", kept)
+
+            write_job("late_repost", id="job_3", source="board_c", location="Remote")
+            stats = extractor.process_jobs(incremental=True)
+            self.assertEqual(stats["duplicates"], {"board_c": 1})
+            self.assertEqual(extractor.store.count(), 2)
+
+            # Deleting the kept posting brings back one of its reposts from the unchanged files
+            files = {"job_0": "original.json", "job_1": "repost.json", "job_3": "late_repost.json"}
+            kept = {job["id"] for job in extractor.store.iter_jobs(columns=["id"])}
+            for _ in range(2):
+                (original,) = kept & set(files)
+                os.remove(os.path.join(raw_dir, files.pop(original)))
+                stats = extractor.process_jobs(incremental=True)
+                self.assertEqual(stats["readmitted"], 1)
+                kept = {job["id"] for job in extractor.store.iter_jobs(columns=["id"])}
+                self.assertEqual(len(kept & set(files)), 1)
+                self.assertIn("job_2", kept)
+            with open(os.path.join(tmp, "skill_dict.json")) as f:
+                mapped = {job_id for ids in json.load(f)["mapping"].values() for job_id in ids}
+            self.assertEqual(mapped, kept)
+            self.assertEqual(extractor.store.count(), 2)
+
+    def test_parsed_job_store_round_trip(self):
+        jobs = [{"id": f"job_{i}", "title": "Data Scientist", "description": "Pandas",
+                 "salary": i, "extracted_skills": ["pandas"] if i % 2 else []} for i in range(7)]
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ParsedJobStore(os.path.join(tmp, "store"))
+            store.write(jobs[:5], batch_size=2)
+            store.append(jobs[5:])
+            store.remove({"job_1"})
+            self.assertEqual(store.count(), 6)
+            self.assertEqual(list(store.iter_jobs()), [job for job in jobs if job["id"] != "job_1"])
+
+            batches = list(store.iter_batches(columns=["title", "extracted_skills"], batch_size=4))
+            self.assertEqual(set(batches[0]), {"title", "extracted_skills"})
+
+            store.export_json(os.path.join(tmp, "jobs.json"))
+            with open(os.path.join(tmp, "jobs.json")) as f:
+                self.assertEqual(len(json.load(f)), 6)
+
+    def test_shard_sink_rotates_and_parser_reads_shards(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            raw_dir = os.path.join(tmp, "raw")
+            sink = ShardJobSink(raw_dir, batch_size=7, max_shard_bytes=1024, compress=True)
+            MockJobScraper(raw_dir, sink=sink).scrape(["Data Engineer", "DevOps Engineer"], count_per_role=15)
+
+            shards = os.listdir(raw_dir)
+            self.assertTrue(len(shards) > 1)
+            self.assertTrue(all(name.endswith(".jsonl.gz") for name in shards))
+
+            extractor = SkillExtractor(raw_data_dir=raw_dir, output_dir=tmp, embeddings_dir=tmp, parsed_dir=tmp,
+                                       dedup=False)
+            extractor.process_jobs(streaming=True, chunk_size=4, workers=2)
+            self.assertEqual(extractor.store.count(), 30)
+            self.assertEqual(extractor.process_jobs(incremental=True)["skipped"], len(shards))
+
+    def test_async_scraper_retries_and_respects_host_rate(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            generator = AsyncMockJobScraper(tmp)
+            jobs = {"Data Engineer": [dict(generator.generate_job("Data Engineer"), id=f"job_{i}") for i in range(6)]}
+            with FixtureJobBoard(jobs, fail_first=True) as board:
+                scraper = AsyncMockJobScraper(tmp, board=board, concurrency=8, per_host_rate=50, backoff=0.01)
+                self.assertEqual(scraper.scrape(["Data Engineer"], count_per_role=6), 6)
+
+            self.assertEqual(scraper.stats["retries"], 6)
+            # 50 req/s to one host: requests span at least ~20ms apiece
+            times = sorted(t for t, _ in board.request_log)
+            self.assertGreaterEqual(times[-1] - times[0], 0.8 * 0.02 * (len(times) - 1))
+
+    def test_async_scraper_skips_roles_and_jobs_that_fail(self):
+        class PartlyDownScraper(AsyncMockJobScraper):
+            async def discover(self, role, count):
+                if role == "Backend Engineer":
+                    raise RuntimeError("listing unavailable")
+                return await super().discover(role, count)
+
+            def parse_job(self, page, url):
+                if url.endswith("job_0"):
+                    raise ValueError("malformed page")
+                return super().parse_job(page, url)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            generator = AsyncMockJobScraper(tmp)
+            jobs = {"Data Engineer": [dict(generator.generate_job("Data Engineer"), id=f"job_{i}") for i in range(5)]}
+            with FixtureJobBoard(jobs) as board:
+                scraper = PartlyDownScraper(tmp, board=board, concurrency=4, per_host_rate=0)
+                self.assertEqual(scraper.scrape(["Backend Engineer", "Data Engineer"], count_per_role=5), 4)
+            self.assertEqual(scraper.stats["discovery_failed"], 1)
+            self.assertEqual(scraper.stats["failed"], 1)
+            self.assertEqual(scraper._sessions, [])
+
+    def test_role_skill_matrix_probabilities(self):
+        jobs = [
+            {"id": "a", "title": "Senior Data Engineer", "extracted_skills": ["python", "sql"]},
+            {"id": "b", "title": "Junior Data Engineer", "extracted_skills": ["sql", "sql"]},
+            {"id": "c", "title": "Lead Frontend Engineer", "extracted_skills": ["react", "python"]},
+            {"id": "d", "title": "Recruiter", "extracted_skills": []},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            jobs_path = os.path.join(tmp, "jobs.json")
+            with open(jobs_path, 'w') as f:
+                json.dump(jobs, f)
+            mapper = SkillRoleMapper(parsed_data_path=jobs_path, output_dir=tmp,
+                                     parsed_store_dir=os.path.join(tmp, "store"),
+                                     examples_path=os.path.join(tmp, "examples.json"))
+            mapper.map_skills()
+            df = pd.read_csv(os.path.join(tmp, "role_skill_matrix.csv")).set_index(["role", "skill"])
+            with open(os.path.join(tmp, "examples.json")) as f:
+                examples = json.load(f)
+
+        self.assertEqual(len(df), 3 * 3)
+        self.assertEqual(df.loc[("Data Engineer", "sql"), "count"], 2)
+        self.assertAlmostEqual(df.loc[("Data Engineer", "python"), "p_skill_given_role"], 0.5)
+        self.assertAlmostEqual(df.loc[("Frontend Engineer", "python"), "p_role_given_skill"], 0.5)
+        self.assertEqual(df.loc[("Unknown", "react"), "p_skill_given_role"], 0)
+        self.assertEqual(examples, {"Data Engineer": ["a", "b"], "Frontend Engineer": ["c"], "Unknown": ["d"]})
+
+    def test_role_classifier_taxonomy(self):
+        classifier = RoleClassifier.from_file("data/roles/role_taxonomy.json")
+        self.assertEqual(classifier.classify("Senior Data Engineer"), "Data Engineer")
+        self.assertEqual(classifier.classify("Sr. BACK-END developer (Payments)"), "Backend Engineer")
+        self.assertEqual(classifier.classify("Site Reliability Engineer II"), "DevOps Engineer")
+        self.assertEqual(classifier.classify("Data Engineer, Frontend tooling"), "Data Engineer")
+        self.assertEqual(classifier.classify("Recruiter"), "Unknown")
+        self.assertEqual(classifier.classify(None), "Unknown")
+
+    def test_label_students_scores_skills_against_roles(self):
+        df = pd.DataFrame({
+            "role": ["Data Engineer", "Data Engineer", "Frontend Engineer", "Frontend Engineer"],
+            "skill": ["python", "react", "python", "react"],
+            "p_skill_given_role": [0.8, 0.0, 0.2, 0.9],
+        })
+        students = [
+            {"id": "s1", "skills": ["python"]},
+            {"id": "s2", "skills": ["react", "cobol"]},
+            {"id": "s3", "skills": ["cobol"]},
+            {"id": "s4", "skills": []},
+            {"id": "s5", "skills": ["python", "react"]},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            trainer = ModelTrainer(models_dir=tmp, reports_dir=tmp)
+            labeled = trainer.label_students(students, df)
+        self.assertEqual([s["target_role"] for s in labeled],
+                         ["Data Engineer", "Frontend Engineer", "Generalist", "Generalist", "Frontend Engineer"])
+        self.assertIs(labeled[0], students[0])
+
+    def test_recommender_matches_model_and_reports_gaps(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            pd.DataFrame({
+                "role": ["Data Engineer"] * 3 + ["Frontend Engineer"] * 3,
+                "skill": ["python", "sql", "react"] * 2,
+                "p_skill_given_role": [0.9, 0.7, 0.0, 0.1, 0.0, 0.8],
+            }).to_csv(os.path.join(tmp, "role_skill_matrix.csv"), index=False)
+            ModelTrainer(models_dir=tmp, reports_dir=tmp).train()
+            recommender = Recommender(tmp, top_skills=2)
+
+            for skills in (["python", "sql"], ["react"], ["docker", "aws", "pandas"]):
+                expected = recommender.model.predict_proba(recommender.encode(skills))[0]
+                self.assertTrue(np.allclose(recommender.predict_proba(skills), expected))
+
+            rec = recommender.recommend(["Python", "Cobol"], k=2)
+            self.assertEqual(len(rec.roles), 2)
+            self.assertGreaterEqual(rec.roles[0].score, rec.roles[1].score)
+            matched, missing = recommender.skill_gaps("Data Engineer", ["Python", "Cobol"])
+            self.assertEqual((matched, missing), (["Python"], ["sql"]))
+            # Aliases count as the canonical skill
+            self.assertEqual(recommender.skill_gaps("Data Engineer", ["Py", "SQL "]), (["Py", "SQL "], []))
+            self.assertEqual(recommender.latency_stats()["count"], 1)
+
+    def test_batch_scorer_resumes_and_matches_recommender(self):
+        import pyarrow.parquet as pq
+        with tempfile.TemporaryDirectory() as tmp:
+            ModelTrainer(models_dir=tmp, reports_dir=tmp).train()
+            input_path = os.path.join(tmp, "students.csv")
+            pd.DataFrame({
+                "id": [f"s{i}" for i in range(25)],
+                "skills": ["python;sql", '["react", "node.js"]', "docker, aws", "", "pandas|pytorch"] * 5,
+            }).to_csv(input_path, index=False)
+            output_dir = os.path.join(tmp, "scores")
+
+            scorer = BatchScorer(tmp, workers=1, k=2)
+            # An interrupted run leaves the first parts behind; the rerun skips them
+            self.assertEqual(scorer.score(input_path, output_dir, chunk_size=10, max_chunks=1)["scored"], 10)
+            stats = scorer.score(input_path, output_dir, chunk_size=10)
+            self.assertEqual((stats["scored"], stats["skipped"]), (15, 10))
+            with self.assertRaises(ValueError):
+                scorer.score(input_path, output_dir, chunk_size=5)
+            # A replaced input or a retrained model does not resume into the old parts
+            with open(input_path, 'a') as f:
+                f.write("s25,python\n")
+            with self.assertRaises(ValueError):
+                scorer.score(input_path, output_dir, chunk_size=10)
+            ModelTrainer(models_dir=tmp, reports_dir=tmp).train()
+            with self.assertRaises(ValueError):
+                BatchScorer(tmp, workers=1, k=2).score(input_path, output_dir, chunk_size=10)
+
+            table = pq.read_table(output_dir).to_pydict()
+            self.assertEqual(table["id"], [f"s{i}" for i in range(25)])
+            expected = scorer.recommender.recommend(["react", "node.js"], k=2)
+            self.assertEqual(table["top_roles"][1], [r.role for r in expected.roles])
+            self.assertEqual(table["missing_skills"][1], expected.missing_skills)
+
+    def test_api_micro_batches_concurrent_requests(self):
+        import asyncio
+
+        async def post(port, payload):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            body = json.dumps(payload).encode()
+            writer.write(f"POST /recommend HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+                         f"Connection: close\r\n\r\n".encode() + body)
+            status_line = await reader.readline()
+            response = await reader.read()
+            writer.close()
+            return int(status_line.split()[1]), json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+        async def scenario(api):
+            await api.start(port=0)
+            try:
+                results = await asyncio.gather(*(post(api.port, {"skills": ["python", "sql"], "k": 2})
+                                                 for _ in range(20)))
+                bad = await post(api.port, {"skills": "python"})
+            finally:
+                await api.stop()
+            return results, bad
+
+        with tempfile.TemporaryDirectory() as tmp:
+            ModelTrainer(models_dir=tmp, reports_dir=tmp).train()
+            api = RecommendationAPI(tmp, max_batch=64, max_wait_ms=50)
+            results, bad = asyncio.run(scenario(api))
+            expected = api.recommender.recommend(["python", "sql"], k=2)
+
+        self.assertEqual({status for status, _ in results}, {200})
+        body = results[0][1]
+        self.assertEqual([r["role"] for r in body["top_roles"]], [r.role for r in expected.roles])
+        self.assertEqual(body["roadmap"]["target_role"], expected.best_role)
+        self.assertLess(len(api.batcher.batch_sizes), 20)
+        self.assertEqual(bad[0], 400)
+
+    def test_artifact_bundles_round_trip(self):
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.preprocessing import MultiLabelBinarizer
+        rng = np.random.default_rng(0)
+        mlb = MultiLabelBinarizer().fit([["python", "sql", "react", "docker"]])
+        X = rng.integers(0, 2, size=(60, 4))
+        y = np.where(X[:, 0] > X[:, 2], "Data Engineer", "Frontend Engineer")
+        forest = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+        clustering = ProfileClustering()
+        students = clustering.generate_mock_students(40)
+        corpus = ["python sql etl", "react css html", "docker kubernetes aws"]
+        vectorizer = TfidfVectorizer(stop_words='english')
+        matrix = vectorizer.fit_transform(corpus)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            save_forest_model(os.path.join(tmp, "forest.bundle"), forest, mlb)
+            restored = load_forest(ArtifactBundle(os.path.join(tmp, "forest.bundle")))
+            self.assertTrue(np.allclose(restored.predict_proba(X), forest.predict_proba(X)))
+            self.assertEqual(list(restored.classes_), list(forest.classes_))
+
+            # A bundle written under another sklearn minor version is refused
+            manifest_path = os.path.join(tmp, "forest.bundle", "manifest.json")
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            self.assertIn("sklearn", manifest["libraries"])
+            manifest["libraries"]["sklearn"] = "0.1.0"
+            with open(manifest_path, 'w') as f:
+                json.dump(manifest, f)
+            with self.assertRaisesRegex(ValueError, "sklearn 0.1.0"):
+                ArtifactBundle(os.path.join(tmp, "forest.bundle"))
+
+            clustering.output_dir = tmp
+            cwd = os.getcwd()
+            os.makedirs(os.path.join(tmp, "reports"))
+            os.chdir(tmp)
+            try:
+                clustering.train_clusters(students, n_clusters=3)
+            finally:
+                os.chdir(cwd)
+            cluster = load_cluster_model(ArtifactBundle(os.path.join(tmp, "kmeans_cluster_model.bundle")))
+            features = clustering.encoder.transform(students)
+            self.assertEqual(list(cluster["kmeans"].predict(features)), list(clustering.kmeans.labels_))
+
+            save_tfidf(os.path.join(tmp, "tfidf.bundle"), vectorizer, matrix, ["a", "b", "c"])
+            bundle = ArtifactBundle(os.path.join(tmp, "tfidf.bundle"))
+            query = vectorizer.transform(["python and react"])
+            self.assertEqual(abs(load_vectorizer(bundle).transform(["python and react"]) - query).max(), 0)
+            # The vectorizer loads without touching the matrix, which stays memory-mapped
+            self.assertNotIn("matrix", bundle._cache)
+            self.assertFalse(bundle.get("matrix").data.flags.writeable)
+            self.assertEqual(abs(bundle.get("matrix") - matrix).max(), 0)
+            self.assertEqual(bundle.get("job_ids"), ["a", "b", "c"])
+
+    def test_recommendation_cache_tiers_and_stats(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ModelTrainer(models_dir=tmp, reports_dir=tmp).train()
+            recommender = Recommender(tmp)
+            roadmaps = RoadmapGenerator(output_dir=os.path.join(tmp, "roadmaps"))
+            cache_dir = os.path.join(tmp, "cache")
+            cache = RecommendationCache(recommender, roadmaps, max_entries=2, cache_dir=cache_dir)
+
+            self.assertEqual(cache.warm([["SQL", "Python"], ["python", "sql"], ["React"]], top=1), 1)
+            self.assertEqual(cache.stats()["requests"], 0)
+            first = cache.get(["Python", "SQL", "python"])
+            expected = recommender.recommend(["Python", "SQL"])
+            self.assertEqual(first.recommendation.roles, expected.roles)
+            self.assertEqual(first.recommendation.matched_skills, expected.matched_skills)
+            self.assertTrue(first.pdf.startswith(b"%PDF"))
+            cache.get(["React"])
+            cache.get(["Docker"])  # evicts the python/sql entry from memory
+
+            # A fresh process only has the disk tier
+            restarted = RecommendationCache(recommender, roadmaps, cache_dir=cache_dir)
+            again = restarted.get(["sql", "python"])
+            self.assertEqual(again.recommendation.roles, first.recommendation.roles)
+            self.assertEqual(again.roadmap, first.roadmap)
+            self.assertEqual(again.recommendation.matched_skills,
+                             recommender.skill_gaps(expected.best_role, ["sql", "python"])[0])
+            stats = cache.stats()
+            self.assertEqual((stats["memory_hits"], stats["misses"], stats["evictions"]), (1, 2, 1))
+            self.assertAlmostEqual(stats["hit_rate"], 1 / 3)
+            self.assertEqual(restarted.stats()["disk_hits"], 1)
+
+            recommender.model_version = "retrained"
+            self.assertEqual(cache.get(["Python", "SQL"]).recommendation.roles, expected.roles)
+            self.assertEqual(cache.stats()["misses"], 3)
+            # Aliases share the canonical entry
+            cache.get(["Py", "sql "])
+            self.assertEqual(cache.stats()["misses"], 3)
+            # Rebuilding the role-skill matrix behind the skill gaps invalidates entries
+            recommender.role_skills_version = "rebuilt"
+            cache.get(["Python", "SQL"])
+            self.assertEqual(cache.stats()["misses"], 4)
+
+    def test_default_stages_fingerprint_the_modules_they_import(self):
+        import re
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        for stage in default_stages():
+            module = os.path.join("src", stage.name + ".py")
+            if stage.once:
+                continue
+            with open(os.path.join(root, module)) as f:
+                imported = {f"src/{name}.py" for name in re.findall(r'^from src\.(\w+) import', f.read(), re.M)}
+            # Timing hooks never change a stage's outputs
+            imported.discard("src/instrumentation.py")
+            self.assertLessEqual(imported | {module}, set(stage.code), stage.name)
+
+    def test_committed_bundles_load_with_library_versions(self):
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        path = os.path.join(root, "data", "embeddings", "job_tfidf" + BUNDLE_SUFFIX)
+        bundle = ArtifactBundle(path)
+        self.assertIsNotNone(bundle.libraries)
+        self.assertEqual(len(bundle.get("job_ids")), bundle.get("matrix").shape[0])
+
+    def test_pipeline_skips_unchanged_stages_and_blocks_dependents(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            raw, parsed, model, clusters = (os.path.join(tmp, name) for name in ("raw.txt", "parsed.txt", "model.txt", "clusters.txt"))
+            calls = []
+
+            def copy(src, dst, name):
+                def run():
+                    calls.append(name)
+                    with open(src) as f_in, open(dst, 'w') as f_out:
+                        f_out.write(f_in.read().upper())
+                return run
+
+            def cluster():
+                calls.append("clustering")
+                with open(clusters, 'w') as f:
+                    f.write("ok")
+
+            with open(raw, 'w') as f:
+                f.write("jobs v1")
+            stages = [Stage("trainer", copy(parsed, model, "trainer"), inputs=[parsed], outputs=[model]),
+                      Stage("parser", copy(raw, parsed, "parser"), inputs=[raw], outputs=[parsed]),
+                      Stage("clustering", cluster, outputs=[clusters])]
+            pipeline = Pipeline(stages, state_path=os.path.join(tmp, "state.json"),
+                                report_path=os.path.join(tmp, "run.json"))
+            self.assertEqual(pipeline.dependencies, {"trainer": ["parser"], "parser": [], "clustering": []})
+
+            report = pipeline.run()
+            self.assertLess(calls.index("parser"), calls.index("trainer"))
+            self.assertEqual({s["status"] for s in report["stages"].values()}, {"ran"})
+            self.assertIn("peak_rss_mb", report["stages"]["trainer"])
+
+            calls.clear()
+            self.assertEqual({s["status"] for s in pipeline.run()["stages"].values()}, {"skipped"})
+            self.assertEqual(calls, [])
+
+            with open(raw, 'w') as f:
+                f.write("jobs v2")
+            report = pipeline.run()
+            self.assertEqual(sorted(calls), ["parser", "trainer"])
+            self.assertEqual(report["stages"]["clustering"]["status"], "skipped")
+            with open(model) as f:
+                self.assertEqual(f.read(), "JOBS V2")
+
+            os.remove(raw)
+            report = pipeline.run(force=["parser"])
+            self.assertEqual((report["stages"]["parser"]["status"], report["stages"]["trainer"]["status"]),
+                             ("failed", "blocked"))
+            with open(os.path.join(tmp, "run.json")) as f:
+                self.assertEqual(json.load(f)["stages"]["trainer"]["status"], "blocked")
+
+    def test_tracer_nests_spans_rolls_up_counters_and_exports(self):
+        tracer = Tracer()
+
+        @tracer.traced("stage.step")
+        def step(n):
+            tracer.count("rows_written", n)
+            return n
+
+        with tracer.span("stage", stage=True) as outer:
+            tracer.count("bytes_read", 10)
+            step(3)
+            step(4)
+        self.assertEqual(dict(outer.counters), {"bytes_read": 10, "rows_written": 7})
+        self.assertEqual(tracer.totals["rows_written"], 7)
+        inner = [s for s in tracer.finished() if s.name == "stage.step"]
+        self.assertEqual([s.parent_id for s in inner], [outer.id, outer.id])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tracer.export_jsonl(os.path.join(tmp, "trace.jsonl"))
+            tracer.export_chrome_trace(os.path.join(tmp, "trace.json"))
+            with open(os.path.join(tmp, "trace.jsonl")) as f:
+                self.assertEqual([json.loads(line)["name"] for line in f], ["stage.step", "stage.step", "stage"])
+            with open(os.path.join(tmp, "trace.json")) as f:
+                events = json.load(f)["traceEvents"]
+            self.assertEqual({e["ph"] for e in events}, {"X"})
+            self.assertEqual(events[-1]["args"], {"stage": True, "bytes_read": 10, "rows_written": 7})
+
+            os.environ.update(CAREER_PROFILE="stage.step", CAREER_PROFILE_DIR=tmp)
+            try:
+                step(1)
+            finally:
+                del os.environ["CAREER_PROFILE"], os.environ["CAREER_PROFILE_DIR"]
+            self.assertTrue(os.path.exists(os.path.join(tmp, "stage.step.prof")))
+
+            # A nested traced span must not hide the enclosing span's earlier peak
+            os.environ.update(CAREER_TRACEMALLOC="*", CAREER_PROFILE_DIR=tmp)
+            try:
+                with tracer.span("stage") as outer:
+                    block = bytearray(32 * 2**20)
+                    del block
+                    with tracer.span("stage.step") as inner:
+                        pass
+            finally:
+                del os.environ["CAREER_TRACEMALLOC"], os.environ["CAREER_PROFILE_DIR"]
+            self.assertGreaterEqual(outer.attrs["peak_traced_mb"], 32)
+            self.assertLess(inner.attrs["peak_traced_mb"], 32)
+
     def test_roadmap_generation(self):
         generator = RoadmapGenerator(output_dir="tests/outputs")
         roadmap = generator.generate_roadmap("test_user", "Data Engineer", ["Python"])
@@ -33,5 +707,219 @@ class TestAgents(unittest.TestCase):
         self.assertIn('cgpa', students[0])
         self.assertIn('skills', students[0])
 
+    def test_streaming_clustering_selects_k_and_reports_in_one_pass(self):
+        rng = np.random.default_rng(0)
+        # Two clearly separated archetypes
+        students = [{"id": str(i), "cgpa": float(rng.uniform(8.5, 10.0) if i % 2 else rng.uniform(6.0, 7.0)),
+                     "skills": ["python", "pandas", "sql"] if i % 2 else ["react", "node.js"]}
+                    for i in range(600)]
+        # Profiles without a CGPA count as 0.0, as in the encoder
+        del students[2]["cgpa"]
+        students[4]["cgpa"] = None
+        with tempfile.TemporaryDirectory() as tmp:
+            clustering = ProfileClustering(output_dir=tmp, reports_dir=tmp)
+            result = clustering.train_clusters_streaming(iter_chunks(students, 97), n_clusters="auto",
+                                                         k_range=range(2, 6), batch_size=64, sample_size=200,
+                                                         n_jobs=1)
+            self.assertEqual(result["n_clusters"], 2)
+            self.assertEqual(sorted(result["sizes"]), [300, 300])
+            self.assertEqual([p["k"] for p in result["k_curve"]], [2, 3, 4, 5])
+
+            cluster = load_cluster_model(ArtifactBundle(os.path.join(tmp, "kmeans_cluster_model.bundle")))
+            self.assertEqual(type(cluster["kmeans"]).__name__, "MiniBatchKMeans")
+            self.assertEqual(cluster["scaler"].n_samples_seen_, 600)
+            with open(os.path.join(tmp, "cluster_analysis.md")) as f:
+                report = f.read()
+            self.assertIn("- Size: 300", report)
+            self.assertIn("Top Skills: pandas, python, sql", report)
+            self.assertIn("Top Skills: node.js, react", report)
+
+    def test_cluster_assigner_matches_kmeans_and_reports_peers(self):
+        clustering = ProfileClustering()
+        students = clustering.generate_mock_students(300)
+        with tempfile.TemporaryDirectory() as tmp:
+            clustering.output_dir = clustering.reports_dir = tmp
+            clustering.train_clusters(students, n_clusters=4)
+            assigner = ClusterAssigner(tmp)
+
+            features = clustering.encoder.transform(students)
+            expected = list(clustering.kmeans.predict(features))
+            single = [assigner.assign([s.upper() for s in st['skills']], st['cgpa']).cluster for st in students]
+            batch = assigner.assign_batch([st['skills'] for st in students], [st['cgpa'] for st in students])
+            self.assertEqual(single, expected)
+            self.assertEqual([a.cluster for a in batch], expected)
+            self.assertTrue(np.allclose([a.distance for a in batch], clustering.kmeans.transform(features).min(axis=1)))
+
+            # Profiles come from the training aggregates saved with the model
+            members = [st for st, label in zip(students, expected) if label == 0]
+            profile = assigner.profiles[0]
+            self.assertEqual(profile.size, len(members))
+            self.assertAlmostEqual(profile.avg_cgpa, np.mean([st['cgpa'] for st in members]))
+            top_skill, share = profile.skills[0]
+            self.assertAlmostEqual(share, sum(top_skill in st['skills'] for st in members) / len(members))
+            self.assertEqual(assigner.latency_stats()["count"], len(students))
+
+    def test_inverted_index_top_k_matches_brute_force(self):
+        from scipy import sparse
+        rng = np.random.default_rng(1)
+        matrix = sparse.random(3000, 60, density=0.1, random_state=1, format='csr')
+        matrix.data = rng.uniform(0.1, 1.0, matrix.nnz)
+        index = InvertedIndex(matrix, first_depth=16)
+        for _ in range(20):
+            terms = np.sort(rng.choice(60, size=4, replace=False))
+            weights = rng.uniform(0.1, 1.0, size=4)
+            query = np.zeros(60)
+            query[terms] = weights
+            expected = np.sort(matrix @ query)[::-1][:10]
+            rows, scores = index.search(terms, weights, k=10)
+            self.assertTrue(np.allclose(scores, expected))
+            self.assertTrue(np.allclose(matrix[rows] @ query, scores))
+            # Capped depth still returns k real jobs, just not necessarily the best
+            rows, scores = index.search(terms, weights, k=10, max_postings=20)
+            self.assertEqual(len(rows), 10)
+            self.assertTrue(np.all(scores <= expected[0] + 1e-9))
+
+    def test_job_retriever_returns_matching_postings(self):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        with tempfile.TemporaryDirectory() as tmp:
+            jobs = [{"id": "j1", "title": "Data Engineer", "company": "Acme", "description": "python sql airflow etl"},
+                    {"id": "j2", "title": "Frontend Engineer", "company": "Web", "description": "react css html javascript"},
+                    {"id": "j3", "title": "ML Engineer", "description": "python pytorch machine learning"}]
+            ParsedJobStore(os.path.join(tmp, "store")).write(jobs)
+            vectorizer = TfidfVectorizer(stop_words='english')
+            matrix = vectorizer.fit_transform([f"{j['title']} {j['description']}" for j in jobs])
+            save_tfidf(os.path.join(tmp, "tfidf.bundle"), vectorizer, matrix, [j["id"] for j in jobs])
+
+            retriever = JobRetriever(os.path.join(tmp, "tfidf.bundle"), os.path.join(tmp, "store"))
+            matches = retriever.search(["Python", "SQL"], ["Data Engineering"], k=2)
+            self.assertEqual([m.job_id for m in matches], ["j1", "j3"])
+            self.assertEqual((matches[0].title, matches[0].company), ("Data Engineer", "Acme"))
+            self.assertEqual(retriever.search(["Rust"]), [])
+
+    def test_feature_encoder_builds_sparse_rows_over_shared_vocabulary(self):
+        from scipy import sparse
+        students = [{"cgpa": 8.0, "internships": 2, "skills": ["Python", "py", "SQL "], "interests": ["DevOps"]},
+                    {"cgpa": 6.0, "internships": 0, "skills": ["react", "JS"], "interests": []}]
+        encoder = FeatureEncoder(numeric=["cgpa", "internships"], use_interests=True)
+        X = encoder.fit_transform(students)
+        self.assertTrue(sparse.isspmatrix_csr(X))
+        # Aliases and case collapse into SkillExtractor's canonical names
+        extractor = SkillExtractor()
+        self.assertEqual(encoder.skills, sorted({extractor.normalize_skill(s) for st in students for s in st['skills']}))
+        self.assertEqual(encoder.feature_names,
+                         ["cgpa", "internships", "javascript", "python", "react", "sql", "interest:devops"])
+        self.assertEqual(X.getnnz(axis=1).tolist(), [5, 4])
+        self.assertTrue(np.allclose(X.toarray(), [[1, 1, 0, 1, 0, 1, 1], [-1, -1, 1, 0, 1, 0, 0]]))
+        # Unknown skills are ignored; a saved vocabulary keeps its column order
+        restored = FeatureEncoder(["SQL", "python"])
+        self.assertEqual(restored.transform_skills([["Py", "rust", "sql"]]).toarray().tolist(), [[1.0, 1.0]])
+
+    def test_model_search_halves_candidates_and_resumes_from_cache(self):
+        rng = np.random.default_rng(0)
+        pool = ["python", "sql", "react", "css", "docker", "aws", "java", "pandas"]
+        students = [{"skills": list(rng.choice(pool, size=3, replace=False))} for _ in range(600)]
+        y = ["Data" if "python" in s["skills"] or "sql" in s["skills"] else
+             "Frontend" if "react" in s["skills"] else "Other" for s in students]
+        X = FeatureEncoder().fit_transform(students)
+        families = {"logistic_regression": {"C": [0.01, 1.0, 10.0]},
+                    "random_forest": {"n_estimators": [10], "max_depth": [1, None]},
+                    "extra_trees": {"n_estimators": [10]}}
+        with tempfile.TemporaryDirectory() as tmp:
+            search = ModelSearch(families, n_jobs=2, cache_dir=os.path.join(tmp, "cache"))
+            leaderboard = search.run(X, y)
+            # 6 candidates on a third of the rows, the best 2 on all of them
+            self.assertEqual([row["rounds"] for row in leaderboard], [2, 2, 1, 1, 1, 1])
+            self.assertGreater(leaderboard[0]["rows"], leaderboard[-1]["rows"])
+            self.assertGreater(leaderboard[0]["score"], 0.9)
+            self.assertTrue(all(row["predict_ms"] > 0 and row["size_kb"] > 0 for row in leaderboard))
+            self.assertEqual(len(os.listdir(os.path.join(tmp, "cache"))), 6 * 3 + 2 * 3)
+
+            resumed = ModelSearch(families, n_jobs=2, cache_dir=os.path.join(tmp, "cache"))
+            self.assertEqual(resumed.run(X, y), leaderboard)
+            self.assertEqual(resumed.cache_hits, 24)
+
+            # The trainer saves whichever family wins, and the recommender serves it
+            ModelTrainer(models_dir=tmp, reports_dir=tmp).train(search=True, families=["logistic_regression"], n_jobs=1)
+            with open(os.path.join(tmp, "model_leaderboard.json")) as f:
+                self.assertEqual({row["family"] for row in json.load(f)["leaderboard"]}, {"logistic_regression"})
+            self.assertTrue(os.path.exists(os.path.join(tmp, "metrics.json")))
+            recommender = Recommender(tmp)
+            self.assertEqual(type(recommender.model).__name__, "LogisticRegression")
+            self.assertEqual(len(recommender.recommend(["python", "sql"]).roles), 3)
+
+    def test_model_search_handles_singleton_classes_and_checks_n_jobs(self):
+        rng = np.random.default_rng(1)
+        pool = ["python", "sql", "react", "css", "docker", "aws"]
+        students = [{"skills": list(rng.choice(pool, size=2, replace=False))} for _ in range(300)]
+        y = ["Data" if "python" in s["skills"] else "Other" for s in students]
+        # One role with a single student, as Frontend Engineer has in the mock data
+        students.append({"skills": ["react", "css"]})
+        y.append("Frontend")
+        X = FeatureEncoder().fit_transform(students)
+        families = {"logistic_regression": {"C": [0.1, 1.0, 10.0]}, "random_forest": {"n_estimators": [5]}}
+        leaderboard = ModelSearch(families, n_jobs=1, cache_dir=None).run(X, y)
+        self.assertEqual([row["rounds"] for row in leaderboard], [2, 2, 1, 1])
+        self.assertLess(leaderboard[-1]["rows"], leaderboard[0]["rows"])
+        for n_jobs in (0, -2):
+            with self.assertRaises(ValueError):
+                ModelSearch(families, n_jobs=n_jobs)
+
+        # Unstratifiable subsets still keep one row of every class in the fold
+        from src import model_selection
+        y_codes = np.unique(y, return_inverse=True)[1]
+        model_selection._init_worker(X, y_codes, "accuracy", 0)
+        train = np.arange(len(y))
+        for seed in range(20):
+            subset = model_selection._subsample(train, 10, seed)
+            self.assertEqual(len(subset), 10)
+            self.assertEqual(len(set(subset)), 10)
+            self.assertEqual(set(y_codes[subset]), {0, 1, 2})
+
+    def test_serving_export_matches_forest_and_is_selectable(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ModelTrainer(models_dir=tmp, reports_dir=tmp).train()
+            with self.assertRaises(FileNotFoundError):
+                Recommender(tmp, serving="compiled")
+            report = export_serving(tmp, reports_dir=tmp, n_samples=2000)
+            self.assertTrue(os.path.exists(os.path.join(tmp, "serving_report.json")))
+            self.assertEqual(report["forms"]["compiled"]["top1_agreement"], 1.0)
+            self.assertLess(report["forms"]["distilled"]["size_kb"], report["forms"]["forest"]["size_kb"])
+
+            forest = Recommender(tmp)
+            compiled = Recommender(tmp, serving="compiled")
+            X = forest.encode_many([["python", "sql"], ["react"], [], ["docker", "aws", "linux"]])
+            np.testing.assert_allclose(compiled.forest_proba(X), forest.forest_proba(X), atol=1e-6)
+            self.assertEqual(compiled.recommend(["python"]).best_role, forest.recommend(["python"]).best_role)
+            for form in ("distilled", "linear"):
+                recommendation = Recommender(tmp, serving=form).recommend(["python", "sql"])
+                self.assertEqual(len(recommendation.roles), 3)
+                self.assertLessEqual(sum(r.score for r in recommendation.roles), 1.0 + 1e-6)
+
+            input_path = os.path.join(tmp, "students.csv")
+            pd.DataFrame({"id": ["a", "b"], "skills": ["python;sql", "react"]}).to_csv(input_path, index=False)
+            stats = BatchScorer(tmp, workers=1, serving="distilled").score(input_path, os.path.join(tmp, "scores"))
+            self.assertEqual(stats["scored"], 2)
+
+    def test_compiled_trees_split_exactly_like_the_forest_at_thresholds(self):
+        from sklearn.ensemble import RandomForestClassifier
+        from scipy import sparse
+        rng = np.random.default_rng(0)
+        # Adjacent float32 values: each split threshold is their float64 midpoint
+        base = rng.uniform(0, 1, size=(200, 4)).astype(np.float32)
+        X = np.where(rng.random((200, 4)) < 0.5, base, np.nextafter(base, np.float32(2)))
+        y = rng.integers(0, 3, size=200)
+        forest = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+        compiled = CompiledTrees.from_forest(forest)
+
+        thresholds = np.concatenate([e.tree_.threshold[e.tree_.children_left >= 0] for e in forest.estimators_])
+        rounded = thresholds.astype(np.float32)
+        boundary = np.concatenate([rounded, np.nextafter(rounded, np.float32(2)), np.nextafter(rounded, np.float32(-1))])
+        X_edge = np.tile(boundary[:, None], (1, 4))
+        for inputs in (X_edge, X):
+            np.testing.assert_array_equal(compiled.apply(inputs), forest.apply(inputs))
+            np.testing.assert_allclose(compiled.predict_proba(inputs), forest.predict_proba(inputs), atol=1e-12)
+        row = sparse.csr_matrix(X_edge[:1])
+        np.testing.assert_allclose(compiled.predict_proba(row), forest.predict_proba(X_edge[:1]), atol=1e-12)
+
 if __name__ == '__main__':
     unittest.main()
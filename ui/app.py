@@ -1,6 +1,4 @@
 import streamlit as st
-import pandas as pd
-import pickle
 import os
 import sys
 import json
@@ -10,6 +8,13 @@ import logging
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.roadmap import RoadmapGenerator
+from src.recommender import Recommender
+from src.recommendation_cache import RecommendationCache
+from src.cluster_assigner import ClusterAssigner
+from src.job_retrieval import JobRetriever
+from src.serving import SERVING_FORMS
+from src.artifacts import find_artifact
+from src.instrumentation import traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,8 +25,7 @@ st.set_page_config(page_title="AI Career Recommender", layout="wide")
 @st.cache_resource
 def ensure_models_exist():
     """Run pipeline if models don't exist (for Streamlit Cloud deployment)"""
-    model_path = "models/best_model.pkl"
-    if not os.path.exists(model_path):
+    if find_artifact("models", "best_model") is None:
         st.info("🔄 First-time setup: Training models... This will take 2-3 minutes.")
         try:
             import subprocess
@@ -42,20 +46,38 @@ def ensure_models_exist():
             return False
     return True
 
+def serving_forms():
+    # The trained forest plus whichever compact forms `python -m src.serving` exported
+    return ["forest"] + [form for form in SERVING_FORMS[1:] if find_artifact("models", f"serving_{form}") is not None]
+
 @st.cache_resource
-def load_model():
-    model_path = "models/best_model.pkl"
-    if not os.path.exists(model_path):
+def load_recommender(serving="forest"):
+    if find_artifact("models", "best_model") is None:
         return None
-    with open(model_path, 'rb') as f:
-        return pickle.load(f)
+    return Recommender("models", serving=serving)
 
-@st.cache_data
-def load_skill_matrix():
-    matrix_path = "models/role_skill_matrix.csv"
-    if not os.path.exists(matrix_path):
+@st.cache_resource
+def load_recommendation_cache(serving="forest"):
+    recommender = load_recommender(serving)
+    if recommender is None:
+        return None
+    # Shared across sessions; the disk tier survives restarts and can be
+    # warmed offline with `python -m src.recommendation_cache`
+    return RecommendationCache(recommender, RoadmapGenerator(), cache_dir="outputs/rec_cache")
+
+@st.cache_resource
+def load_cluster_assigner():
+    if find_artifact("models", "kmeans_cluster_model") is None:
         return None
-    return pd.read_csv(matrix_path)
+    return ClusterAssigner("models")
+
+@st.cache_resource
+def load_job_retriever():
+    for name in ("job_tfidf.bundle", "job_tfidf_hashed"):
+        tfidf_path = os.path.join("data", "embeddings", name)
+        if os.path.exists(os.path.join(tfidf_path, "manifest.json")):
+            return JobRetriever(tfidf_path)
+    return None
 
 def main():
     st.title("AI-Powered Career Recommendation System")
@@ -77,42 +99,30 @@ def main():
         interests = st.multiselect("Interests", ["Data Science", "Web Development", "DevOps", "Cloud Computing", "Backend", "Frontend"], default=["Data Science"])
         
         internships = st.number_input("Number of Internships", 0, 5, 1)
+
+        serving = st.selectbox("Scoring model", serving_forms(),
+                               help="forest is the trained model; the others are compact exports (see reports/serving_report.json)")
         
         if st.button("Get Recommendations"):
             if not skills:
                 st.error("Please select at least one skill.")
             else:
-                process_submission(cgpa, skills, interests, internships)
+                process_submission(cgpa, skills, interests, internships, serving)
 
-def process_submission(cgpa, skills, interests, internships):
-    model_data = load_model()
-    if not model_data:
+@traced("ui.process_submission")
+def process_submission(cgpa, skills, interests, internships, serving="forest"):
+    cache = load_recommendation_cache(serving)
+    if cache is None:
         st.error("Model not trained yet. Please run the training pipeline.")
         return
+    recommender = cache.recommender
 
-    clf = model_data['model']
-    mlb = model_data['mlb']
-    
-    # Prepare input
-    # Note: The model was trained on just skills for now in trainer.py
-    # If we added CGPA, we'd need to scale it here too.
-    # For MVP, let's assume the model expects just One-Hot encoded skills.
-    
-    # Transform skills
-    # Handle unknown skills gracefully
-    # valid_skills = set(mlb.classes_)
-    # filtered_skills = [s for s in skills if s in valid_skills]
-    
-    # MLB expects a list of lists (samples)
-    X_input = mlb.transform([skills])
-    
-    # Predict
-    probas = clf.predict_proba(X_input)[0]
-    classes = clf.classes_
-    
-    # Get top 3
-    top_indices = probas.argsort()[-3:][::-1]
-    top_roles = [(classes[i], probas[i]) for i in top_indices]
+    # Note: The model was trained on just skills for now in trainer.py.
+    # If we added CGPA, the recommender would need to scale it too.
+    cached = cache.get(skills)
+    logger.info(f"Recommendation cache: {cache.stats()}")
+    recommendation = cached.recommendation
+    top_roles = [(r.role, r.score) for r in recommendation.roles]
     
     st.divider()
     st.header("Recommended Roles")
@@ -128,24 +138,15 @@ def process_submission(cgpa, skills, interests, internships):
             
         # Explainability (Simple feature importance proxy: missing skills)
         st.subheader("Why this role?")
-        role_skill_df = load_skill_matrix()
-        if role_skill_df is not None:
-            # Get top skills for the best role
-            role_skills = role_skill_df[role_skill_df['role'] == best_role].sort_values('p_skill_given_role', ascending=False)['skill'].head(10).tolist()
-            
-            # Identify gaps
-            # Normalize for comparison
-            user_skills_lower = [s.lower() for s in skills]
-            missing = [s for s in role_skills if s.lower() not in user_skills_lower]
-            
-            st.write(f"Key skills you have: {', '.join([s for s in skills if s.lower() in [rs.lower() for rs in role_skills]])}")
+        if recommender.role_skills:
+            missing = recommendation.missing_skills
+            st.write(f"Key skills you have: {', '.join(recommendation.matched_skills)}")
             st.write(f"Key skills to learn: {', '.join(missing)}")
             
             # Generate Roadmap
             st.subheader("Learning Roadmap")
-            generator = RoadmapGenerator()
-            roadmap = generator.generate_roadmap("current_user", best_role, missing)
-            
+            roadmap = cached.roadmap
+
             for module in roadmap['modules']:
                 with st.expander(f"Week {module.get('week')}: {module['topic']}"):
                     if 'description' in module:
@@ -155,15 +156,12 @@ def process_submission(cgpa, skills, interests, internships):
                             st.markdown(f"- [{res['title']}]({res['url']}) ({res['type']})")
                             
             # Download PDF
-            pdf_path = f"outputs/roadmaps/{roadmap['student_id']}.pdf"
-            if os.path.exists(pdf_path):
-                with open(pdf_path, "rb") as pdf_file:
-                    st.download_button(
-                        label="Download Roadmap PDF",
-                        data=pdf_file,
-                        file_name=f"roadmap_{best_role.replace(' ', '_')}.pdf",
-                        mime="application/pdf"
-                    )
+            st.download_button(
+                label="Download Roadmap PDF",
+                data=cached.pdf,
+                file_name=f"roadmap_{best_role.replace(' ', '_')}.pdf",
+                mime="application/pdf"
+            )
 
     with col2:
         st.subheader("Market Insights")
@@ -172,5 +170,29 @@ def process_submission(cgpa, skills, interests, internships):
         st.metric("Average Salary", "$120k")
         st.metric("Job Openings", "15,000+")
 
+        assigner = load_cluster_assigner()
+        if assigner is not None:
+            peers = assigner.assign(skills, cgpa).profile
+            st.subheader("Your Peer Group")
+            st.write(f"Cluster {peers.cluster}: {peers.size} students ({peers.share:.0%} of profiles)")
+            st.metric("Peer Avg CGPA", f"{peers.avg_cgpa:.2f}")
+            have = {s.lower() for s in skills}
+            for skill, share in peers.skills[:5]:
+                marker = "✅" if skill.lower() in have else "➕"
+                st.write(f"{marker} {skill}: {share:.0%} of peers")
+
+    retriever = load_job_retriever()
+    if retriever is not None:
+        st.divider()
+        st.header("Matching Openings")
+        matches = retriever.search(skills, interests, k=5)
+        if not matches:
+            st.write("No postings share terms with your profile yet.")
+        for match in matches:
+            title = match.title or match.job_id
+            heading = f"[{title}]({match.url})" if match.url else title
+            where = " · ".join(part for part in (match.company, match.location) if part)
+            st.markdown(f"**{heading}** {('— ' + where) if where else ''} ({match.score:.0%} similar)")
+
 if __name__ == "__main__":
     main()